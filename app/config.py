@@ -0,0 +1,27 @@
+import os
+
+BOARD_CACHE_SIZE = int(os.getenv("BOARD_CACHE_SIZE", "1024"))
+BOARD_CACHE_TTL = float(os.getenv("BOARD_CACHE_TTL", "60"))
+
+POST_BATCH_MAX_ITEMS = int(os.getenv("POST_BATCH_MAX_ITEMS", "10000"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+BOARD_PURGE_CHUNK_SIZE = int(os.getenv("BOARD_PURGE_CHUNK_SIZE", "1000"))
+
+ANALYTICS_ROLLING_WINDOW = int(os.getenv("ANALYTICS_ROLLING_WINDOW", "5")) # games
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+BATCH_UPLOAD_MAX_BYTES = int(os.getenv("BATCH_UPLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+# Zip batches: bounds on what the archive may expand to, checked against the member headers before extracting.
+BATCH_EXTRACT_MAX_BYTES = int(os.getenv("BATCH_EXTRACT_MAX_BYTES", str(4 * BATCH_UPLOAD_MAX_BYTES)))
+BATCH_MAX_MEMBERS = int(os.getenv("BATCH_MAX_MEMBERS", "1000"))
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "./snapshots")
+
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", "3"))
+INGESTION_LEASE_SECONDS = float(os.getenv("INGESTION_LEASE_SECONDS", "60")) # renewed every third of it while a job runs
+INGESTION_QUEUE_SIZE = int(os.getenv("INGESTION_QUEUE_SIZE", "32")) # jobs waiting for a free worker
+INGESTION_RETRY_AFTER = int(os.getenv("INGESTION_RETRY_AFTER", "5")) # seconds, until job durations are known
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))
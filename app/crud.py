@@ -1,60 +1,149 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select, insert, update, delete, func, tuple_, Row
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Set, Tuple
 
 from app.models.board import Board
 from app.models.post import Post
 
 from . import schemas
 
-def create_board(db: Session, board: schemas.BoardRequest) -> Board:
+# List reads select just the response columns as row tuples instead of hydrating ORM objects.
+BOARD_COLUMNS = [getattr(Board, field) for field in schemas.BoardResponse.model_fields]
+POST_COLUMNS = [getattr(Post, field) for field in schemas.PostResponse.model_fields]
+# Board columns changed by post writes (see update_board_stats).
+BOARD_STATS_COLUMNS = [Board.post_count, Board.last_post_at, Board.updated_at]
+
+async def create_board(db: AsyncSession, board: schemas.BoardRequest) -> Board:
     db_board = Board(name=board.name, description=board.description)
     db.add(db_board)
-    db.commit()
-    db.refresh(db_board)
+    await db.commit()
+    await db.refresh(db_board)
     return db_board
 
-def get_board_by_name(db: Session, name: str) -> Optional[Board]:
-    return db.query(Board).filter(Board.name == name).first()
+async def get_board_by_name(db: AsyncSession, name: str) -> Optional[Board]:
+    return await db.scalar(select(Board).where(Board.name == name, Board.deleted_at.is_(None)).limit(1))
+
+async def get_board_by_id(db: AsyncSession, id: int) -> Optional[Board]:
+    return await db.scalar(select(Board).where(Board.id == id, Board.deleted_at.is_(None)).limit(1))
+
+async def get_board_updated_at(db: AsyncSession, id: int) -> Optional[Row]:
+    # The board's version for ETags, read from the database on every request so that it reflects
+    # writes made through any worker; None when the board does not exist.
+    return (await db.execute(select(Board.updated_at).where(Board.id == id, Board.deleted_at.is_(None)))).first()
+
+async def get_all_boards(db: AsyncSession) -> List[Row]:
+    return list(await db.execute(select(*BOARD_COLUMNS).where(Board.deleted_at.is_(None)))) # returns lists only, not None
+
+async def get_board_stats(db: AsyncSession, ids: List[int]) -> List[Row]:
+    return list(await db.execute(select(Board.id, *BOARD_STATS_COLUMNS).where(Board.id.in_(ids), Board.deleted_at.is_(None))))
+
+async def update_board(db: AsyncSession, db_board: Board) -> Board:
+    await db.commit()
+    await db.refresh(db_board)
+    return db_board
 
-def get_board_by_id(db: Session, id: int) -> Optional[Board]:
-    return db.query(Board).filter(Board.id == id).first()
+async def delete_board(db: AsyncSession, id: int) -> bool:
+    # Only marks the board; its posts and the row are removed by board_purge.purge_board.
+    # The name is released right away so a new board can take it.
+    result = await db.execute(update(Board).where(Board.id == id, Board.deleted_at.is_(None))
+                              .values(deleted_at=datetime.utcnow(), name=None))
+    await db.commit()
+    return result.rowcount > 0
 
-def get_all_boards(db: Session) -> List[Board]:
-    return db.query(Board).all() # all method returns lists only, not None
+async def update_board_stats(db: AsyncSession, board_id: int, post_count_delta: int) -> bool:
+    # Runs in the same transaction as the post write. last_post_at is re-read through the
+    # (board_id, timestamp, id) index, which also covers deleting the newest post. Returns False when
+    # the board is gone or marked deleted, so writers roll back instead of adding posts to a purged board.
+    result = await db.execute(update(Board).where(Board.id == board_id, Board.deleted_at.is_(None)).values(
+        post_count=func.coalesce(Board.post_count, 0) + post_count_delta,
+        last_post_at=select(func.max(Post.timestamp)).where(Post.board_id == board_id).scalar_subquery(),
+    ))
+    return result.rowcount > 0
 
-def create_post(db: Session, post: schemas.PostRequest, board_id: int) -> Post:
+async def create_post(db: AsyncSession, post: schemas.PostRequest, board_id: int) -> Optional[Post]:
     db_post = Post(title=post.title, content=post.content, author=post.author,
                           board_id=board_id)
     db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
+    await db.flush()
+    if not await update_board_stats(db, board_id, 1):
+        await db.rollback()
+        return None
+    await db.commit()
+    await db.refresh(db_post)
     return db_post
 
-def get_post_by_id(db: Session, board_id: int, post_id:int) -> Optional[Post]:
-    return db.query(Post).filter(Post.id == post_id, Post.board_id == board_id).first()
+async def get_post_by_id(db: AsyncSession, board_id: int, post_id:int) -> Optional[Post]:
+    return await db.scalar(select(Post).where(Post.id == post_id, Post.board_id == board_id).limit(1))
 
-def get_all_boards(db: Session):
-    return db.query(models.Board).all() # all method returns lists only, not None
+async def get_posts_by_board_id(db: AsyncSession, board_id: int, offset: int, limit: int) -> List[Row]:
+    return list(await db.execute(select(*POST_COLUMNS).where(Post.board_id == board_id).offset(offset).limit(limit)))
 
-def delete_board(db: Session, id:int):
-    delete_board = db.query(models.Board).filter(models.Board.id == id).delete()
-    if delete_board == 0:
-        return False
-    else:
-        return True
-
-def get_posts_by_board_id(db: Session, board_id: int, offset: int, limit: int) -> List[Post]:
-    return db.query(Post).filter(Post.board_id == board_id).offset(offset).limit(limit).all()
+async def get_posts_by_board_id_keyset(db: AsyncSession, board_id: int, limit: int, order_by: str = "id",
+                                       after: Optional[Tuple] = None, before: Optional[Tuple] = None) -> Tuple[List[Row], bool]:
+    # after/before are sort keys of the boundary post, (id,) or (timestamp, id), served by the
+    # (board_id, id) and (board_id, timestamp, id) indexes. Posts are returned in ascending order
+    # together with whether more posts exist past the page in the direction of travel.
+    key = (Post.id,) if order_by == "id" else (Post.timestamp, Post.id)
+    query = select(*POST_COLUMNS).where(Post.board_id == board_id)
+    if after is not None:
+        query = query.where(tuple_(*key) > tuple_(*after))
+    if before is not None:
+        query = query.where(tuple_(*key) < tuple_(*before))
+        posts = list(await db.execute(query.order_by(*[column.desc() for column in key]).limit(limit + 1)))
+        return posts[:limit][::-1], len(posts) > limit
+    posts = list(await db.execute(query.order_by(*key).limit(limit + 1)))
+    return posts[:limit], len(posts) > limit
 
-def update_post(db: Session, db_post: Post, post: schemas.PostResponse) -> Post:
-    update_data = post.model_dump(exclude_unset=True)
+async def update_post(db: AsyncSession, db_post: Post, post: schemas.PostResponse) -> Optional[Post]:
+    # Returns None, with nothing written, when the post's board or the board it moves to is deleted.
+    old_board_id = db_post.board_id
+    update_data = post.model_dump(exclude_unset=True, exclude={"updated_at"}) # set by onupdate
     for key, value in update_data.items():
         setattr(db_post, key, value)
     db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
+    await db.flush()
+    # The timestamp or board may change, so both boards' stats are refreshed.
+    if db_post.board_id != old_board_id:
+        updated = await update_board_stats(db, old_board_id, -1) and await update_board_stats(db, db_post.board_id, 1)
+    else:
+        updated = await update_board_stats(db, old_board_id, 0)
+    if not updated:
+        await db.rollback()
+        return None
+    await db.commit()
+    await db.refresh(db_post)
     return db_post
 
-def delete_post(db: Session, post: Post):
-    db.delete(post)
-    db.commit()
+async def delete_post(db: AsyncSession, post: Post):
+    await db.delete(post)
+    await db.flush()
+    await update_board_stats(db, post.board_id, -1)
+    await db.commit()
+
+async def create_posts(db: AsyncSession, posts: List[schemas.PostRequest], board_id: int) -> List[int]:
+    # Batched multi-row INSERT ... RETURNING; the caller commits. sort_by_parameter_order would make
+    # SQLite fall back to one statement per row, but rowids are assigned in VALUES order, so sorting
+    # the returned ids restores request order.
+    if not posts:
+        return []
+    return sorted(await db.scalars(
+        insert(Post).returning(Post.id),
+        [dict(post.model_dump(), board_id=board_id) for post in posts],
+    ))
+
+async def get_post_ids(db: AsyncSession, board_id: int, ids: List[int]) -> Set[int]:
+    if not ids:
+        return set()
+    return set(await db.scalars(select(Post.id).where(Post.board_id == board_id, Post.id.in_(ids))))
+
+async def update_posts(db: AsyncSession, posts: List[schemas.PostPatch]):
+    # Bulk UPDATE by primary key; only the fields set on each patch are written. The caller commits.
+    values = [post.model_dump(exclude_unset=True) for post in posts]
+    values = [value for value in values if len(value) > 1]
+    if values:
+        await db.execute(update(Post), values)
+
+async def delete_posts(db: AsyncSession, ids: List[int]):
+    if ids:
+        await db.execute(delete(Post).where(Post.id.in_(ids)))
@@ -1,22 +1,51 @@
+import os
 import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, BackgroundTasks, Query, Response, Header
+from fastapi.responses import StreamingResponse, FileResponse, ORJSONResponse
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from sqlalchemy.orm import Session
-from typing import List, Optional, Annotated
-from contextlib import contextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Annotated, Literal
 
-from . import crud, schemas, database
+from . import config, crud, schemas, database
 from app.models.board import Board
 from app.models.post import Post
-from app.services.excel_parsing import parsing_excel_file
+from app.models.job import IngestionJob
+from app.models.match import Report
+from app.models.player import Player
+from app.services import admission, analytics, board_purge, exports, jobs, leaderboard, players, reports, search, snapshots
+from app.services.cache import board_cache
+from app.services.etags import make_etag, aggregate_version, etag_matches
+from app.services.metrics import MetricsMiddleware
+from app.services.schema import ensure_schema
+from app.services.ingestion import delete_report
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.uploads import spool_upload_file, remove_spooled_file
 
 def init_db():
-    database.Base.metadata.create_all(bind=database.engine)
+    ensure_schema(database.engine)
+
+def not_modified(response: Response, etag: str, if_none_match: Optional[str]) -> Optional[Response]:
+    # Returns the 304 response when the client's copy is current, before the payload is serialized.
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+def json_rows(response: Response, rows: list) -> ORJSONResponse:
+    # Fast path for list endpoints: rows go straight to orjson, skipping response_model validation and
+    # the stdlib encoder. Headers set on the injected response are carried over as raw pairs, the way
+    # FastAPI merges them, so repeated headers such as Set-Cookie are all kept.
+    json_response = ORJSONResponse([row if isinstance(row, dict) else row._asdict() for row in rows])
+    json_response.raw_headers.extend(response.raw_headers)
+    return json_response
 
 def get_application() -> FastAPI:
     application = FastAPI()
+    application.add_middleware(admission.UploadAdmissionMiddleware)
+    application.add_middleware(MetricsMiddleware) # outermost, so rejected uploads are measured too
     return application
 
-@contextmanager
 def get_db():
     db = database.SessionLocal()
     try:
@@ -24,45 +53,73 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
 app = get_application()
 
 @app.on_event("startup")
 def on_startup():
     init_db()
+    jobs.recover_unfinished_jobs()
+
+@app.on_event("startup")
+async def on_startup_resume_purges():
+    board_purge.resume_purges()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    jobs.shutdown()
 
 @app.get("/", status_code=status.HTTP_200_OK)
 async def root() -> dict:
     return {"message":"Hello World"}
 
+@app.get("/metrics", status_code=status.HTTP_200_OK, include_in_schema=False)
+async def retrieve_metrics() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.post("/boards/", status_code=status.HTTP_201_CREATED, response_model=schemas.BoardResponse)
-async def create_board(board: schemas.BoardRequest, db: Session = Depends(get_db)) -> Board:
-    db_board = crud.get_board_by_name(db, name=board.name)
+async def create_board(board: schemas.BoardRequest, db: AsyncSession = Depends(get_async_db)) -> Board:
+    db_board = await board_cache.get_by_name(db, name=board.name)
     if db_board:
         raise HTTPException(status_code=400, detail="Board with this name already exist")
-    return crud.create_board(db=db, board=board)
+    db_board = await crud.create_board(db=db, board=board)
+    board_cache.invalidate(db_board.id, db_board.name)
+    return db_board
 
 @app.get("/boards/{boardId}", status_code=status.HTTP_200_OK, response_model=schemas.BoardResponse)
-async def retrieve_board(boardId: int, db: Session = Depends(get_db)) -> Optional[Board]:
-    db_board = crud.get_board_by_id(db, id=boardId)
-    if db_board is None:
+async def retrieve_board(boardId: int, response: Response, if_none_match: Optional[str] = Header(default=None),
+                         db: AsyncSession = Depends(get_async_db)) -> Optional[schemas.BoardResponse]:
+    version = await crud.get_board_updated_at(db, id=boardId)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Board with this ID does not exist")
+    if not_modified_response := not_modified(response, make_etag("board", boardId, version.updated_at), if_none_match):
+        return not_modified_response
+    db_board = await board_cache.get_by_id_at(db, boardId, version.updated_at)
+    if db_board is None: # deleted since the version was read
         raise HTTPException(status_code=404, detail="Board with this ID does not exist")
     return db_board
 
 @app.get("/boards/", status_code=status.HTTP_200_OK, response_model=List[schemas.BoardResponse])
-async def retrieve_all_boards(db: Session = Depends(get_db)) -> List[Board]:
-    db_board = crud.get_all_boards(db)
+async def retrieve_all_boards(response: Response, if_none_match: Optional[str] = Header(default=None),
+                              db: AsyncSession = Depends(get_async_db)) -> Response:
+    db_board = await board_cache.get_all(db)
     if not db_board: # This checks for an empty list as well as None
         raise HTTPException(status_code=404, detail="Boards do not exist")
-    return db_board
+    etag = make_etag("boards", *aggregate_version(board["updated_at"] for board in db_board))
+    return not_modified(response, etag, if_none_match) or json_rows(response, db_board)
 
 @app.patch("/boards/{boardId}", status_code=status.HTTP_200_OK, response_model=schemas.BoardResponse)    
-async def modify_board(boardId: int, board: schemas.BoardRequest, db: Session = Depends(get_db)) -> Optional[Board]:
-    db_board_by_id = crud.get_board_by_id(db, id=boardId)
+async def modify_board(boardId: int, board: schemas.BoardRequest, db: AsyncSession = Depends(get_async_db)) -> Optional[Board]:
+    db_board_by_id = await crud.get_board_by_id(db, id=boardId)
     if db_board_by_id is None:
         raise HTTPException(status_code=404, detail="Board with this ID does not exist")
+    old_name = db_board_by_id.name
     
     if board.name and board.name != db_board_by_id.name:
-        db_board_by_name = crud.get_board_by_name(db, name=board.name)
+        db_board_by_name = await crud.get_board_by_name(db, name=board.name)
         if db_board_by_name:
             raise HTTPException(status_code=400, detail="Board with this name already exist")
         db_board_by_id.name = board.name
@@ -70,77 +127,312 @@ async def modify_board(boardId: int, board: schemas.BoardRequest, db: Session =
     if board.description:
         db_board_by_id.description = board.description
 
-    db.commit()
-    db.refresh(db_board_by_id)
-
-    return db_board_by_id
+    db_board = await crud.update_board(db, db_board_by_id)
+    board_cache.invalidate(boardId, old_name, db_board.name)
+    return db_board
 
 @app.delete("/boards/{boardId}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_board(boardId:int, db: Session = Depends(get_db)):
-    db_board_num_to_delete = crud.delete_board(db, id=boardId)
+async def delete_board(boardId:int, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    db_board = await board_cache.get_by_id(db, id=boardId)
+    db_board_num_to_delete = db_board is not None and await crud.delete_board(db, id=boardId)
     if not db_board_num_to_delete:
         raise HTTPException(status_code=404, detail="Board with this ID does not exist")
+    board_cache.invalidate(boardId, db_board.name)
+    background_tasks.add_task(board_purge.purge_board, boardId) # posts are removed after the response
     
 @app.post("/boards/{boardId}/posts/", status_code=status.HTTP_201_CREATED, response_model=schemas.PostResponse)
-async def create_post(boardId: int, post: schemas.PostRequest, db: Session=Depends(get_db)) -> Post:
-    db_board = crud.get_board_by_id(db, id=boardId)
+async def create_post(boardId: int, post: schemas.PostRequest, db: AsyncSession = Depends(get_async_db)) -> Post:
+    db_board = await board_cache.get_by_id(db, id=boardId)
     if db_board is None:
         raise HTTPException(status_code=404, detail="Board with this ID does not exist")
-    return crud.create_post(db=db, post=post, board_id=boardId)
+    db_post = await crud.create_post(db=db, post=post, board_id=boardId)
+    if db_post is None: # deleted after the cached lookup
+        board_cache.invalidate(boardId, db_board.name)
+        raise HTTPException(status_code=404, detail="Board with this ID does not exist")
+    board_cache.invalidate_stats(boardId, db_board.name) # post_count and last_post_at changed
+    return db_post
 
 @app.get("/boards/{boardId}/posts/{postId}", status_code=status.HTTP_200_OK, response_model=schemas.PostResponse)
-async def retrieve_post(boardId: int, postId: int, db: Session=Depends(get_db)) -> Optional[Post]:
-    db_board = crud.get_board_by_id(db, id=boardId)
+async def retrieve_post(boardId: int, postId: int, response: Response, if_none_match: Optional[str] = Header(default=None),
+                        db: AsyncSession = Depends(get_async_db)) -> Optional[Post]:
+    db_board = await board_cache.get_by_id(db, id=boardId)
     if db_board is None:
         raise HTTPException(status_code=404, detail="Board with this ID does not exist")
-    db_post = crud.get_post_by_id(db, boardId, postId)
+    db_post = await crud.get_post_by_id(db, boardId, postId)
     if db_post is None:
         raise HTTPException(status_code=404, detail="Post with this ID does not exist")
-    return db_post
+    return not_modified(response, make_etag("post", db_post.id, db_post.updated_at), if_none_match) or db_post
 
 @app.get("/boards/{boardId}/posts/", status_code=status.HTTP_200_OK, response_model=List[schemas.PostResponse])
-async def retrieve_posts(boardId: int, offset: int, limit: int, db: Session=Depends(get_db)) -> List[Post]:
-    db_board = crud.get_board_by_id(db, id=boardId)
-    if db_board is None:
+async def retrieve_posts(boardId: int, response: Response, limit: int = Query(ge=1, le=100), offset: Optional[int] = Query(default=None, ge=0),
+                         order_by: Literal["id", "timestamp"] = "id", after: Optional[str] = None,
+                         before: Optional[str] = None, if_none_match: Optional[str] = Header(default=None),
+                         db: AsyncSession = Depends(get_async_db)) -> Response:
+    version = await crud.get_board_updated_at(db, id=boardId)
+    if version is None:
         raise HTTPException(status_code=404, detail="Board with this ID does not exist")
-    db_posts = crud.get_posts_by_board_id(db, board_id=boardId, offset=offset, limit=limit)
+    # Every post write bumps the board's updated_at, so it versions any page of the board's posts.
+    etag = make_etag("posts", boardId, version.updated_at, limit, offset, order_by, after, before)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    if offset is not None and after is None and before is None: # offset paging fallback
+        db_posts = await crud.get_posts_by_board_id(db, board_id=boardId, offset=offset, limit=limit)
+    else:
+        if after is not None and before is not None:
+            raise HTTPException(status_code=400, detail="Only one of after and before can be given")
+        try:
+            after_key = decode_cursor(after, order_by) if after is not None else None
+            before_key = decode_cursor(before, order_by) if before is not None else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        db_posts, has_more = await crud.get_posts_by_board_id_keyset(db, board_id=boardId, limit=limit, order_by=order_by,
+                                                               after=after_key, before=before_key)
+        # has_more looks past the page in the direction of travel; a page reached from a cursor
+        # always has posts back the way it came.
+        has_next = has_more if before is None else True
+        has_prev = has_more if before is not None else after is not None
+        if db_posts and has_next:
+            response.headers["X-Next-Cursor"] = encode_cursor(order_by, db_posts[-1])
+        if db_posts and has_prev:
+            response.headers["X-Prev-Cursor"] = encode_cursor(order_by, db_posts[0])
+
     if not db_posts: # This checks for an empty list as well as None
         raise HTTPException(status_code=404, detail="No posts found")
-    return db_posts
+    response.headers["ETag"] = etag
+    return json_rows(response, db_posts)
     
 @app.patch("/boards/{boardId}/posts/{postId}", status_code=status.HTTP_200_OK, response_model=schemas.PostResponse)    
-async def modify_post(boardId: int, postId: int, post: schemas.PostResponse, db: Session = Depends(get_db)) -> Optional[Post]:
-    db_board = crud.get_board_by_id(db, id=boardId)
+async def modify_post(boardId: int, postId: int, post: schemas.PostResponse, db: AsyncSession = Depends(get_async_db)) -> Optional[Post]:
+    db_board = await board_cache.get_by_id(db, id=boardId)
     if db_board is None:
         raise HTTPException(status_code=404, detail="Board with this ID does not exist")
     
-    db_post = crud.get_post_by_id(db, boardId, postId)
+    db_post = await crud.get_post_by_id(db, boardId, postId)
     if db_post is None:
         raise HTTPException(status_code=404, detail="Post with this ID does not exist")
     
-    updated_post = crud.update_post(db, db_post, post)
+    old_board_id = db_post.board_id
+    updated_post = await crud.update_post(db, db_post, post)
+    if updated_post is None: # this board or the target board is deleted
+        board_cache.invalidate(old_board_id, db_board.name)
+        board_cache.invalidate(post.board_id)
+        raise HTTPException(status_code=404, detail="Board with this ID does not exist")
+    board_cache.invalidate_stats(old_board_id, db_board.name)
+    if updated_post.board_id != old_board_id: # moved to another board
+        new_board = await board_cache.get_by_id(db, id=updated_post.board_id)
+        board_cache.invalidate_stats(updated_post.board_id, *([new_board.name] if new_board else []))
     return updated_post
 
 @app.delete("/boards/{boardId}/posts/{postId}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_post(boardId: int, postId: int, db: Session = Depends(get_db)):
-    db_board = crud.get_board_by_id(db, id=boardId)
+async def delete_post(boardId: int, postId: int, db: AsyncSession = Depends(get_async_db)):
+    db_board = await board_cache.get_by_id(db, id=boardId)
     if db_board is None:
         raise HTTPException(status_code=404, detail="Board with this ID does not exist")
     
-    db_post = crud.get_post_by_id(db, boardId, postId)
+    db_post = await crud.get_post_by_id(db, boardId, postId)
     if db_post is None:
         raise HTTPException(status_code=404, detail="Post with this ID does not exist")
     
-    crud.delete_post(db, db_post)
+    await crud.delete_post(db, db_post)
+    board_cache.invalidate_stats(boardId, db_board.name)
+
+@app.post("/boards/{boardId}/posts:batch", status_code=status.HTTP_200_OK, response_model=schemas.PostBatchResponse)
+async def batch_posts(boardId: int, batch: schemas.PostBatchRequest, db: AsyncSession = Depends(get_async_db)) -> dict:
+    # Creates, patches and deletes many posts in one transaction and reports a result per item.
+    db_board = await board_cache.get_by_id(db, id=boardId)
+    if db_board is None:
+        raise HTTPException(status_code=404, detail="Board with this ID does not exist")
+    if len(batch.create) + len(batch.update) + len(batch.delete) > config.POST_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch can hold at most {config.POST_BATCH_MAX_ITEMS} items")
+
+    results = []
+    try:
+        created_ids = await crud.create_posts(db, batch.create, board_id=boardId)
+        results += [{"op": "create", "index": index, "status": 201, "id": id} for index, id in enumerate(created_ids)]
+
+        found = await crud.get_post_ids(db, boardId, [post.id for post in batch.update])
+        await crud.update_posts(db, [post for post in batch.update if post.id in found])
+        results += [{"op": "update", "index": index, "status": 200, "id": post.id} if post.id in found else
+                    {"op": "update", "index": index, "status": 404, "id": post.id, "error": "Post with this ID does not exist"}
+                    for index, post in enumerate(batch.update)]
+
+        found = await crud.get_post_ids(db, boardId, batch.delete)
+        await crud.delete_posts(db, list(found))
+        results += [{"op": "delete", "index": index, "status": 204, "id": id} if id in found else
+                    {"op": "delete", "index": index, "status": 404, "id": id, "error": "Post with this ID does not exist"}
+                    for index, id in enumerate(batch.delete)]
+        if not await crud.update_board_stats(db, boardId, len(created_ids) - len(found)):
+            raise HTTPException(status_code=404, detail="Board with this ID does not exist")
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        board_cache.invalidate(boardId, db_board.name)
+        raise
+    board_cache.invalidate_stats(boardId, db_board.name)
+    return {"results": results}
+
+def export_response(query, format: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(exports.stream_rows(query, format), media_type=exports.MEDIA_TYPES[format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'})
+
+@app.get("/boards/{boardId}/posts:export", status_code=status.HTTP_200_OK)
+async def export_posts(boardId: int, format: Literal["ndjson", "csv"] = "ndjson",
+                       db: AsyncSession = Depends(get_async_db)) -> StreamingResponse:
+    db_board = await board_cache.get_by_id(db, id=boardId)
+    if db_board is None:
+        raise HTTPException(status_code=404, detail="Board with this ID does not exist")
+    return export_response(exports.post_export_query(boardId), format, f"board-{boardId}-posts")
+
+@app.get("/exports/player-stats", status_code=status.HTTP_200_OK)
+async def export_player_stats(format: Literal["ndjson", "csv"] = "ndjson") -> StreamingResponse:
+    return export_response(exports.player_stat_export_query(), format, "player-stats")
+
+@app.get("/exports/team-results", status_code=status.HTTP_200_OK)
+async def export_team_results(format: Literal["ndjson", "csv"] = "ndjson") -> StreamingResponse:
+    return export_response(exports.team_result_export_query(), format, "team-results")
+
+@app.get("/snapshots/{table}", status_code=status.HTTP_200_OK)
+def retrieve_snapshot(table: Literal["player_stats", "team_results"]) -> StreamingResponse:
+    # A sync route: Parquet reads block, so FastAPI runs it in the threadpool.
+    return StreamingResponse(snapshots.stream_snapshot(table), media_type=snapshots.ARROW_STREAM_MEDIA_TYPE,
+                             headers={"Content-Disposition": f'attachment; filename="{table}.arrows"'})
+
+@app.get("/snapshots/{table}/{reportId}", status_code=status.HTTP_200_OK)
+def retrieve_snapshot_partition(table: Literal["player_stats", "team_results"], reportId: int) -> FileResponse:
+    path = snapshots.partition_path(table, reportId)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Snapshot of this report does not exist")
+    return FileResponse(path, media_type="application/vnd.apache.parquet", filename=os.path.basename(path))
+
+async def enqueue_upload(file: UploadFile, db: AsyncSession, kind: str, replace: bool,
+                         report_id: Optional[int] = None) -> dict:
+    path, content_hash = await spool_upload_file(file)
+    db_job = await jobs.get_job_by_content_hash(db, content_hash, kind=kind)
+    if db_job is not None: # the same file was already received
+        remove_spooled_file(path)
+        return {"message": "File already received.", "job_id": db_job.id}
+
+    db_job = await jobs.create_job(db, filename=file.filename, path=path, content_hash=content_hash, kind=kind,
+                                   replace=replace, report_id=report_id)
+    jobs.submit_job(db_job.id)
+    return {"message": "File received. Processing in background.", "job_id": db_job.id}
+
+@app.post("/uploadfile/", status_code=status.HTTP_202_ACCEPTED)
+async def create_upload_file(file: UploadFile, replace: bool = False, reportId: Optional[int] = None,
+                             db: AsyncSession = Depends(get_async_db)):
+    # A corrected sheet names the game it updates: reportId, or replace=true for the game previously
+    # uploaded under the same file name. Without either the sheet is a new game.
+    if reportId is not None and await db.get(Report, reportId) is None:
+        raise HTTPException(status_code=404, detail="Report with this ID does not exist")
+    return await enqueue_upload(file, db, kind=IngestionJob.SINGLE, replace=replace, report_id=reportId)
+
+@app.post("/uploads/batch", status_code=status.HTTP_202_ACCEPTED)
+async def create_batch_upload(file: UploadFile, replace: bool = False, db: AsyncSession = Depends(get_async_db)):
+    # A workbook with one game per sheet, or a zip of such workbooks.
+    return await enqueue_upload(file, db, kind=IngestionJob.BATCH, replace=replace)
+
+@app.get("/uploads/queue", status_code=status.HTTP_200_OK, response_model=schemas.UploadQueueResponse)
+async def retrieve_upload_queue() -> dict:
+    return admission.queue_depth()
+
+@app.get("/uploads/{jobId}", status_code=status.HTTP_200_OK, response_model=schemas.UploadJobResponse)
+async def retrieve_upload_job(jobId: int, db: AsyncSession = Depends(get_async_db)) -> Optional[IngestionJob]:
+    db_job = await jobs.get_job_by_id(db, id=jobId)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Upload job with this ID does not exist")
+    return db_job
+
+@app.get("/reports/", status_code=status.HTTP_200_OK, response_model=List[schemas.ReportResponse])
+async def retrieve_reports(offset: int = Query(default=0, ge=0), limit: int = Query(default=20, ge=1, le=100),
+                           include_report: bool = False, db: AsyncSession = Depends(get_async_db)):
+    db_reports = await reports.get_box_scores(db, offset=offset, limit=limit, include_report=include_report)
+    model = schemas.ReportResponse if include_report else schemas.BoxScoreResponse
+    return [model.model_validate(db_report, from_attributes=True) for db_report in db_reports]
+
+@app.get("/reports/{reportId}", status_code=status.HTTP_200_OK, response_model=schemas.ReportResponse)
+async def retrieve_report(reportId: int, include_report: bool = False,
+                          db: AsyncSession = Depends(get_async_db)):
+    db_report = await reports.get_box_score(db, reportId, include_report=include_report)
+    if db_report is None:
+        raise HTTPException(status_code=404, detail="Report with this ID does not exist")
+    # The narrative is deferred unless requested, so only validate it into the response when loaded.
+    model = schemas.ReportResponse if include_report else schemas.BoxScoreResponse
+    return model.model_validate(db_report, from_attributes=True)
+
+@app.delete("/reports/{reportId}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_report(reportId: int, db: Session = Depends(get_db)):
+    # Shares the synchronous ingestion writer, so FastAPI runs it in the threadpool.
+    if not delete_report(db, reportId):
+        raise HTTPException(status_code=404, detail="Report with this ID does not exist")
+    snapshots.remove_report_snapshots(reportId)
+
+@app.get("/leaderboards/players", status_code=status.HTTP_200_OK, response_model=List[schemas.PlayerLeaderboardEntry])
+async def retrieve_player_leaderboard(stat: schemas.LeaderboardStat = schemas.LeaderboardStat.points,
+                                      limit: int = Query(default=10, ge=1, le=100),
+                                      db: AsyncSession = Depends(get_async_db)) -> List[dict]:
+    leaders = await leaderboard.get_player_leaders(db, stat.value, limit)
+    return [{"player_id": total.player_id, "team": total.team, "player": total.player, "backnumber": total.backnumber, "games": total.games,
+             "value": getattr(total, stat.value), "average": getattr(total, stat.value) / total.games}
+            for total in leaders]
+
+@app.get("/leaderboards/teams", status_code=status.HTTP_200_OK, response_model=List[schemas.TeamLeaderboardEntry])
+async def retrieve_team_leaderboard(stat: schemas.LeaderboardStat = schemas.LeaderboardStat.points,
+                                    limit: int = Query(default=10, ge=1, le=100),
+                                    db: AsyncSession = Depends(get_async_db)) -> List[dict]:
+    leaders = await leaderboard.get_team_leaders(db, stat.value, limit)
+    return [{"team": total.team, "games": total.games, "wins": total.wins, "losses": total.losses,
+             "value": getattr(total, stat.value), "average": getattr(total, stat.value) / total.games}
+            for total in leaders]
+
+@app.get("/analytics/players", status_code=status.HTTP_200_OK, response_model=List[schemas.PlayerAnalyticsEntry])
+async def retrieve_player_analytics(response: Response,
+                                    sort: Literal["efficiency", "points_per_game", "clutch_points", "clutch_share"] = "efficiency",
+                                    team: Optional[str] = None, limit: int = Query(default=20, ge=1, le=500),
+                                    if_none_match: Optional[str] = Header(default=None),
+                                    db: AsyncSession = Depends(get_async_db)) -> List[dict]:
+    version, stats = await analytics.get_season_stats(db)
+    etag = make_etag("analytics-players", version, sort, team, limit)
+    return not_modified(response, etag, if_none_match) or analytics.sort_players(stats["players"], sort, team, limit)
+
+@app.get("/analytics/teams", status_code=status.HTTP_200_OK, response_model=List[schemas.TeamAnalyticsEntry])
+async def retrieve_team_analytics(response: Response, if_none_match: Optional[str] = Header(default=None),
+                                  db: AsyncSession = Depends(get_async_db)) -> List[dict]:
+    version, stats = await analytics.get_season_stats(db)
+    return not_modified(response, make_etag("analytics-teams", version), if_none_match) or stats["teams"]
+
+@app.get("/players/", status_code=status.HTTP_200_OK, response_model=List[schemas.PlayerResponse])
+async def retrieve_players(name: Optional[str] = None, team: Optional[str] = None,
+                           offset: int = Query(default=0, ge=0), limit: int = Query(default=20, ge=1, le=100),
+                           db: AsyncSession = Depends(get_async_db)) -> List[Player]:
+    return await players.find_players(db, name=name, team=team, offset=offset, limit=limit)
+
+@app.get("/players/{playerId}", status_code=status.HTTP_200_OK, response_model=schemas.PlayerCareerResponse)
+async def retrieve_player_career(playerId: int, db: AsyncSession = Depends(get_async_db)) -> dict:
+    db_player = await players.get_player(db, playerId)
+    if db_player is None:
+        raise HTTPException(status_code=404, detail="Player with this ID does not exist")
+    career = await players.get_career(db, playerId)
+    return dict(career, id=db_player.id, name=db_player.name, team=db_player.team, backnumber=db_player.backnumber)
+
+@app.get("/players/{playerId}/games", status_code=status.HTTP_200_OK, response_model=List[schemas.GameLogEntry])
+async def retrieve_player_games(playerId: int, offset: int = Query(default=0, ge=0),
+                                limit: int = Query(default=20, ge=1, le=100),
+                                db: AsyncSession = Depends(get_async_db)) -> List[dict]:
+    if await players.get_player(db, playerId) is None:
+        raise HTTPException(status_code=404, detail="Player with this ID does not exist")
+    return await players.get_game_log(db, playerId, offset=offset, limit=limit)
 
-@app.post("/uploadfile/")
-async def create_upload_file(file: UploadFile, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    def parsing_excel_file_task(file: UploadFile, db: Session):
-        with get_db() as db_session:
-            parsing_excel_file(file, db_session)
+@app.get("/search/posts", status_code=status.HTTP_200_OK, response_model=List[schemas.PostSearchResult])
+async def search_posts(q: str = Query(min_length=1), boardId: Optional[int] = None,
+                       limit: int = Query(default=20, ge=1, le=100), offset: int = Query(default=0, ge=0),
+                       db: AsyncSession = Depends(get_async_db)) -> List[dict]:
+    return await search.search_posts(db, q, limit=limit, offset=offset, board_id=boardId)
 
-    background_tasks.add_task(parsing_excel_file_task, file, db)
-    return {"message": "File received. Processing in background."}
+@app.get("/search/reports", status_code=status.HTTP_200_OK, response_model=List[schemas.ReportSearchResult])
+async def search_reports(q: str = Query(min_length=1), limit: int = Query(default=20, ge=1, le=100),
+                         offset: int = Query(default=0, ge=0), db: AsyncSession = Depends(get_async_db)) -> List[dict]:
+    return await search.search_reports(db, q, limit=limit, offset=offset)
 
 if __name__ == '__main__':
     uvicorn.run("main:app", host="127.0.0.1", port=8000,
@@ -1,3 +1,4 @@
+from datetime import datetime
 from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime
 from sqlalchemy.orm import relationship
 
@@ -10,6 +11,13 @@ class Board(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True)
     description = Column(String, nullable=True)
+    # Denormalized post stats, kept in step by the post write paths in crud (see crud.update_board_stats).
+    post_count = Column(Integer, nullable=False, default=0, server_default='0')
+    last_post_at = Column(DateTime, nullable=True)
+    # Bumped by every board write, including the post stats update, so it versions the board's posts too.
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set when the board is deleted; its posts are purged in the background, then the row itself.
+    deleted_at = Column(DateTime, nullable=True)
 
     posts = relationship("Post", order_by=Post.id, back_populates="board")
 
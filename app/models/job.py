@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, JSON
+
+from app.database import Base
+
+class IngestionJob(Base):
+    __tablename__ = 'ingestion_jobs'
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    SINGLE = 'single' # first sheet of one workbook
+    BATCH = 'batch' # every sheet of a workbook or of each workbook in a zip
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, default=SINGLE)
+    filename = Column(String)
+    path = Column(String) # spooled upload, removed once the job finishes
+    content_hash = Column(String, index=True)
+    replace = Column(Boolean, default=False) # overwrite the report previously uploaded under the same name
+    report_id = Column(Integer, nullable=True) # the report a corrected sheet updates, see ingestion.save_report
+    state = Column(String, index=True, default=QUEUED)
+    attempts = Column(Integer, default=0)
+    # The worker running the job and until when it holds it; the worker renews the lease while it runs.
+    owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    error = Column(String, nullable=True)
+    report_ids = Column(JSON, nullable=True)
+    sheet_results = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
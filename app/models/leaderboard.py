@@ -0,0 +1,47 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+
+from app.database import Base
+from app.models.player import Player # registers the players table for the player_id foreign key
+
+# Season totals maintained by the ingestion pipeline; every stat column is indexed for top-N reads.
+
+class PlayerTotal(Base):
+    __tablename__ = 'player_totals'
+    # Keyed on the resolved player, so name variants of one player share a row.
+    __table_args__ = (Index('ux_player_totals_player_id', 'player_id', unique=True),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    player_id = Column(Integer, ForeignKey('players.id'))
+    team = Column(String) # team, player and backnumber as first seen
+    player = Column(String)
+    backnumber = Column(Integer)
+    games = Column(Integer, default=0)
+    points = Column(Integer, default=0, index=True)
+    rebounds = Column(Integer, default=0, index=True)
+    assists = Column(Integer, default=0, index=True)
+    steals = Column(Integer, default=0, index=True)
+    blocks = Column(Integer, default=0, index=True)
+    score_1Q = Column(Integer, default=0, index=True)
+    score_2Q = Column(Integer, default=0, index=True)
+    score_3Q = Column(Integer, default=0, index=True)
+    score_4Q = Column(Integer, default=0, index=True)
+    score_OT = Column(Integer, default=0, index=True)
+
+class TeamTotal(Base):
+    __tablename__ = 'team_totals'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    team = Column(String, unique=True)
+    games = Column(Integer, default=0)
+    wins = Column(Integer, default=0, index=True)
+    losses = Column(Integer, default=0)
+    points = Column(Integer, default=0, index=True)
+    rebounds = Column(Integer, default=0, index=True)
+    assists = Column(Integer, default=0, index=True)
+    steals = Column(Integer, default=0, index=True)
+    blocks = Column(Integer, default=0, index=True)
+    score_1Q = Column(Integer, default=0, index=True)
+    score_2Q = Column(Integer, default=0, index=True)
+    score_3Q = Column(Integer, default=0, index=True)
+    score_4Q = Column(Integer, default=0, index=True)
+    score_OT = Column(Integer, default=0, index=True)
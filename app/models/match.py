@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, create_engine
 from sqlalchemy.orm import relationship, sessionmaker
 
 from app.database import Base
+from app.models.player import Player # registers the players table for the player_id foreign key
 
 
 class Report(Base):
@@ -9,25 +10,33 @@ class Report(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     report = Column(String)
+    source = Column(String, index=True) # uploaded file name, the target of replace=true re-uploads
+    content_hash = Column(String, unique=True, index=True)
 
-    team_results = relationship('TeamResult', back_populates='report', cascade='all, delete, delete-orphan')
+    team_results = relationship('TeamResult', back_populates='report', cascade='all, delete, delete-orphan',
+                                order_by='TeamResult.id')
 
 class TeamResult(Base):
     __tablename__ = 'team_results'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    report_id = Column(Integer, ForeignKey('reports.id'), nullable=False)
+    report_id = Column(Integer, ForeignKey('reports.id'), nullable=False, index=True)
     team = Column(String)
     result = Column(String)
+    block_hash = Column(String)
 
     report = relationship('Report', back_populates='team_results')
-    player_stats = relationship('PlayerStat', back_populates='team_result', cascade='all, delete, delete-orphan')
+    player_stats = relationship('PlayerStat', back_populates='team_result', cascade='all, delete, delete-orphan',
+                                order_by='PlayerStat.id')
 
 class PlayerStat(Base):
     __tablename__ = 'player_stats'
+    # Career and game-log reads go through (player_id, team_result_id) instead of scanning names.
+    __table_args__ = (Index('ix_player_stats_player_id_team_result_id', 'player_id', 'team_result_id'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    team_result_id = Column(Integer, ForeignKey('team_results.id'), nullable=False)
+    team_result_id = Column(Integer, ForeignKey('team_results.id'), nullable=False, index=True)
+    player_id = Column(Integer, ForeignKey('players.id'))
     backnumber = Column(Integer)
     player = Column(String)
     offense_rebound = Column(Integer)
@@ -44,3 +53,21 @@ class PlayerStat(Base):
     score_Total = Column(Integer)
 
     team_result = relationship('TeamResult', back_populates='player_stats')
+
+# The PlayerStat columns a score sheet fills, in sheet column order; parsing, ingestion, game logs,
+# exports and snapshots all read this list.
+PLAYER_STAT_FIELDS = [
+    'backnumber', 'player',
+    'offense_rebound', 'defense_rebound', 'total_rebound',
+    'assist', 'steal', 'block',
+    'score_1Q', 'score_2Q', 'score_3Q', 'score_4Q', 'score_OT', 'score_Total',
+]
+
+class MatchVersion(Base):
+    # A single row bumped by every write to match data, so readers version it with one lookup.
+    # epoch is drawn when the row is created, so a recreated database never repeats a version.
+    __tablename__ = 'match_version'
+
+    id = Column(Integer, primary_key=True)
+    epoch = Column(String, nullable=False)
+    version = Column(Integer, nullable=False, default=0)
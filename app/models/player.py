@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Index, Integer, String, func
+
+from app.database import Base
+
+class Player(Base):
+    __tablename__ = 'players'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String) # as first seen on a score sheet
+    normalized_name = Column(String, index=True)
+    team = Column(String)
+    backnumber = Column(Integer)
+
+# A player is identified by normalized name + team + backnumber, see services/players.normalize_name.
+# A missing team or backnumber is coalesced, since a plain unique constraint treats NULLs as distinct.
+Index('ux_players_identity', Player.normalized_name, func.coalesce(Player.team, ''),
+      func.coalesce(Player.backnumber, -1), unique=True)
@@ -1,17 +1,23 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
 
 class Post(Base):
     __tablename__ = 'posts'
+    __table_args__ = (
+        # keyset pagination within a board, see crud.get_posts_by_board_id_keyset
+        Index('ix_posts_board_id_id', 'board_id', 'id'),
+        Index('ix_posts_board_id_timestamp_id', 'board_id', 'timestamp', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     content = Column(String)
     author = Column(String, index=True)
     timestamp = Column(DateTime, index=True, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     board_id = Column(Integer, ForeignKey('boards.id'))
 
     board = relationship("Board", back_populates="posts")
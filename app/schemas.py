@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from pydantic import BaseModel
 
 class BoardRequest(BaseModel):
@@ -9,6 +10,9 @@ class BoardResponse(BaseModel):
     id: int
     name: str
     description: str | None = None
+    post_count: int = 0
+    last_post_at: datetime | None = None
+    updated_at: datetime | None = None
 
 class PostRequest(BaseModel):
     title: str
@@ -22,4 +26,170 @@ class PostResponse(BaseModel):
     author: str
     timestamp: datetime
     board_id: int 
+    updated_at: datetime | None = None
+
+class PostPatch(BaseModel):
+    id: int
+    title: str | None = None
+    content: str | None = None
+    author: str | None = None
+
+class PostBatchRequest(BaseModel):
+    create: list[PostRequest] = []
+    update: list[PostPatch] = []
+    delete: list[int] = []
+
+class PostBatchResult(BaseModel):
+    op: str
+    index: int # position in the request list of that operation
+    status: int
+    id: int | None = None
+    error: str | None = None
+
+class PostBatchResponse(BaseModel):
+    results: list[PostBatchResult]
         
+
+class SheetResult(BaseModel):
+    source: str
+    state: str
+    report_id: int | None = None
+    error: str | None = None
+
+class UploadJobResponse(BaseModel):
+    id: int
+    kind: str
+    filename: str | None = None
+    state: str
+    attempts: int
+    error: str | None = None
+    report_ids: list[int] | None = None
+    sheet_results: list[SheetResult] | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+class UploadQueueResponse(BaseModel):
+    running: int
+    queued: int
+    receiving: int
+    capacity: int
+
+class PlayerStatResponse(BaseModel):
+    backnumber: int | None = None
+    player: str | None = None
+    offense_rebound: int | None = None
+    defense_rebound: int | None = None
+    total_rebound: int | None = None
+    assist: int | None = None
+    steal: int | None = None
+    block: int | None = None
+    score_1Q: int | None = None
+    score_2Q: int | None = None
+    score_3Q: int | None = None
+    score_4Q: int | None = None
+    score_OT: int | None = None
+    score_Total: int | None = None
+
+class TeamResultResponse(BaseModel):
+    team: str | None = None
+    result: str | None = None
+    player_stats: list[PlayerStatResponse]
+
+class BoxScoreResponse(BaseModel):
+    id: int
+    source: str | None = None
+    team_results: list[TeamResultResponse]
+
+class ReportResponse(BoxScoreResponse):
+    report: str | None = None
+
+class PlayerResponse(BaseModel):
+    id: int
+    name: str | None = None
+    team: str | None = None
+    backnumber: int | None = None
+
+class PlayerCareerResponse(PlayerResponse):
+    games: int
+    wins: int
+    losses: int
+    totals: dict[str, int]
+    averages: dict[str, float]
+
+class GameLogEntry(PlayerStatResponse):
+    report_id: int
+    source: str | None = None
+    team: str | None = None
+    result: str | None = None
+    opponent: str | None = None
+
+class LeaderboardStat(str, Enum):
+    points = "points"
+    rebounds = "rebounds"
+    assists = "assists"
+    steals = "steals"
+    blocks = "blocks"
+    score_1Q = "score_1Q"
+    score_2Q = "score_2Q"
+    score_3Q = "score_3Q"
+    score_4Q = "score_4Q"
+    score_OT = "score_OT"
+
+class PlayerLeaderboardEntry(BaseModel):
+    player_id: int | None = None
+    team: str | None = None
+    player: str | None = None
+    backnumber: int | None = None
+    games: int
+    value: int
+    average: float
+
+class TeamLeaderboardEntry(BaseModel):
+    team: str | None = None
+    games: int
+    wins: int
+    losses: int
+    value: int
+    average: float
+
+class PlayerAnalyticsEntry(BaseModel):
+    player_id: int
+    player: str | None = None
+    team: str | None = None
+    backnumber: int | None = None
+    games: int
+    points_per_game: float
+    efficiency: float
+    quarter_share: dict[str, float]
+    clutch_points: int
+    clutch_points_per_game: float
+    clutch_share: float
+
+class TeamRollingEntry(BaseModel):
+    report_id: int
+    points: int
+    rebounds: int
+    assists: int
+    points_avg: float
+    rebounds_avg: float
+    assists_avg: float
+
+class TeamAnalyticsEntry(BaseModel):
+    team: str | None = None
+    games: int
+    per_game: dict[str, float]
+    rolling: list[TeamRollingEntry]
+
+class PostSearchResult(BaseModel):
+    id: int
+    board_id: int
+    title: str
+    author: str
+    timestamp: datetime
+    snippet: str | None = None
+
+class ReportSearchResult(BaseModel):
+    id: int
+    source: str | None = None
+    snippet: str | None = None
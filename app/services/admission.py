@@ -0,0 +1,111 @@
+import math
+import threading
+from prometheus_client import Gauge
+from starlette.responses import JSONResponse
+
+from app import config
+from app.services import jobs
+
+# Admission control for the upload routes: requests are turned away before their body is read
+# when the ingestion queue is full, and cut off with 413 once the body passes the size limit.
+
+UPLOAD_LIMITS = {
+    "/uploadfile/": "UPLOAD_MAX_BYTES",
+    "/uploads/batch": "BATCH_UPLOAD_MAX_BYTES",
+}
+
+lock = threading.Lock()
+receiving = 0 # admitted uploads whose body is still being received
+
+INGESTION_QUEUE_DEPTH = Gauge("ingestion_queue_depth", "Ingestion jobs waiting for a free worker")
+INGESTION_QUEUE_DEPTH.set_function(lambda: jobs.queue_depth()["queued"])
+INGESTION_RUNNING = Gauge("ingestion_jobs_running", "Ingestion jobs being processed")
+INGESTION_RUNNING.set_function(lambda: jobs.queue_depth()["running"])
+UPLOADS_RECEIVING = Gauge("uploads_receiving", "Admitted uploads whose body is still being received")
+UPLOADS_RECEIVING.set_function(lambda: receiving)
+
+class UploadTooLarge(Exception):
+    pass
+
+def queue_depth() -> dict:
+    depth = jobs.queue_depth()
+    depth["receiving"] = receiving
+    depth["capacity"] = config.INGESTION_WORKERS + config.INGESTION_QUEUE_SIZE
+    return depth
+
+def retry_after(depth: dict) -> int:
+    # Seconds until a worker is likely free: the jobs ahead spread over the workers.
+    average = jobs.average_job_seconds()
+    if average is None:
+        return config.INGESTION_RETRY_AFTER
+    waiting = depth["queued"] + depth["receiving"] + 1
+    return max(1, math.ceil(average * waiting / config.INGESTION_WORKERS))
+
+def try_admit() -> dict:
+    # An upload reserves its slot while the body is received, so concurrent uploads cannot overshoot the queue.
+    global receiving
+    with lock:
+        depth = queue_depth()
+        admitted = depth["running"] + depth["queued"] + depth["receiving"] < depth["capacity"]
+        if admitted:
+            receiving += 1
+    return dict(depth, admitted=admitted)
+
+def release():
+    global receiving
+    with lock:
+        receiving -= 1
+
+def too_large_response(limit: int) -> JSONResponse:
+    return JSONResponse({"detail": f"Upload exceeds the maximum size of {limit} bytes"}, status_code=413)
+
+class UploadAdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in UPLOAD_LIMITS:
+            return await self.app(scope, receive, send)
+
+        limit = getattr(config, UPLOAD_LIMITS[scope["path"]])
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            return await too_large_response(limit)(scope, receive, send)
+
+        admission = try_admit()
+        if not admission["admitted"]:
+            response = JSONResponse({"detail": "Ingestion queue is full"}, status_code=429,
+                                    headers={"Retry-After": str(retry_after(admission))})
+            return await response(scope, receive, send)
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def receive_with_limit():
+            # Chunked bodies have no Content-Length, so the limit is enforced on the stream as well.
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise UploadTooLarge()
+            return message
+
+        async def send_unless_exceeded(message):
+            # The form parser reports the aborted body as a 400; it is replaced by the 413.
+            nonlocal started
+            if exceeded:
+                return
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_with_limit, send_unless_exceeded)
+        except UploadTooLarge:
+            pass
+        finally:
+            release()
+        if exceeded and not started:
+            await too_large_response(limit)(scope, receive, send)
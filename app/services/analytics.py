@@ -0,0 +1,72 @@
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app import config
+from app.models.match import PLAYER_STAT_FIELDS, TeamResult, PlayerStat
+from app.services import match_version
+
+# Season-wide derived stats, computed with NumPy over every PlayerStat row at once and cached
+# per ingestion version: the match_version counter, bumped by every save_report, delete_report
+# and rebuild_players.
+
+STAT_FIELDS = [field for field in PLAYER_STAT_FIELDS if field not in ('backnumber', 'player')]
+QUARTERS = ['1Q', '2Q', '3Q', '4Q', 'OT']
+CLUTCH_QUARTERS = ['4Q', 'OT']
+# The sheets record no shot attempts or turnovers, so efficiency is the counting-stat part of
+# the EFF rating: points + rebounds + assists + steals + blocks.
+EFFICIENCY_FIELDS = ['score_Total', 'total_rebound', 'assist', 'steal', 'block']
+TEAM_FIELDS = {'points': 'score_Total', 'rebounds': 'total_rebound', 'assists': 'assist'}
+
+lock = threading.Lock()
+cache: dict = {} # ingestion version -> computed stats, only the latest version is kept
+computing: Dict[str, asyncio.Event] = {} # versions being computed, set when the computation ends
+
+async def load_stat_rows(db: AsyncSession) -> Tuple[list, list]:
+    # One query for all games; rows are ordered by game so the team series come out in order.
+    result = await db.execute(
+        select(TeamResult.report_id, PlayerStat.team_result_id, TeamResult.team, PlayerStat.player_id,
+               PlayerStat.player, PlayerStat.backnumber, *[getattr(PlayerStat, field) for field in STAT_FIELDS])
+        .join(TeamResult, TeamResult.id == PlayerStat.team_result_id)
+        .order_by(TeamResult.report_id, PlayerStat.team_result_id, PlayerStat.id)
+    )
+    rows = result.all()
+    return [row[:6] for row in rows], [row[6:] for row in rows]
+
+def compute_stats(keys: list, values: list, window: int) -> dict:
+    from app.services.season_stats import compute_stats
+    return compute_stats(keys, values, window)
+
+async def get_season_stats(db: AsyncSession) -> Tuple[str, dict]:
+    # Returns the ingestion version with the stats; a version seen before is served from the cache.
+    # Concurrent misses on one version wait for the first request's computation instead of repeating it.
+    version = await match_version.current(db)
+    while True:
+        with lock:
+            cached = cache.get(version)
+        if cached is not None:
+            return version, cached
+        done = computing.get(version)
+        if done is None:
+            break
+        await done.wait() # if that computation failed, the cache is still empty and this request retries it
+    done = computing[version] = asyncio.Event()
+    try:
+        keys, values = await load_stat_rows(db)
+        # The NumPy work runs in a worker thread so the event loop keeps serving other requests.
+        stats = await run_in_threadpool(compute_stats, keys, values, config.ANALYTICS_ROLLING_WINDOW)
+        with lock:
+            cache.clear()
+            cache[version] = stats
+    finally:
+        del computing[version]
+        done.set()
+    return version, stats
+
+def sort_players(players: List[dict], sort: str, team: Optional[str], limit: int) -> List[dict]:
+    if team is not None:
+        players = [player for player in players if player["team"] == team]
+    return sorted(players, key=lambda player: (-player[sort], player["player_id"]))[:limit]
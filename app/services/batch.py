@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app import config
+from app.services.ingestion import save_report
+
+WORKBOOK_EXTENSIONS = (".xlsx", ".xlsm")
+
+executor: Optional[ProcessPoolExecutor] = None
+
+def get_executor() -> ProcessPoolExecutor:
+    # Parsing is CPU bound, so sheets are spread over processes rather than threads.
+    # spawn keeps the workers independent of the threads running in the server process.
+    global executor
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=config.PARSE_WORKERS,
+                                       mp_context=multiprocessing.get_context("spawn"))
+    return executor
+
+def shutdown():
+    global executor
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor = None
+
+def extract_workbooks(path: str, filename: str, workdir: str) -> List[Tuple[str, str]]:
+    # Returns (source name, workbook path) pairs. Zip members are copied to generated
+    # file names so member paths never touch the file system.
+    if not filename.lower().endswith(".zip"):
+        return [(filename, path)]
+
+    workbooks, extracted = [], 0
+    with zipfile.ZipFile(path) as archive:
+        members = archive.infolist()
+        if len(members) > config.BATCH_MAX_MEMBERS:
+            raise ValueError(f"Archive holds more than {config.BATCH_MAX_MEMBERS} members")
+        for member in members:
+            name = member.filename
+            if member.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(WORKBOOK_EXTENSIONS):
+                continue
+            # zipfile stops reading a member at its declared file_size, so the headers bound the output.
+            extracted += member.file_size
+            if extracted > config.BATCH_EXTRACT_MAX_BYTES:
+                raise ValueError(f"Archive expands to more than {config.BATCH_EXTRACT_MAX_BYTES} bytes")
+            workbook_path = os.path.join(workdir, f"{len(workbooks)}{os.path.splitext(name)[1]}")
+            with archive.open(member) as source, open(workbook_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+            workbooks.append((f"{filename}/{name}", workbook_path))
+    return workbooks
+
+def failed_result(source: str, e: Exception) -> dict:
+    return {"source": source, "state": "failed", "error": f"{type(e).__name__}: {e}"}
+
+def ingest_batch(path: str, filename: str, db: Session, replace: bool = False) -> Tuple[List[int], List[dict]]:
+    # Sheets are parsed in the process pool; this thread is the single writer and saves
+    # each parsed report in its own transaction, so one bad sheet does not sink the rest.
+    from app.services.excel_parsing import list_sheet_names, parse_workbook_sheet # loads pandas on first use
+    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=config.UPLOAD_DIR) as workdir:
+        report_ids, sheet_results, tasks = [], [], []
+        for workbook_name, workbook_path in extract_workbooks(path, filename, workdir):
+            try:
+                sheet_names = list_sheet_names(workbook_path)
+            except Exception as e:
+                sheet_results.append(failed_result(workbook_name, e))
+                continue
+            for sheet_name in sheet_names:
+                future = get_executor().submit(parse_workbook_sheet, workbook_path, sheet_name)
+                tasks.append((f"{workbook_name}#{sheet_name}", future))
+
+        for source, future in tasks:
+            try:
+                report_id = save_report(db, future.result(), source=source, replace=replace)
+            except Exception as e:
+                sheet_results.append(failed_result(source, e))
+            else:
+                report_ids.append(report_id)
+                sheet_results.append({"source": source, "state": "succeeded", "report_id": report_id})
+    return report_ids, sheet_results
@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from typing import List, Optional, Set
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import config, database
+from app.models.board import Board
+from app.models.post import Post
+
+logger = logging.getLogger(__name__)
+
+# Purges open their own sessions; tests point this at the test database.
+session_factory = database.AsyncSessionLocal
+
+# Purges started at startup run as tasks; the references keep them from being garbage collected.
+tasks: Set[asyncio.Task] = set()
+
+async def delete_post_chunk(db: AsyncSession, board_id: int, chunk_size: int) -> int:
+    # One short transaction per chunk, so writers to other boards get the database lock in between.
+    # The posts_fts delete trigger removes the search entries of every deleted post. The chunk that
+    # comes up short is the last one and removes the board row in the same transaction; post writes
+    # check deleted_at in their own transaction (see crud.update_board_stats), so none can land after it.
+    chunk = select(Post.id).where(Post.board_id == board_id).order_by(Post.id).limit(chunk_size).scalar_subquery()
+    result = await db.execute(delete(Post).where(Post.id.in_(chunk)))
+    if result.rowcount < chunk_size:
+        await db.execute(delete(Board).where(Board.id == board_id))
+    await db.commit()
+    return result.rowcount
+
+async def purge_board(board_id: int, chunk_size: Optional[int] = None) -> int:
+    # Removes the posts of a board marked deleted by crud.delete_board, then the board row.
+    chunk_size = chunk_size or config.BOARD_PURGE_CHUNK_SIZE
+    purged = 0
+    async with session_factory() as db:
+        if await db.scalar(select(Board.deleted_at).where(Board.id == board_id)) is None:
+            return 0 # not marked deleted, or already purged
+        while (deleted := await delete_post_chunk(db, board_id, chunk_size)) == chunk_size:
+            purged += deleted
+            await asyncio.sleep(0) # let requests waiting on the event loop run between chunks
+        purged += deleted
+    logger.info("purged board %s: %d posts", board_id, purged)
+    return purged
+
+async def purge_deleted_boards() -> List[int]:
+    # A purge interrupted by a restart is resumed from the boards still marked deleted.
+    async with session_factory() as db:
+        board_ids = list(await db.scalars(select(Board.id).where(Board.deleted_at.is_not(None)).order_by(Board.id)))
+    for board_id in board_ids:
+        try:
+            await purge_board(board_id)
+        except Exception:
+            logger.exception("purge of board %s failed", board_id)
+    return board_ids
+
+def resume_purges():
+    task = asyncio.get_running_loop().create_task(purge_deleted_boards())
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+
+if __name__ == '__main__':
+    asyncio.run(purge_deleted_boards())
@@ -0,0 +1,19 @@
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import Session
+
+from app.models.board import Board
+from app.models.post import Post
+
+def rebuild_board_stats(db: Session):
+    # Repairs Board.post_count and Board.last_post_at from the posts table, e.g. for boards
+    # created before the columns existed or after writes that bypassed crud.
+    db.execute(update(Board).values(
+        post_count=select(func.count(Post.id)).where(Post.board_id == Board.id).scalar_subquery(),
+        last_post_at=select(func.max(Post.timestamp)).where(Post.board_id == Board.id).scalar_subquery(),
+    ))
+    db.commit()
+
+if __name__ == '__main__':
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        rebuild_board_stats(session)
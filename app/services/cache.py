@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Protocol
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import config, crud, schemas
+
+_MISSING = object()
+
+class CacheBackend(Protocol):
+    # Values are plain dicts/lists so a backend shared across workers can serialize them.
+    def get(self, key: str): ...
+    def set(self, key: str, value): ...
+    def delete(self, *keys: str): ...
+    def clear(self): ...
+
+class LRUCacheBackend:
+    # In-process backend: at most maxsize entries, each expiring ttl seconds after it was set.
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return _MISSING
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+class BoardCache:
+    # Read-through cache of boards keyed by id and by name, plus the full board list. The list holds
+    # only the fields board writes change; each board's post stats are cached under their own key,
+    # so a post write drops its board's entries without reloading the whole list.
+    ALL_KEY = "boards:all"
+    STATS_FIELDS = [column.key for column in crud.BOARD_STATS_COLUMNS]
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    @staticmethod
+    def id_key(id: int) -> str:
+        return f"board:id:{id}"
+
+    @staticmethod
+    def name_key(name: str) -> str:
+        return f"board:name:{name}"
+
+    @staticmethod
+    def stats_key(id: int) -> str:
+        return f"board:stats:{id}"
+
+    def store(self, board: schemas.BoardResponse):
+        value = board.model_dump()
+        self.backend.set(self.id_key(board.id), value)
+        self.backend.set(self.name_key(board.name), value)
+
+    async def get_by_id(self, db: AsyncSession, id: int) -> Optional[schemas.BoardResponse]:
+        value = self.backend.get(self.id_key(id))
+        if value is not _MISSING:
+            return schemas.BoardResponse(**value)
+        db_board = await crud.get_board_by_id(db, id=id)
+        if db_board is None:
+            return None
+        board = schemas.BoardResponse.model_validate(db_board, from_attributes=True)
+        self.store(board)
+        return board
+
+    async def get_by_id_at(self, db: AsyncSession, id: int, updated_at) -> Optional[schemas.BoardResponse]:
+        # A copy cached before the board's last write, e.g. one made through another worker, is reloaded.
+        board = await self.get_by_id(db, id)
+        if board is not None and board.updated_at != updated_at:
+            self.invalidate(id, board.name)
+            board = await self.get_by_id(db, id)
+        return board
+
+    async def get_by_name(self, db: AsyncSession, name: str) -> Optional[schemas.BoardResponse]:
+        value = self.backend.get(self.name_key(name))
+        if value is not _MISSING:
+            return schemas.BoardResponse(**value)
+        db_board = await crud.get_board_by_name(db, name=name)
+        if db_board is None:
+            return None
+        board = schemas.BoardResponse.model_validate(db_board, from_attributes=True)
+        self.store(board)
+        return board
+
+    async def get_all(self, db: AsyncSession) -> List[dict]:
+        # Served as plain dicts: the column rows already match BoardResponse, so the list skips per-object validation.
+        # Each call builds new dicts, so callers never hold the cached values.
+        values = self.backend.get(self.ALL_KEY)
+        if values is _MISSING:
+            rows = [row._asdict() for row in await crud.get_all_boards(db)]
+            for row in rows:
+                self.backend.set(self.stats_key(row["id"]), {field: row[field] for field in self.STATS_FIELDS})
+            self.backend.set(self.ALL_KEY, [{key: value for key, value in row.items() if key not in self.STATS_FIELDS}
+                                            for row in rows])
+            return rows
+        stats = {value["id"]: self.backend.get(self.stats_key(value["id"])) for value in values}
+        missing = [id for id, board_stats in stats.items() if board_stats is _MISSING]
+        if missing: # boards with post writes since the list was cached
+            for row in await crud.get_board_stats(db, missing):
+                board_stats = stats[row.id] = {field: getattr(row, field) for field in self.STATS_FIELDS}
+                self.backend.set(self.stats_key(row.id), board_stats)
+        # A board deleted through another worker has no stats row and is left out until the list expires.
+        return [dict(value, **stats[value["id"]]) for value in values if stats[value["id"]] is not _MISSING]
+
+    def invalidate(self, id: int, *names: str):
+        # Called after a board is created, modified or deleted; names are its old and new names.
+        self.backend.delete(self.ALL_KEY, self.stats_key(id), self.id_key(id), *[self.name_key(name) for name in names])
+
+    def invalidate_stats(self, id: int, *names: str):
+        # Called after a post write, which changes only the board's post stats; the list stays cached.
+        self.backend.delete(self.stats_key(id), self.id_key(id), *[self.name_key(name) for name in names])
+
+    def clear(self):
+        self.backend.clear()
+
+board_cache = BoardCache(LRUCacheBackend(maxsize=config.BOARD_CACHE_SIZE, ttl=config.BOARD_CACHE_TTL))
@@ -0,0 +1,18 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+
+def make_etag(*parts) -> str:
+    # Strong ETag over the version parts of a response (ids, updated_at stamps, query parameters).
+    return '"' + hashlib.sha1(repr(parts).encode("utf-8")).hexdigest() + '"'
+
+def aggregate_version(updated_ats: Iterable[Optional[datetime]]) -> tuple:
+    # (count, newest updated_at) changes on every insert, update and delete of the set.
+    updated_ats = list(updated_ats)
+    return len(updated_ats), max((updated_at for updated_at in updated_ats if updated_at), default=None)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
@@ -1,134 +1,79 @@
-import io
-import json
+from typing import Optional
 import pandas as pd
+from openpyxl import load_workbook
 from sqlalchemy.orm import Session
-from app.models.match import Report, TeamResult, PlayerStat
-from fastapi import UploadFile
 
-def parse_row(index: int, d: dict, db: Session, report_id=None, team_result_id=None):
-    if index == 0:
-        report_text = d['Unnamed: 17']
-        new_report = Report(report=report_text)
-        db.add(new_report)
-        db.commit()
-        db.refresh(new_report)
-        return new_report.id
-    
-    elif index == 2:
-        teamA = d['Unnamed: 3']
-        result = d['Unnamed: 12']
-        new_team_result = TeamResult(team=teamA, result=result, report_id=report_id)
-        db.add(new_team_result)
-        db.commit()
-        db.refresh(new_team_result)
-        print(new_team_result)
-        return new_team_result.id
-    
-    elif index >= 6 and index <= 17:
-        if type(d['Unnamed: 1']) == float: # "Unnamed: N": NaN
-            return None    
-        backnumber = d['Unnamed: 1']
-        player = d['Unnamed: 2']
-        offense_rebound = d['Unnamed: 3']
-        defense_rebound = d['Unnamed: 4']
-        total_rebound = d['Unnamed: 5']
-        assist = d['Unnamed: 6']
-        steal = d['Unnamed: 7']
-        block = d['Unnamed: 8']
-        score_1Q = d['Unnamed: 9']
-        score_2Q = d['Unnamed: 10']
-        score_3Q = d['Unnamed: 11']
-        score_4Q = d['Unnamed: 12']
-        score_OT = d['Unnamed: 13']
-        score_Total = d['Unnamed: 14']
-        new_player_stat = PlayerStat(
-            team_result_id=team_result_id,
-            backnumber=backnumber,
-            player=player,
-            offense_rebound=offense_rebound,
-            defense_rebound=defense_rebound,
-            total_rebound=total_rebound,
-            assist=assist,
-            steal=steal,
-            block=block,
-            score_1Q=score_1Q,
-            score_2Q=score_2Q,
-            score_3Q=score_3Q,
-            score_4Q=score_4Q,
-            score_OT=score_OT,
-            score_Total=score_Total
-        )
-        db.add(new_player_stat)
-        db.commit()
-        db.refresh(new_player_stat)
-        print(new_player_stat)
+from app.models.match import PLAYER_STAT_FIELDS
+from app.services.ingestion import save_report
+from app.services.metrics import stage_timer
 
-    elif index == 18: #teamA total score_chart
-        pass
-    
-    elif index == 20:
-        teamB = d['Unnamed: 3']
-        result = d['Unnamed: 12']
-        new_team_result = TeamResult(team=teamB, result=result, report_id=report_id)
-        db.add(new_team_result)
-        db.commit()
-        db.refresh(new_team_result)
-        print(new_team_result)
-        return new_team_result.id
+# Row indexes below are DataFrame rows, i.e. sheet row - 2 (the first sheet row is the header).
+REPORT_CELL = (0, 17)
+TEAM_BLOCKS = (
+    # (team header row, first player row, last player row)
+    (2, 6, 17),  # teamA, row 18 is the team total score_chart
+    (20, 24, 35), # teamB, row 36 is the team total score_chart
+)
+LAST_ROW = 35
+LAST_COLUMN = 17
+TEAM_COLUMN, RESULT_COLUMN = 3, 12
 
-    elif index >= 24 and index <= 35:
-        backnumber = d['Unnamed: 1']
-        player = d['Unnamed: 2']
-        offense_rebound = d['Unnamed: 3']
-        defense_rebound = d['Unnamed: 4']
-        total_rebound = d['Unnamed: 5']
-        assist = d['Unnamed: 6']
-        steal = d['Unnamed: 7']
-        block = d['Unnamed: 8']
-        score_1Q = d['Unnamed: 9']
-        score_2Q = d['Unnamed: 10']
-        score_3Q = d['Unnamed: 11']
-        score_4Q = d['Unnamed: 12']
-        score_OT = d['Unnamed: 13']
-        score_Total = d['Unnamed: 14']
-        new_player_stat = PlayerStat(
-            team_result_id=team_result_id,
-            backnumber=backnumber,
-            player=player,
-            offense_rebound=offense_rebound,
-            defense_rebound=defense_rebound,
-            total_rebound=total_rebound,
-            assist=assist,
-            steal=steal,
-            block=block,
-            score_1Q=score_1Q,
-            score_2Q=score_2Q,
-            score_3Q=score_3Q,
-            score_4Q=score_4Q,
-            score_OT=score_OT,
-            score_Total=score_Total
-        )
-        db.add(new_player_stat)
-        db.commit()
-        db.refresh(new_player_stat)
-        print(new_player_stat)
+# Sheet columns 1..14 ('Unnamed: 1'..'Unnamed: 14') hold PLAYER_STAT_FIELDS in order.
+INTEGER_COLUMNS = [column for column in PLAYER_STAT_FIELDS if column != 'player']
 
-    else:
-        return None
+def to_value(value):
+    return None if pd.isna(value) else value
 
-def parsing_excel_file(file: UploadFile, db: Session):
-    content = file.file.read()
-    df = pd.read_excel(io.BytesIO(content), engine='openpyxl')
-    data = df.to_dict(orient='records')
-    report_id = None
-    team_result_id = None
+def parse_player_stats(df: pd.DataFrame, first_row: int, last_row: int) -> list:
+    block = df.iloc[first_row:last_row + 1, 1:1 + len(PLAYER_STAT_FIELDS)]
+    block.columns = PLAYER_STAT_FIELDS
+    block = block[block['backnumber'].notna()] # drop empty player rows
 
-    for index,row in enumerate(data):
-        if index == 0:
-            report_id = parse_row(index, row, db)
-        elif index == 2 or index == 20:
-            team_result_id = parse_row(index, row, db, report_id=report_id)
-        elif 6 <= index <= 17 or 24 <= index <= 35:
-            parse_row(index, row, db, team_result_id=team_result_id)
+    integers = block[INTEGER_COLUMNS].apply(pd.to_numeric, errors='coerce').astype('Int64')
+    block = pd.concat([block[['player']], integers], axis=1)[PLAYER_STAT_FIELDS]
+    return block.astype(object).where(block.notna(), None).to_dict(orient='records')
 
-    return data
+def parse_sheet(df: pd.DataFrame) -> dict:
+    # Returns the Report -> TeamResult -> PlayerStat graph as mappings ready for bulk insert.
+    team_results = []
+    for header_row, first_row, last_row in TEAM_BLOCKS:
+        team_results.append({
+            'team': to_value(df.iat[header_row, TEAM_COLUMN]),
+            'result': to_value(df.iat[header_row, RESULT_COLUMN]),
+            'player_stats': parse_player_stats(df, first_row, last_row),
+        })
+    return {'report': to_value(df.iat[REPORT_CELL]), 'team_results': team_results}
+
+def read_sheet(ws) -> pd.DataFrame:
+    # Only the cell range the parser uses is materialized; sheet row 1 is the header.
+    rows = ws.iter_rows(min_row=2, max_row=LAST_ROW + 2, max_col=LAST_COLUMN + 1, values_only=True)
+    return pd.DataFrame(list(rows)).reindex(index=range(LAST_ROW + 1), columns=range(LAST_COLUMN + 1))
+
+def list_sheet_names(path: str) -> list:
+    wb = load_workbook(path, read_only=True)
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
+
+def parse_workbook_sheet(path: str, sheet_name: Optional[str] = None) -> dict:
+    # Pure function of (path, sheet), so it can run in a worker process.
+    # Stage timings recorded in a batch worker process stay in that process; its log lines remain.
+    source = path if sheet_name is None else f"{path}#{sheet_name}"
+    with stage_timer("load", source):
+        wb = load_workbook(path, read_only=True, data_only=True) # streams the sheet xml from disk
+        try:
+            ws = wb.worksheets[0] if sheet_name is None else wb[sheet_name]
+            df = read_sheet(ws)
+        finally:
+            wb.close()
+    with stage_timer("parse", source):
+        report = parse_sheet(df)
+    if not any(team_result['team'] for team_result in report['team_results']):
+        raise ValueError("Sheet does not match the score sheet layout")
+    return report
+
+def parsing_excel_file(path: str, db: Session, source: Optional[str] = None, replace: bool = False,
+                       report_id: Optional[int] = None) -> int:
+    report = parse_workbook_sheet(path)
+    return save_report(db, report, source=source, replace=replace, report_id=report_id)
@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy import select
+
+from app import config, database
+from app.models.post import Post
+from app.models.match import PLAYER_STAT_FIELDS, Report, TeamResult, PlayerStat
+
+# The response body is produced after the request's dependencies may have been closed,
+# so exports open their own session; tests point this at the test database.
+session_factory = database.AsyncSessionLocal
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def post_export_query(board_id: int):
+    return (select(Post.id, Post.board_id, Post.title, Post.content, Post.author, Post.timestamp, Post.updated_at)
+            .where(Post.board_id == board_id).order_by(Post.id))
+
+def player_stat_export_query():
+    return (select(Report.id.label("report_id"), Report.source, TeamResult.id.label("team_result_id"),
+                   TeamResult.team, TeamResult.result, PlayerStat.player_id,
+                   *[getattr(PlayerStat, field) for field in PLAYER_STAT_FIELDS])
+            .join(TeamResult, TeamResult.id == PlayerStat.team_result_id)
+            .join(Report, Report.id == TeamResult.report_id)
+            .order_by(PlayerStat.id))
+
+def team_result_export_query():
+    return (select(Report.id.label("report_id"), Report.source, TeamResult.id.label("team_result_id"),
+                   TeamResult.team, TeamResult.result)
+            .join(Report, Report.id == TeamResult.report_id)
+            .order_by(TeamResult.id))
+
+def to_json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+def encode_ndjson(rows) -> bytes:
+    return "".join(json.dumps(dict(row), ensure_ascii=False, default=to_json_value) + "\n" for row in rows).encode("utf-8")
+
+def encode_csv(rows, header=None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header is not None:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+async def stream_rows(query, format: str) -> AsyncIterator[bytes]:
+    # Rows are fetched yield_per at a time from a server-side cursor and encoded one chunk
+    # per partition, so memory stays flat however large the table is.
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=config.EXPORT_CHUNK_SIZE))
+        if format == "csv":
+            yield encode_csv([], header=list(result.keys()))
+            async for partition in result.partitions():
+                yield encode_csv(partition)
+        else:
+            async for partition in result.mappings().partitions():
+                yield encode_ndjson(partition)
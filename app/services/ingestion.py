@@ -0,0 +1,168 @@
+import hashlib
+import json
+from typing import Optional
+from sqlalchemy import insert, update, delete, select
+from sqlalchemy.orm import Session
+
+from app.models.match import PLAYER_STAT_FIELDS, Report, TeamResult, PlayerStat
+from app.services import leaderboard, match_version, players
+from app.services.metrics import stage_timer
+
+def fingerprint(value) -> str:
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def insert_team_results(db: Session, report_id: int, team_results: list):
+    if not team_results:
+        return
+    team_result_ids = db.scalars(
+        insert(TeamResult).returning(TeamResult.id, sort_by_parameter_order=True),
+        [{"report_id": report_id, "team": team_result["team"], "result": team_result["result"],
+          "block_hash": fingerprint(team_result)}
+         for team_result in team_results],
+    ).all()
+
+    resolved = [players.resolve_player_ids(db, team_result["team"], team_result["player_stats"])
+                for team_result in team_results]
+    player_stats = [
+        dict(player_stat, team_result_id=team_result_id)
+        for team_result_id, team_player_stats in zip(team_result_ids, resolved)
+        for player_stat in team_player_stats
+    ]
+    if player_stats:
+        db.execute(insert(PlayerStat), player_stats) # executemany
+
+    for team_result, team_player_stats in zip(team_results, resolved):
+        leaderboard.apply_team_block(db, team_result["team"], team_result["result"], team_player_stats, sign=1)
+
+def insert_report(db: Session, report: dict, content_hash: str, source: Optional[str]) -> int:
+    # Generated ids come back through RETURNING, so no per-object refresh is needed.
+    report_id = db.scalar(
+        insert(Report).returning(Report.id),
+        {"report": report["report"], "source": source, "content_hash": content_hash},
+    )
+    insert_team_results(db, report_id, report["team_results"])
+    return report_id
+
+def load_player_stats(db: Session, team_result_id: int) -> list:
+    columns = [getattr(PlayerStat, field) for field in PLAYER_STAT_FIELDS]
+    return db.execute(
+        select(PlayerStat.id, PlayerStat.player_id, *columns)
+        .where(PlayerStat.team_result_id == team_result_id).order_by(PlayerStat.id)
+    ).mappings().all()
+
+def match_player_stats(player_stats: list, db_player_stats: list) -> list:
+    # Pairs each sheet row with a stored row: by (backnumber, normalized name) first, with
+    # duplicates taken in order, then by row position among the rows left over. Returns the
+    # stored row (or None) for every sheet row.
+    unmatched = {}
+    for position, row in enumerate(db_player_stats):
+        unmatched.setdefault((row["backnumber"], players.normalize_name(row["player"])), []).append(position)
+
+    matches = [None] * len(player_stats)
+    for index, player_stat in enumerate(player_stats):
+        positions = unmatched.get((player_stat["backnumber"], players.normalize_name(player_stat["player"])))
+        if positions:
+            matches[index] = positions.pop(0)
+    leftover = {position for positions in unmatched.values() for position in positions}
+    for index in range(len(player_stats)):
+        if matches[index] is None and index in leftover:
+            matches[index] = index
+            leftover.discard(index)
+    return [db_player_stats[position] if position is not None else None for position in matches]
+
+def upsert_player_stats(db: Session, team_result_id: int, player_stats: list, db_player_stats: list):
+    # Only rows whose values changed are written; stored rows left unmatched are removed.
+    inserts, updates, matched_ids = [], [], set()
+    for player_stat, row in zip(player_stats, match_player_stats(player_stats, db_player_stats)):
+        if row is None:
+            inserts.append(dict(player_stat, team_result_id=team_result_id))
+            continue
+        matched_ids.add(row["id"])
+        if any(row[key] != value for key, value in player_stat.items()):
+            updates.append(dict(player_stat, id=row["id"]))
+    removed_ids = [row["id"] for row in db_player_stats if row["id"] not in matched_ids]
+
+    if inserts:
+        db.execute(insert(PlayerStat), inserts)
+    if updates:
+        db.execute(update(PlayerStat), updates) # bulk UPDATE by primary key
+    if removed_ids: # players no longer on the sheet
+        db.execute(delete(PlayerStat).where(PlayerStat.id.in_(removed_ids)))
+
+def update_report(db: Session, db_report: Report, report: dict, content_hash: str) -> int:
+    db_report.report = report["report"]
+    db_report.content_hash = content_hash
+
+    db_team_results = db.query(TeamResult).filter(TeamResult.report_id == db_report.id).order_by(TeamResult.id).all()
+    team_results = report["team_results"]
+    for db_team_result, team_result in zip(db_team_results, team_results):
+        block_hash = fingerprint(team_result)
+        if db_team_result.block_hash == block_hash: # unchanged team block
+            continue
+        db_player_stats = load_player_stats(db, db_team_result.id)
+        leaderboard.apply_team_block(db, db_team_result.team, db_team_result.result, db_player_stats, sign=-1)
+        db_team_result.team = team_result["team"]
+        db_team_result.result = team_result["result"]
+        db_team_result.block_hash = block_hash
+        player_stats = players.resolve_player_ids(db, team_result["team"], team_result["player_stats"])
+        upsert_player_stats(db, db_team_result.id, player_stats, db_player_stats)
+        leaderboard.apply_team_block(db, team_result["team"], team_result["result"], player_stats, sign=1)
+
+    insert_team_results(db, db_report.id, team_results[len(db_team_results):])
+    for db_team_result in db_team_results[len(team_results):]:
+        remove_team_result_totals(db, db_team_result)
+        db.delete(db_team_result)
+    return db_report.id
+
+def remove_team_result_totals(db: Session, db_team_result: TeamResult):
+    db_player_stats = load_player_stats(db, db_team_result.id)
+    leaderboard.apply_team_block(db, db_team_result.team, db_team_result.result, db_player_stats, sign=-1)
+
+def save_report(db: Session, report: dict, source: Optional[str] = None, replace: bool = False,
+                report_id: Optional[int] = None) -> int:
+    # Writes the whole Report -> TeamResult -> PlayerStat graph in one transaction.
+    # An identical report is a no-op. The sheets carry no game identifier (rematches share teams
+    # and often an empty narrative, and a corrected narrative is still the same game), so a
+    # correction names the game it updates: report_id, or replace=true for the report uploaded
+    # under the same source. Anything else is inserted as a new game.
+    content_hash = fingerprint(report)
+    try:
+        with stage_timer("save", source):
+            existing_id = db.scalar(select(Report.id).where(Report.content_hash == content_hash))
+            if existing_id is not None:
+                return existing_id
+
+            db_report = None
+            if report_id is not None:
+                db_report = db.get(Report, report_id)
+                if db_report is None:
+                    raise ValueError(f"Report {report_id} does not exist")
+            elif replace and source is not None:
+                db_report = db.query(Report).filter(Report.source == source).order_by(Report.id).first()
+
+            if db_report is None:
+                report_id = insert_report(db, report, content_hash, source)
+            else:
+                report_id = update_report(db, db_report, report, content_hash)
+            match_version.bump(db)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return report_id
+
+def delete_report(db: Session, report_id: int) -> bool:
+    db_report = db.query(Report).filter(Report.id == report_id).first()
+    if db_report is None:
+        return False
+    try:
+        for db_team_result in db_report.team_results:
+            remove_team_result_totals(db, db_team_result)
+        db.delete(db_report) # cascades to team results and player stats
+        match_version.bump(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return True
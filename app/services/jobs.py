@@ -0,0 +1,211 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import config, database
+from app.models.job import IngestionJob
+from app.services import batch, snapshots
+from app.services.metrics import stage_timer
+from app.services.uploads import remove_spooled_file
+
+logger = logging.getLogger(__name__)
+
+# Workers open their own sessions; tests point this at the test database.
+session_factory = database.SessionLocal
+
+# Identifies this process as the owner of the jobs it runs, see claim_job.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Errors a retry cannot fix, e.g. a sheet that does not match the score sheet layout or a file
+# that is not a workbook; the job fails on the first attempt.
+PERMANENT_ERRORS = (ValueError, zipfile.BadZipFile)
+
+executor: Optional[ThreadPoolExecutor] = None
+
+# Jobs submitted to this process's executor and not finished yet, for admission control.
+lock = threading.Lock()
+pending_job_ids = set()
+running_job_ids = set()
+recent_job_seconds = deque(maxlen=50)
+
+def get_executor() -> ThreadPoolExecutor:
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=config.INGESTION_WORKERS, thread_name_prefix="ingestion")
+    return executor
+
+def shutdown(wait: bool = False):
+    # Unfinished jobs stay queued/running in the table and are picked up by recover_unfinished_jobs.
+    # wait=True lets running jobs finish first, for callers that remove the database afterwards.
+    global executor
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+        executor = None
+    batch.shutdown()
+
+async def create_job(db: AsyncSession, filename: str, path: str, content_hash: Optional[str] = None,
+                     kind: str = IngestionJob.SINGLE, replace: bool = False,
+                     report_id: Optional[int] = None) -> IngestionJob:
+    db_job = IngestionJob(kind=kind, filename=filename, path=path, content_hash=content_hash,
+                          replace=replace, report_id=report_id, state=IngestionJob.QUEUED)
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+async def get_job_by_id(db: AsyncSession, id: int) -> Optional[IngestionJob]:
+    return await db.scalar(select(IngestionJob).where(IngestionJob.id == id).limit(1))
+
+async def get_job_by_content_hash(db: AsyncSession, content_hash: str, kind: str = IngestionJob.SINGLE) -> Optional[IngestionJob]:
+    # Failed jobs do not count, so a file that failed can be uploaded again.
+    return await db.scalar(select(IngestionJob).where(
+        IngestionJob.content_hash == content_hash, IngestionJob.kind == kind,
+        IngestionJob.state != IngestionJob.FAILED
+    ).order_by(IngestionJob.id).limit(1))
+
+def parsing_excel_file(path: str, db, source: Optional[str] = None, replace: bool = False,
+                       report_id: Optional[int] = None) -> int:
+    # pandas and openpyxl are loaded by the first ingestion instead of when the API process starts.
+    from app.services.excel_parsing import parsing_excel_file
+    return parsing_excel_file(path, db, source=source, replace=replace, report_id=report_id)
+
+def submit_job(job_id: int) -> Future:
+    with lock:
+        pending_job_ids.add(job_id)
+    return get_executor().submit(run_job, job_id)
+
+def queue_depth() -> dict:
+    with lock:
+        return {"running": len(running_job_ids), "queued": len(pending_job_ids - running_job_ids)}
+
+def average_job_seconds() -> Optional[float]:
+    samples = list(recent_job_seconds)
+    return sum(samples) / len(samples) if samples else None
+
+def run_job(job_id: int):
+    with lock:
+        running_job_ids.add(job_id)
+    started_at = time.perf_counter()
+    try:
+        retry = process_job(job_id)
+    finally:
+        recent_job_seconds.append(time.perf_counter() - started_at)
+        with lock:
+            running_job_ids.discard(job_id)
+            pending_job_ids.discard(job_id)
+    if retry:
+        submit_job(job_id)
+
+def lease_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=config.INGESTION_LEASE_SECONDS)
+
+def claim_job(db, job: IngestionJob) -> bool:
+    # Moves a queued job to running under this worker's lease. The conditional UPDATE lets only
+    # one worker win when several processes hold the same job id, e.g. after each recovered it.
+    now = datetime.utcnow()
+    result = db.execute(update(IngestionJob).where(IngestionJob.id == job.id, IngestionJob.state == IngestionJob.QUEUED)
+                        .values(state=IngestionJob.RUNNING, owner=WORKER_ID, lease_expires_at=lease_expiry(),
+                                attempts=IngestionJob.attempts + 1, started_at=now))
+    db.commit()
+    db.refresh(job)
+    return result.rowcount > 0
+
+@contextmanager
+def heartbeat(job_id: int):
+    # Renews the lease from a side thread while the job runs, so recovery elsewhere leaves it alone.
+    stop = threading.Event()
+    def renew():
+        while not stop.wait(config.INGESTION_LEASE_SECONDS / 3):
+            try:
+                with session_factory() as db:
+                    db.execute(update(IngestionJob).where(IngestionJob.id == job_id, IngestionJob.owner == WORKER_ID)
+                               .values(lease_expires_at=lease_expiry()))
+                    db.commit()
+            except Exception:
+                logger.exception("lease renewal of ingestion job %s failed", job_id)
+    thread = threading.Thread(target=renew, name=f"heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+def process_job(job_id: int) -> bool:
+    # Runs one attempt of the job; returns whether it should be queued again.
+    with session_factory() as db:
+        job = db.get(IngestionJob, job_id)
+        if job is None or job.state != IngestionJob.QUEUED:
+            return False # finished, or claimed by another worker
+        if job.attempts >= config.INGESTION_MAX_ATTEMPTS:
+            # Every attempt so far crashed or was cut off with its worker, e.g. a sheet that kills the process.
+            job.state = IngestionJob.FAILED
+            job.error = job.error or f"Gave up after {job.attempts} attempts"
+            job.finished_at = datetime.utcnow()
+            remove_spooled_file(job.path)
+            db.commit()
+            return False
+        if not claim_job(db, job):
+            return False
+
+        try:
+            with heartbeat(job_id), stage_timer(f"job_{job.kind}", job.filename):
+                if job.kind == IngestionJob.BATCH:
+                    report_ids, job.sheet_results = batch.ingest_batch(job.path, job.filename, db, replace=bool(job.replace))
+                else:
+                    report_ids = [parsing_excel_file(job.path, db, source=job.filename, replace=bool(job.replace),
+                                                     report_id=job.report_id)]
+        except Exception as e:
+            logger.exception("ingestion job %s failed (attempt %s)", job_id, job.attempts)
+            db.rollback()
+            job.error = f"{type(e).__name__}: {e}"
+            can_retry = job.attempts < config.INGESTION_MAX_ATTEMPTS and not isinstance(e, PERMANENT_ERRORS)
+            job.state = IngestionJob.QUEUED if can_retry else IngestionJob.FAILED
+        else:
+            job.error = None
+            job.report_ids = report_ids
+            job.state = IngestionJob.SUCCEEDED
+        job.owner = job.lease_expires_at = None
+
+        retry = job.state == IngestionJob.QUEUED
+        succeeded = job.state == IngestionJob.SUCCEEDED
+        if not retry:
+            job.finished_at = datetime.utcnow()
+            remove_spooled_file(job.path)
+        db.commit()
+
+        if succeeded:
+            try:
+                with stage_timer("snapshot", job.filename):
+                    snapshots.write_report_snapshots(db, [report_id for report_id in report_ids if report_id is not None])
+            except Exception: # the snapshot can be rebuilt, ingestion itself succeeded
+                logger.exception("snapshot of ingestion job %s failed", job_id)
+    return retry
+
+def recover_unfinished_jobs() -> List[int]:
+    # A running job whose lease has expired belonged to a worker that died; jobs other live workers
+    # are running keep renewing their leases and are left alone. Queued jobs are submitted here too;
+    # if another worker also holds one, claim_job lets only one of them run it.
+    with session_factory() as db:
+        db.execute(update(IngestionJob).where(
+            IngestionJob.state == IngestionJob.RUNNING,
+            or_(IngestionJob.lease_expires_at.is_(None), IngestionJob.lease_expires_at < datetime.utcnow()),
+        ).values(state=IngestionJob.QUEUED, owner=None, lease_expires_at=None))
+        db.commit()
+        job_ids = list(db.scalars(select(IngestionJob.id).where(IngestionJob.state == IngestionJob.QUEUED)
+                                  .order_by(IngestionJob.id)))
+
+    for job_id in job_ids:
+        submit_job(job_id)
+    return job_ids
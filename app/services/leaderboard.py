@@ -0,0 +1,84 @@
+from collections import defaultdict
+from typing import List
+from sqlalchemy import select, tuple_, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.leaderboard import PlayerTotal, TeamTotal
+from app.models.match import TeamResult, PlayerStat
+
+# Leaderboard stat -> PlayerStat column it sums up.
+STAT_COLUMNS = {
+    'points': 'score_Total',
+    'rebounds': 'total_rebound',
+    'assists': 'assist',
+    'steals': 'steal',
+    'blocks': 'block',
+    'score_1Q': 'score_1Q',
+    'score_2Q': 'score_2Q',
+    'score_3Q': 'score_3Q',
+    'score_4Q': 'score_4Q',
+    'score_OT': 'score_OT',
+}
+
+def stat_values(player_stats: List[dict], sign: int) -> dict:
+    return {stat: sign * sum(player_stat.get(column) or 0 for player_stat in player_stats)
+            for stat, column in STAT_COLUMNS.items()}
+
+def upsert_totals(model, key_columns: List[str], label_columns: List[str] = ()):
+    # INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col: the increment happens inside
+    # the statement, so concurrent ingestion jobs cannot overwrite each other's totals.
+    # Label columns keep the values of the row's first insert.
+    statement = sqlite_insert(model)
+    fixed = ("id", *key_columns, *label_columns)
+    counters = [column.name for column in model.__table__.columns if column.name not in fixed]
+    return statement.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: getattr(model, column) + getattr(statement.excluded, column) for column in counters},
+    )
+
+def apply_team_block(db: Session, team: str, result: str, player_stats: List[dict], sign: int):
+    # sign is +1 when a team block is committed and -1 when it is removed or replaced.
+    # Runs inside the caller's transaction; rows whose game count drops to zero are removed.
+    # player_stats carry player_id (see players.resolve_player_ids); rows without one are not counted.
+    linked = [player_stat for player_stat in player_stats if player_stat.get('player_id') is not None]
+    if linked:
+        db.execute(upsert_totals(PlayerTotal, ['player_id'], ['team', 'player', 'backnumber']), [
+            dict(stat_values([player_stat], sign), player_id=player_stat['player_id'], team=team,
+                 player=player_stat['player'], backnumber=player_stat['backnumber'], games=sign)
+            for player_stat in linked
+        ])
+        db.execute(delete(PlayerTotal).where(PlayerTotal.games <= 0))
+
+    db.execute(upsert_totals(TeamTotal, ['team']), dict(
+        stat_values(player_stats, sign), team=team, games=sign,
+        wins=sign if result == 'WIN' else 0, losses=sign if result == 'LOSE' else 0,
+    ))
+    db.execute(delete(TeamTotal).where(TeamTotal.team == team, TeamTotal.games <= 0))
+
+async def get_player_leaders(db: AsyncSession, stat: str, limit: int) -> List[PlayerTotal]:
+    column = getattr(PlayerTotal, stat)
+    return list(await db.scalars(select(PlayerTotal).order_by(column.desc(), PlayerTotal.id).limit(limit)))
+
+async def get_team_leaders(db: AsyncSession, stat: str, limit: int) -> List[TeamTotal]:
+    column = getattr(TeamTotal, stat)
+    return list(await db.scalars(select(TeamTotal).order_by(column.desc(), TeamTotal.id).limit(limit)))
+
+def rebuild_leaderboards(db: Session):
+    # Repairs the aggregate tables from the match tables, e.g. for reports ingested before they existed.
+    db.execute(delete(PlayerTotal))
+    db.execute(delete(TeamTotal))
+    columns = [getattr(PlayerStat, column)
+               for column in ['team_result_id', 'player_id', 'player', 'backnumber', *STAT_COLUMNS.values()]]
+    player_stats = defaultdict(list)
+    for player_stat in db.execute(select(*columns)).mappings():
+        player_stats[player_stat['team_result_id']].append(player_stat)
+    for team_result in db.query(TeamResult).order_by(TeamResult.id).all():
+        apply_team_block(db, team_result.team, team_result.result, player_stats[team_result.id], sign=1)
+    db.commit()
+
+if __name__ == '__main__':
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        rebuild_leaderboards(session)
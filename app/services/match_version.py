@@ -0,0 +1,21 @@
+import uuid
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.match import MatchVersion
+
+# Match data (reports, their stat rows and the players they link to) is versioned by one counter
+# row instead of hashing the tables on every read. Writers bump it inside their own transaction,
+# so the new version commits together with the data it describes.
+
+def bump(db: Session):
+    db.execute(
+        sqlite_insert(MatchVersion).values(id=1, epoch=uuid.uuid4().hex, version=1)
+        .on_conflict_do_update(index_elements=[MatchVersion.id], set_={"version": MatchVersion.version + 1})
+    )
+
+async def current(db: AsyncSession) -> str:
+    row = (await db.execute(select(MatchVersion.epoch, MatchVersion.version).where(MatchVersion.id == 1))).first()
+    return "empty" if row is None else f"{row.epoch}:{row.version}"
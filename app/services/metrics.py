@@ -0,0 +1,131 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import Counter as CounterMetric, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import config
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency until the last body chunk is sent",
+                            ["method", "route", "status"])
+REQUEST_QUERIES = Histogram("db_queries_per_request", "SQL statements executed per request", ["method", "route"],
+                            buckets=(1, 2, 3, 5, 10, 20, 50, 100, 250, 1000))
+REQUEST_DB_TIME = Histogram("db_time_per_request_seconds", "Time spent in SQL statements per request", ["method", "route"])
+N_PLUS_ONE = CounterMetric("db_n_plus_one_total", "Requests that repeated one statement N_PLUS_ONE_THRESHOLD times or more",
+                           ["method", "route"])
+DB_ERRORS = Histogram("db_failed_statement_duration_seconds", "Duration of SQL statements that raised", ["error"])
+INGESTION_STAGE = Histogram("ingestion_stage_duration_seconds", "Duration of each ingestion stage", ["stage"],
+                            buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30))
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.queries += 1
+        self.db_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated_statements(self) -> list:
+        # The same parameterized statement run over and over is the signature of a lazy load per row.
+        return [(statement, count) for statement, count in self.statements.items() if count >= config.N_PLUS_ONE_THRESHOLD]
+
+# Set by the middleware for the duration of a request; routes run in copies of this context
+# (tasks and the threadpool), so the stats object is shared with them.
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+# Start times are keyed by cursor, so handle_error can tell a failed statement from an error raised
+# elsewhere (e.g. while connecting or fetching) that has no start time to clear.
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", {})[id(cursor)] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop(id(cursor))
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+@event.listens_for(Engine, "handle_error")
+def handle_error(context):
+    # The execution context holds the cursor the execute events saw; there is none if connecting failed.
+    started_at = None
+    if context.connection is not None and context.execution_context is not None:
+        cursor = getattr(context.execution_context, "cursor", None)
+        started_at = context.connection.info.get("query_started_at", {}).pop(id(cursor), None)
+    if started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    DB_ERRORS.labels(type(context.original_exception).__name__).observe(elapsed)
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.record(context.statement, elapsed)
+
+def route_template(scope) -> str:
+    # The router leaves the matched endpoint in the scope; labels use its path template, not the raw URL.
+    endpoint = scope.get("endpoint")
+    for route in scope["app"].routes if endpoint is not None else []:
+        if getattr(route, "endpoint", None) is endpoint:
+            return route.path
+    return "unmatched"
+
+class MetricsMiddleware:
+    # Plain ASGI middleware, so streamed bodies are timed until their last chunk.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                server_timing = (f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                                 f'app;dur={(time.perf_counter() - started_at) * 1000:.1f}')
+                message.setdefault("headers", []).append((b"server-timing", server_timing.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_stats.reset(token)
+            self.observe(scope, stats, status_code, time.perf_counter() - started_at)
+
+    @staticmethod
+    def observe(scope, stats: RequestStats, status_code: int, elapsed: float):
+        method, route = scope["method"], route_template(scope)
+        REQUEST_LATENCY.labels(method, route, str(status_code)).observe(elapsed)
+        REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+        REQUEST_DB_TIME.labels(method, route).observe(stats.db_time)
+        repeated = stats.repeated_statements()
+        if repeated:
+            N_PLUS_ONE.labels(method, route).inc()
+            for statement, count in repeated:
+                logger.warning("possible N+1 in %s %s: %d executions of %s", method, route, count, statement)
+
+@contextmanager
+def stage_timer(stage: str, source: Optional[str] = None):
+    # Structured per-stage ingestion timing: a histogram sample plus a key=value log line.
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started_at
+        INGESTION_STAGE.labels(stage).observe(elapsed)
+        logger.info("ingestion stage=%s source=%s seconds=%.4f", stage, source, elapsed)
@@ -0,0 +1,25 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+# Cursors are opaque to clients: base64 of the ordering and the sort key of the boundary post.
+
+def encode_cursor(order_by: str, post) -> str:
+    value = post.timestamp.isoformat() if order_by == "timestamp" else None
+    raw = json.dumps([order_by, value, post.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, order_by: str) -> Tuple:
+    # Returns the sort key, (id,) or (timestamp, id). Raises ValueError for a cursor that
+    # is malformed or was issued for another ordering.
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order_by, value, id = json.loads(raw)
+        if cursor_order_by != order_by or not isinstance(id, int):
+            raise ValueError
+        if order_by == "timestamp":
+            return datetime.fromisoformat(value), id
+        return (id,)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
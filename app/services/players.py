@@ -0,0 +1,114 @@
+import re
+import unicodedata
+from typing import List, Optional
+from sqlalchemy import select, update, func, tuple_, and_, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.player import Player
+from app.models.match import PLAYER_STAT_FIELDS, Report, TeamResult, PlayerStat
+from app.services import match_version
+from app.services.leaderboard import STAT_COLUMNS, rebuild_leaderboards
+
+def normalize_name(name: Optional[str]) -> str:
+    # "김 창범", "김창범 " and full-width variants resolve to the same player.
+    return re.sub(r"\s+", "", unicodedata.normalize("NFKC", name or "")).casefold()
+
+# Same expressions as the ux_players_identity index, so NULL teams and backnumbers match too.
+IDENTITY_COLUMNS = (Player.normalized_name, func.coalesce(Player.team, ''), func.coalesce(Player.backnumber, -1))
+
+def identity(name: Optional[str], team: Optional[str], backnumber: Optional[int]) -> tuple:
+    return (normalize_name(name), team if team is not None else '', backnumber if backnumber is not None else -1)
+
+def select_player_ids(db: Session, keys: set) -> dict:
+    return {tuple(row[1:]): row[0]
+            for row in db.execute(select(Player.id, *IDENTITY_COLUMNS).where(tuple_(*IDENTITY_COLUMNS).in_(keys)))}
+
+def resolve_player_ids(db: Session, team: str, player_stats: List[dict]) -> List[dict]:
+    # Returns copies of player_stats with player_id set, creating Player rows for new players.
+    keys = [identity(stat['player'], team, stat['backnumber']) for stat in player_stats]
+    if not keys:
+        return []
+    player_ids = select_player_ids(db, set(keys))
+    missing = {}
+    for key, stat in zip(keys, player_stats):
+        if key not in player_ids:
+            missing.setdefault(key, stat)
+    if missing:
+        # Another job may insert the same player first; its row is kept and read back.
+        db.execute(sqlite_insert(Player).on_conflict_do_nothing(), [
+            {"normalized_name": key[0], "team": team, "backnumber": stat['backnumber'], "name": stat['player']}
+            for key, stat in missing.items()
+        ])
+        player_ids.update(select_player_ids(db, set(missing)))
+    return [dict(stat, player_id=player_ids[key]) for key, stat in zip(keys, player_stats)]
+
+async def get_player(db: AsyncSession, player_id: int) -> Optional[Player]:
+    return await db.get(Player, player_id)
+
+async def find_players(db: AsyncSession, name: Optional[str], team: Optional[str], offset: int, limit: int) -> List[Player]:
+    query = select(Player)
+    if name:
+        query = query.where(Player.normalized_name == normalize_name(name))
+    if team:
+        query = query.where(Player.team == team)
+    return list(await db.scalars(query.order_by(Player.id).offset(offset).limit(limit)))
+
+async def get_career(db: AsyncSession, player_id: int) -> dict:
+    # A single aggregate over the player's rows in ix_player_stats_player_id_team_result_id.
+    totals = [func.coalesce(func.sum(getattr(PlayerStat, column)), 0).label(stat) for stat, column in STAT_COLUMNS.items()]
+    row = (await db.execute(
+        select(func.count(PlayerStat.id).label("games"),
+               func.coalesce(func.sum(case((TeamResult.result == 'WIN', 1), else_=0)), 0).label("wins"),
+               func.coalesce(func.sum(case((TeamResult.result == 'LOSE', 1), else_=0)), 0).label("losses"),
+               *totals)
+        .join(TeamResult, TeamResult.id == PlayerStat.team_result_id)
+        .where(PlayerStat.player_id == player_id)
+    )).mappings().one()
+    games = row["games"]
+    return {
+        "games": games, "wins": row["wins"], "losses": row["losses"],
+        "totals": {stat: row[stat] for stat in STAT_COLUMNS},
+        "averages": {stat: row[stat] / games if games else 0.0 for stat in STAT_COLUMNS},
+    }
+
+async def get_game_log(db: AsyncSession, player_id: int, offset: int, limit: int) -> List[dict]:
+    # Most recent games first; the opponent is the other team result of the same report.
+    opponent = aliased(TeamResult)
+    stat_columns = [getattr(PlayerStat, column) for column in PLAYER_STAT_FIELDS]
+    result = await db.execute(
+        select(Report.id.label("report_id"), Report.source, TeamResult.team, TeamResult.result,
+               opponent.team.label("opponent"), *stat_columns)
+        .select_from(PlayerStat)
+        .join(TeamResult, TeamResult.id == PlayerStat.team_result_id)
+        .join(Report, Report.id == TeamResult.report_id)
+        .outerjoin(opponent, and_(opponent.report_id == TeamResult.report_id, opponent.id != TeamResult.id))
+        .where(PlayerStat.player_id == player_id)
+        .order_by(PlayerStat.team_result_id.desc())
+        .offset(offset).limit(limit)
+    )
+    return [dict(row) for row in result.mappings()]
+
+def rebuild_players(db: Session):
+    # Resolves player_id for stat rows ingested before the players table existed.
+    rows = db.execute(
+        select(PlayerStat.id, PlayerStat.player, PlayerStat.backnumber, TeamResult.team)
+        .join(TeamResult, TeamResult.id == PlayerStat.team_result_id)
+        .where(PlayerStat.player_id.is_(None))
+    ).mappings().all()
+    updates = []
+    for team in {row["team"] for row in rows}:
+        team_rows = [row for row in rows if row["team"] == team]
+        resolved = resolve_player_ids(db, team, [dict(row) for row in team_rows])
+        updates.extend({"id": row["id"], "player_id": row["player_id"]} for row in resolved)
+    if updates:
+        db.execute(update(PlayerStat), updates) # bulk UPDATE by primary key
+    match_version.bump(db)
+    db.commit()
+    rebuild_leaderboards(db) # player totals are keyed on the newly linked player_id
+
+if __name__ == '__main__':
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        rebuild_players(session)
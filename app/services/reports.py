@@ -0,0 +1,20 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import defer, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.match import Report, TeamResult
+
+def box_score_query(include_report: bool = False):
+    # Team results and player stats are loaded with one SELECT ... IN per level, so a page of
+    # box scores costs three queries regardless of its size. The narrative text is only loaded on request.
+    query = select(Report).options(selectinload(Report.team_results).selectinload(TeamResult.player_stats))
+    if not include_report:
+        query = query.options(defer(Report.report, raiseload=True))
+    return query
+
+async def get_box_score(db: AsyncSession, report_id: int, include_report: bool = False) -> Optional[Report]:
+    return await db.scalar(box_score_query(include_report).where(Report.id == report_id))
+
+async def get_box_scores(db: AsyncSession, offset: int, limit: int, include_report: bool = False) -> List[Report]:
+    return list(await db.scalars(box_score_query(include_report).order_by(Report.id).offset(offset).limit(limit)))
@@ -0,0 +1,156 @@
+import hashlib
+import re
+from sqlalchemy import Column, Integer, MetaData, String, Table, select, delete, insert, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.database import Base
+from app.services import search
+
+# Startup compares a fingerprint of the declared models with the one stored by the last schema
+# creation, so an up-to-date database costs one SELECT instead of a create_all inspection of
+# every table. On a mismatch, missing tables are created and columns added to existing tables
+# are applied with ALTER TABLE ADD COLUMN; any other difference (a column's type or nullability,
+# an index or search trigger defined differently) needs a migration, and startup refuses to run
+# against it. Columns the models no longer declare are left alone.
+
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String, nullable=False),
+)
+
+# Fills denormalized columns added to tables that already hold rows.
+BACKFILLS = {
+    ("boards", "post_count"):
+        "UPDATE boards SET post_count = (SELECT count(*) FROM posts WHERE posts.board_id = boards.id), "
+        "last_post_at = (SELECT max(posts.timestamp) FROM posts WHERE posts.board_id = boards.id)",
+}
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+def schema_fingerprint(metadata=Base.metadata) -> str:
+    tables = [
+        (table.name,
+         [(column.name, str(column.type), column.nullable, column.primary_key) for column in table.columns],
+         sorted(index.name for index in table.indexes))
+        for table in sorted(metadata.tables.values(), key=lambda table: table.name)
+    ]
+    # The FTS tables and triggers are created outside the metadata, so their DDL is versioned too.
+    tables += [search.fts_ddl(table) for table in sorted(search.FTS_TABLES) if table in metadata.tables]
+    return hashlib.sha256(repr(tables).encode("utf-8")).hexdigest()
+
+def stored_fingerprint(conn: Connection):
+    try:
+        return conn.scalar(select(schema_version.c.fingerprint).where(schema_version.c.id == 1))
+    except (OperationalError, ProgrammingError): # no schema_version table yet
+        return None
+
+def normalize_sql(sql: str) -> str:
+    # sqlite_master keeps the statement as written, minus IF NOT EXISTS.
+    return " ".join(sql.replace(" IF NOT EXISTS", "").split()).lower()
+
+def schema_objects(conn: Connection) -> dict:
+    return {name: sql for name, sql in conn.execute(text("SELECT name, sql FROM sqlite_master WHERE sql IS NOT NULL"))}
+
+def fts_objects(metadata) -> dict:
+    # name -> (content table, DDL) of the FTS tables and triggers of the metadata's searchable tables.
+    return {re.match(r"CREATE (?:VIRTUAL TABLE|TRIGGER) IF NOT EXISTS (\w+)", statement).group(1): (table, statement)
+            for table in sorted(search.FTS_TABLES) if table in metadata.tables
+            for statement in search.fts_ddl(table)}
+
+def check_existing_schema(conn: Connection, metadata, objects: dict):
+    # Raises SchemaOutOfDate when an existing column, index or search trigger differs from its
+    # declaration, since create_all and ADD COLUMN would leave it as it is.
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    differences = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"]: column for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                continue
+            declared = column.type.compile(dialect=conn.dialect)
+            found = existing[column.name]["type"].compile(dialect=conn.dialect)
+            if declared != found:
+                differences.append(f"{table.name}.{column.name} is {found}, declared {declared}")
+            # SQLite lets an INTEGER PRIMARY KEY be declared without NOT NULL, so keys are not compared.
+            if not column.primary_key and existing[column.name]["nullable"] != column.nullable:
+                differences.append(f"{table.name}.{column.name} nullable is {existing[column.name]['nullable']}, "
+                                   f"declared {column.nullable}")
+        for index in table.indexes:
+            if index.name in objects and \
+                    normalize_sql(objects[index.name]) != normalize_sql(str(CreateIndex(index).compile(dialect=conn.dialect))):
+                differences.append(f"index {index.name} is defined differently")
+    if conn.dialect.name == "sqlite":
+        for name, (_, statement) in fts_objects(metadata).items():
+            if name in objects and normalize_sql(objects[name]) != normalize_sql(statement):
+                differences.append(f"search object {name} is defined differently")
+    if differences:
+        raise SchemaOutOfDate("schema out of date: " + "; ".join(differences) + ", migrate the database")
+
+def add_missing_columns(conn: Connection, metadata) -> list:
+    # Returns the (table, column) pairs added. SQLite can only add columns that may be NULL or have a
+    # server default, and not primary key or unique ones; anything else is left to a migration.
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if column.primary_key or column.unique or (not column.nullable and column.server_default is None):
+                raise SchemaOutOfDate(f"schema out of date: {table.name}.{column.name} cannot be added in place, "
+                                      "migrate the database")
+            column_type = column.type.compile(dialect=conn.dialect)
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+            if column.server_default is not None:
+                ddl += f" NOT NULL DEFAULT {column.server_default.arg!r}" if not column.nullable \
+                    else f" DEFAULT {column.server_default.arg!r}"
+            if column.foreign_keys:
+                target = next(iter(column.foreign_keys)).column
+                ddl += f" REFERENCES {target.table.name}({target.name})"
+            conn.execute(text(ddl))
+            added.append((table.name, column.name))
+    return added
+
+def ensure_schema(engine: Engine, metadata=Base.metadata) -> bool:
+    # Returns whether the schema had to be (re)created.
+    fingerprint = schema_fingerprint(metadata)
+    with engine.connect() as conn:
+        if stored_fingerprint(conn) == fingerprint:
+            return False
+    with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            # Takes the write lock up front, so workers cold-starting together run this one at a time
+            # instead of racing on CREATE TABLE; the later ones find the fingerprint already stored.
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            if stored_fingerprint(conn) == fingerprint:
+                return False
+        objects = schema_objects(conn) if conn.dialect.name == "sqlite" else {}
+        check_existing_schema(conn, metadata, objects)
+        # Rows written before a search index existed are indexed once, when its table or triggers are
+        # created; an index that was already complete is not rebuilt on every schema change.
+        new_fts = sorted({table for name, (table, _) in fts_objects(metadata).items() if name not in objects}) \
+            if conn.dialect.name == "sqlite" else []
+        metadata.create_all(bind=conn)
+        added = add_missing_columns(conn, metadata)
+        for table in metadata.sorted_tables:
+            for index in table.indexes: # create_all skips the indexes of tables that already existed
+                conn.execute(CreateIndex(index, if_not_exists=True))
+        for column in added:
+            if column in BACKFILLS:
+                conn.execute(text(BACKFILLS[column]))
+        if new_fts:
+            search.rebuild_search_index(conn, new_fts)
+        schema_version.create(bind=conn, checkfirst=True)
+        conn.execute(delete(schema_version))
+        conn.execute(insert(schema_version).values(id=1, fingerprint=fingerprint))
+    return True
@@ -0,0 +1,127 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import DDL, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.post import Post
+from app.models.match import Report
+
+# FTS5 indexes over posts and match reports. The trigram tokenizer indexes every 3-character
+# window, which works for Korean text without a word segmenter. Triggers keep the indexes in
+# sync with every write path (crud, bulk statements and ingestion). Terms shorter than a trigram
+# are looked up in the index vocabulary (an fts5vocab table) and matched as the trigrams containing them.
+
+FTS_TABLES = {
+    "posts": ("posts_fts", ["title", "content", "author"]),
+    "reports": ("reports_fts", ["report"]),
+}
+MIN_MATCH_LENGTH = 3 # shorter terms are expanded to the indexed trigrams containing them
+# A short term found in more trigrams than this is common enough that a LIKE scan finds a page quickly.
+MAX_SHORT_TERM_TRIGRAMS = 256
+
+def fts_ddl(table: str) -> List[str]:
+    fts_table, columns = FTS_TABLES[table]
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5({column_list}, "
+        f"content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}_vocab USING fts5vocab({fts_table}, 'row')",
+    ]
+
+for model in (Post, Report):
+    fts_table = FTS_TABLES[model.__tablename__][0]
+    for statement in fts_ddl(model.__tablename__):
+        event.listen(model.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for drop_table in (f"{fts_table}_vocab", fts_table):
+        event.listen(model.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {drop_table}").execute_if(dialect="sqlite"))
+
+def rebuild_search_index(connection, tables=FTS_TABLES):
+    # Re-reads the content tables, e.g. for rows written before the indexes existed.
+    for table in tables:
+        for statement in fts_ddl(table):
+            connection.execute(text(statement))
+        fts_table = FTS_TABLES[table][0]
+        connection.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+
+def like_pattern(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def quote(phrase: str) -> str:
+    return '"' + phrase.replace('"', '""') + '"'
+
+async def short_term_trigrams(db: AsyncSession, fts_table: str, term: str) -> Optional[List[str]]:
+    # Scans the index vocabulary, which grows with the distinct trigrams rather than the rows.
+    # Returns None when the term is in too many trigrams to match as one OR group.
+    trigrams = list(await db.scalars(text(
+        f"SELECT term FROM {fts_table}_vocab WHERE term LIKE :term ESCAPE '\\' LIMIT :limit"
+    ), {"term": like_pattern(term), "limit": MAX_SHORT_TERM_TRIGRAMS + 1}))
+    return trigrams if len(trigrams) <= MAX_SHORT_TERM_TRIGRAMS else None
+
+async def build_conditions(db: AsyncSession, table: str, q: str) -> Tuple[str, List[str], dict]:
+    # Terms of 3+ characters become quoted FTS phrases (substring match on trigrams); shorter
+    # terms become an OR of the trigrams containing them, or LIKE conditions when they are too common.
+    # A short term in no trigram matches nothing, so the conditions come back empty.
+    fts_table, columns = FTS_TABLES[table]
+    params = {}
+    phrases, conditions = [], []
+    for index, term in enumerate(q.split()):
+        if len(term) >= MIN_MATCH_LENGTH:
+            phrases.append(quote(term))
+            continue
+        trigrams = await short_term_trigrams(db, fts_table, term)
+        if trigrams == []:
+            return "", [], {}
+        if trigrams is not None:
+            phrases.append("(" + " OR ".join(quote(trigram) for trigram in trigrams) + ")")
+        else:
+            params[f"term{index}"] = like_pattern(term)
+            conditions.append("(" + " OR ".join(
+                f"{fts_table}.{column} LIKE :term{index} ESCAPE '\\'" for column in columns) + ")")
+    match = " AND ".join(phrases)
+    if match:
+        params["match"] = match
+        conditions.insert(0, f"{fts_table} MATCH :match")
+    return match, conditions, params
+
+async def search_posts(db: AsyncSession, q: str, limit: int, offset: int, board_id: int = None) -> List[dict]:
+    match, conditions, params = await build_conditions(db, "posts", q)
+    if not conditions:
+        return []
+    if board_id is not None:
+        conditions.append("posts.board_id = :board_id")
+        params["board_id"] = board_id
+    snippet = "snippet(posts_fts, 1, '[', ']', '...', 16)" if match else "substr(posts.content, 1, 100)"
+    order_by = "bm25(posts_fts), posts.id DESC" if match else "posts.id DESC"
+    result = await db.execute(text(
+        f"SELECT posts.id, posts.board_id, posts.title, posts.author, posts.timestamp, {snippet} AS snippet "
+        f"FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid "
+        f"JOIN boards ON boards.id = posts.board_id AND boards.deleted_at IS NULL " # boards being purged
+        f"WHERE {' AND '.join(conditions)} ORDER BY {order_by} LIMIT :limit OFFSET :offset"
+    ), dict(params, limit=limit, offset=offset))
+    return [dict(row) for row in result.mappings()]
+
+async def search_reports(db: AsyncSession, q: str, limit: int, offset: int) -> List[dict]:
+    match, conditions, params = await build_conditions(db, "reports", q)
+    if not conditions:
+        return []
+    snippet = "snippet(reports_fts, 0, '[', ']', '...', 32)" if match else "substr(reports.report, 1, 200)"
+    order_by = "bm25(reports_fts), reports.id DESC" if match else "reports.id DESC"
+    result = await db.execute(text(
+        f"SELECT reports.id, reports.source, {snippet} AS snippet "
+        f"FROM reports_fts JOIN reports ON reports.id = reports_fts.rowid "
+        f"WHERE {' AND '.join(conditions)} ORDER BY {order_by} LIMIT :limit OFFSET :offset"
+    ), dict(params, limit=limit, offset=offset))
+    return [dict(row) for row in result.mappings()]
+
+if __name__ == '__main__':
+    from app.database import engine
+    with engine.begin() as conn:
+        rebuild_search_index(conn)
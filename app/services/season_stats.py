@@ -0,0 +1,77 @@
+from typing import List
+import numpy as np
+
+from app.services.analytics import STAT_FIELDS, QUARTERS, CLUTCH_QUARTERS, EFFICIENCY_FIELDS, TEAM_FIELDS
+
+# The NumPy side of analytics. app.main does not import this module, so the API process only
+# loads NumPy when the first season stats are computed (see analytics.compute_stats).
+
+def share(part, whole):
+    return np.divide(part, whole, out=np.zeros_like(part, dtype=float), where=whole > 0)
+
+def rolling_mean(values, window: int):
+    # Mean of the last `window` values at each position; the first games average what exists so far.
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (sums[ends] - sums[starts]) / (ends - starts)
+
+def player_stats(keys: list, stats) -> List[dict]:
+    column = {field: stats[:, index] for index, field in enumerate(STAT_FIELDS)}
+    player_ids = np.array([key[3] if key[3] is not None else -1 for key in keys])
+    rows = player_ids >= 0 # rows not yet linked to a player (see players.rebuild_players) are left out
+    unique_ids, first_rows, inverse = np.unique(player_ids[rows], return_index=True, return_inverse=True)
+    row_index = np.flatnonzero(rows)[first_rows]
+    games = np.bincount(inverse).astype(float)
+    totals = {field: np.bincount(inverse, weights=values[rows], minlength=len(unique_ids))
+              for field, values in column.items()}
+
+    efficiency = sum(totals[field] for field in EFFICIENCY_FIELDS) / games
+    quarter_points = sum(totals[f"score_{quarter}"] for quarter in QUARTERS)
+    quarter_share = {quarter: share(totals[f"score_{quarter}"], quarter_points) for quarter in QUARTERS}
+    clutch_points = sum(totals[f"score_{quarter}"] for quarter in CLUTCH_QUARTERS)
+    clutch_share = share(clutch_points, quarter_points)
+
+    return [{
+        "player_id": int(unique_ids[i]), "player": keys[row_index[i]][4], "team": keys[row_index[i]][2],
+        "backnumber": keys[row_index[i]][5], "games": int(games[i]),
+        "points_per_game": float(totals['score_Total'][i] / games[i]), "efficiency": float(efficiency[i]),
+        "quarter_share": {quarter: float(values[i]) for quarter, values in quarter_share.items()},
+        "clutch_points": int(clutch_points[i]), "clutch_points_per_game": float(clutch_points[i] / games[i]),
+        "clutch_share": float(clutch_share[i]),
+    } for i in range(len(unique_ids))]
+
+def team_stats(keys: list, stats, window: int) -> List[dict]:
+    team_result_ids = np.array([key[1] for key in keys])
+    # Rows are ordered by game, so the first row of each team result gives the game order.
+    unique_ids, first_rows, inverse = np.unique(team_result_ids, return_index=True, return_inverse=True)
+    order = np.argsort(first_rows, kind="stable")
+    game_totals = {name: np.bincount(inverse, weights=stats[:, STAT_FIELDS.index(field)])[order]
+                   for name, field in TEAM_FIELDS.items()}
+    games = [keys[row] for row in first_rows[order]]
+
+    names = [game[2] for game in games]
+    team_names = sorted(set(names), key=lambda team: (team is None, team))
+    team_codes = {team: code for code, team in enumerate(team_names)}
+    codes = np.array([team_codes[name] for name in names])
+
+    teams = []
+    for code, team in enumerate(team_names):
+        positions = np.flatnonzero(codes == code)
+        series = {name: values[positions] for name, values in game_totals.items()}
+        averages = {name: rolling_mean(values, window) for name, values in series.items()}
+        teams.append({
+            "team": team, "games": len(positions),
+            "per_game": {name: float(values.mean()) for name, values in series.items()},
+            "rolling": [dict({"report_id": games[position][0]},
+                             **{name: int(series[name][n]) for name in TEAM_FIELDS},
+                             **{f"{name}_avg": float(averages[name][n]) for name in TEAM_FIELDS})
+                        for n, position in enumerate(positions)],
+        })
+    return teams
+
+def compute_stats(keys: list, values: list, window: int) -> dict:
+    if not keys:
+        return {"players": [], "teams": []}
+    stats = np.nan_to_num(np.array(values, dtype=float)) # missing cells count as 0
+    return {"players": player_stats(keys, stats), "teams": team_stats(keys, stats, window)}
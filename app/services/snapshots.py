@@ -0,0 +1,104 @@
+import io
+import logging
+import os
+import tempfile
+from typing import Iterable, Iterator, List
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models.match import PLAYER_STAT_FIELDS, Report
+from app.services import exports
+
+# Columnar copies of the match tables for analytics: one Parquet file per report under
+# SNAPSHOT_DIR/<table>/, rewritten after the report is ingested and removed with it.
+# pyarrow is imported where it is used so the API process does not pay for it at startup.
+
+logger = logging.getLogger(__name__)
+
+TABLES = {
+    "player_stats": exports.player_stat_export_query,
+    "team_results": exports.team_result_export_query,
+}
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def table_schema(table: str):
+    import pyarrow as pa
+    fields = [("report_id", pa.int64()), ("source", pa.string()), ("team_result_id", pa.int64()),
+              ("team", pa.string()), ("result", pa.string())]
+    if table == "player_stats":
+        fields.append(("player_id", pa.int64()))
+        fields += [(field, pa.string() if field == "player" else pa.int64()) for field in PLAYER_STAT_FIELDS]
+    return pa.schema(fields)
+
+def table_dir(table: str) -> str:
+    return os.path.join(config.SNAPSHOT_DIR, table)
+
+def partition_path(table: str, report_id: int) -> str:
+    return os.path.join(table_dir(table), f"report-{report_id:08d}.parquet")
+
+def partition_paths(table: str) -> List[str]:
+    directory = table_dir(table)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".parquet"))
+
+def write_partition(db: Session, table: str, report_id: int):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    rows = db.execute(TABLES[table]().where(Report.id == report_id)).mappings().all()
+    path = partition_path(table, report_id)
+    if not rows: # the report was removed
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    os.makedirs(table_dir(table), exist_ok=True)
+    # Written next to the target and renamed, so readers never see a partial file.
+    with tempfile.NamedTemporaryFile(dir=table_dir(table), suffix=".tmp", delete=False) as tmp:
+        try:
+            pq.write_table(pa.Table.from_pylist([dict(row) for row in rows], schema=table_schema(table)), tmp)
+        except BaseException:
+            os.unlink(tmp.name) # a failed write leaves no stray .tmp file behind
+            raise
+    os.replace(tmp.name, path)
+
+def write_report_snapshots(db: Session, report_ids: Iterable[int]):
+    for report_id in report_ids:
+        for table in TABLES:
+            write_partition(db, table, report_id)
+
+def remove_report_snapshots(report_id: int):
+    for table in TABLES:
+        path = partition_path(table, report_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+def stream_snapshot(table: str) -> Iterator[bytes]:
+    # Arrow IPC stream of the snapshot, one record batch per partition. Clients can save it and
+    # read it back zero-copy with pyarrow.ipc.open_stream(pyarrow.memory_map(path)).
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table_schema(table)) as writer:
+        for path in partition_paths(table):
+            for batch in pq.read_table(path, memory_map=True).to_batches():
+                writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue() # end-of-stream marker
+
+def rebuild_snapshots(db: Session):
+    # Full snapshot: rewrites every report's partitions and drops partitions of removed reports.
+    report_ids = set(db.scalars(select(Report.id)))
+    write_report_snapshots(db, sorted(report_ids))
+    for table in TABLES:
+        for path in partition_paths(table):
+            report_id = int(os.path.basename(path)[len("report-"):-len(".parquet")])
+            if report_id not in report_ids:
+                os.remove(path)
+
+if __name__ == '__main__':
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        rebuild_snapshots(session)
@@ -0,0 +1,28 @@
+import os
+import hashlib
+import tempfile
+from typing import Tuple
+from fastapi import UploadFile
+
+from app import config
+
+CHUNK_SIZE = 1024 * 1024
+
+async def spool_upload_file(file: UploadFile) -> Tuple[str, str]:
+    # Copies the upload to a temp file chunk by chunk so the workbook is never held in memory,
+    # fingerprinting the content on the way. The caller owns the returned path.
+    suffix = os.path.splitext(file.filename or "")[1] or ".xlsx"
+    content_hash = hashlib.sha256()
+    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=config.UPLOAD_DIR, delete=False, suffix=suffix) as spooled:
+        while chunk := await file.read(CHUNK_SIZE):
+            content_hash.update(chunk)
+            spooled.write(chunk)
+    await file.close()
+    return spooled.name, content_hash.hexdigest()
+
+def remove_spooled_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
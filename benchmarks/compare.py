@@ -0,0 +1,43 @@
+import argparse
+import glob
+import json
+import os
+
+from benchmarks.run import RESULTS_DIR
+
+# Compares two saved benchmark runs, by default the two most recent in benchmarks/results:
+#
+#   python -m benchmarks.compare [baseline.json candidate.json]
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def benchmarks(result: dict) -> dict:
+    return {"parsing_excel_file": result["parsing_excel_file"], **result["routes"]}
+
+def change(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+
+def compare(baseline: dict, candidate: dict, metric: str = "p95_ms") -> list:
+    # Rows of (benchmark, baseline value, candidate value, relative change) for benchmarks in both runs.
+    before, after = benchmarks(baseline), benchmarks(candidate)
+    return [(name, before[name][metric], after[name][metric], change(before[name][metric], after[name][metric]))
+            for name in before if name in after]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("files", nargs="*", help="baseline and candidate result files")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms", "throughput_rps"])
+    parser.add_argument("--results", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(args.results, "*.json")), key=os.path.getmtime)[-2:]
+    if len(files) != 2:
+        parser.error("need two result files")
+    baseline, candidate = load(files[0]), load(files[1])
+    if baseline["params"] != candidate["params"]:
+        print(f"warning: runs used different parameters: {baseline['params']} vs {candidate['params']}")
+    print(f"{args.metric}: {baseline['commit']} -> {candidate['commit']}")
+    for name, before, after, delta in compare(baseline, candidate, args.metric):
+        print(f"{name:48} {before:>10.2f} {after:>10.2f} {delta:>9}")
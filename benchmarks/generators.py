@@ -0,0 +1,111 @@
+import io
+import random
+import zipfile
+from datetime import datetime, timedelta
+from typing import List
+from openpyxl import Workbook
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.board import Board
+from app.models.post import Post
+from app.services.board_stats import rebuild_board_stats
+from app.services.excel_parsing import REPORT_CELL, TEAM_BLOCKS, TEAM_COLUMN, RESULT_COLUMN
+
+# Synthetic data for the benchmark suite. Everything is derived from a seeded random.Random,
+# so two runs at the same scale generate the same database and workbooks.
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN_SYLLABLES = "민서준도윤하지우현수연호성진영재동창유승주권"
+TEAM_NAMES = ["프레스토", "블리츠", "레인", "썬더", "스톰", "이글스", "타이탄", "피닉스", "울브스", "불스",
+              "레이커스", "셀틱스", "히트", "넷츠", "매직", "호크스"]
+INSERT_CHUNK_SIZE = 20000
+
+def generate_boards_and_posts(db: Session, boards: int, posts: int, seed: int = 0) -> List[int]:
+    # Posts are spread round-robin over the boards with increasing timestamps and inserted
+    # with executemany in chunks, so 10M rows never sit in memory at once.
+    rng = random.Random(seed)
+    board_ids = list(db.scalars(
+        insert(Board).returning(Board.id),
+        [{"name": f"bench-board-{i}", "description": f"synthetic board {i}", "post_count": 0} for i in range(boards)],
+    ))
+    start = datetime(2024, 1, 1)
+    for offset in range(0, posts, INSERT_CHUNK_SIZE):
+        db.execute(insert(Post), [
+            {"title": f"게시글 {i} {rng.choice(TEAM_NAMES)} 경기 후기", "content": synthetic_text(rng),
+             "author": f"user{rng.randrange(1000)}", "board_id": board_ids[i % boards],
+             "timestamp": start + timedelta(seconds=i)}
+            for i in range(offset, min(offset + INSERT_CHUNK_SIZE, posts))
+        ])
+        db.commit()
+    rebuild_board_stats(db)
+    return sorted(board_ids)
+
+def synthetic_text(rng: random.Random, words: int = 40) -> str:
+    return " ".join(rng.choice(TEAM_NAMES) if rng.random() < 0.1 else player_name(rng) for _ in range(words))
+
+def player_name(rng: random.Random) -> str:
+    return rng.choice(SURNAMES) + rng.choice(GIVEN_SYLLABLES) + rng.choice(GIVEN_SYLLABLES)
+
+def team_roster(team: str, seed: int = 0) -> List[tuple]:
+    # A stable roster of 12 (backnumber, name) per team, so players recur across games.
+    rng = random.Random(f"{seed}:{team}")
+    backnumbers = rng.sample(range(0, 100), 12)
+    return [(backnumber, player_name(rng)) for backnumber in backnumbers]
+
+def generate_player_stat(rng: random.Random, backnumber: int, player: str) -> dict:
+    quarters = [rng.choice([None, 0, 2, 3, 4, 5, 7]) for _ in range(4)]
+    overtime = rng.choice([None] * 9 + [2])
+    offense, defense = rng.randrange(5), rng.randrange(9)
+    return {
+        "backnumber": backnumber, "player": player,
+        "offense_rebound": offense, "defense_rebound": defense, "total_rebound": offense + defense,
+        "assist": rng.randrange(8), "steal": rng.randrange(4), "block": rng.randrange(3),
+        "score_1Q": quarters[0], "score_2Q": quarters[1], "score_3Q": quarters[2], "score_4Q": quarters[3],
+        "score_OT": overtime, "score_Total": sum(score or 0 for score in quarters + [overtime]),
+    }
+
+def generate_report(rng: random.Random, seed: int = 0) -> dict:
+    # Same shape as excel_parsing.parse_sheet returns.
+    team_a, team_b = rng.sample(TEAM_NAMES, 2)
+    winner = rng.choice([team_a, team_b])
+    team_results = []
+    for team in (team_a, team_b):
+        roster = team_roster(team, seed)
+        players = sorted(rng.sample(roster, rng.randint(5, len(roster))))
+        team_results.append({
+            "team": team, "result": "WIN" if team == winner else "LOSE",
+            "player_stats": [generate_player_stat(rng, backnumber, player) for backnumber, player in players],
+        })
+    return {"report": f"'{team_a}'와 '{team_b}'의 경기. " + synthetic_text(rng, 200), "team_results": team_results}
+
+def write_report_sheet(ws, report: dict):
+    # Renders a report into the score-sheet layout parse_sheet reads: DataFrame row r is sheet
+    # row r + 2 and column c is sheet column c + 1.
+    ws.cell(row=REPORT_CELL[0] + 2, column=REPORT_CELL[1] + 1, value=report["report"])
+    for (header_row, first_row, last_row), team_result in zip(TEAM_BLOCKS, report["team_results"]):
+        ws.cell(row=header_row + 2, column=TEAM_COLUMN + 1, value=team_result["team"])
+        ws.cell(row=header_row + 2, column=RESULT_COLUMN + 1, value=team_result["result"])
+        for offset, player_stat in enumerate(team_result["player_stats"][:last_row - first_row + 1]):
+            for column, value in enumerate(player_stat.values(), start=2):
+                ws.cell(row=first_row + 2 + offset, column=column, value=value)
+
+def build_workbook(reports: List[dict]) -> bytes:
+    wb = Workbook()
+    wb.remove(wb.active)
+    for index, report in enumerate(reports):
+        write_report_sheet(wb.create_sheet(f"game{index + 1}"), report)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+def generate_workbooks(count: int, sheets: int = 1, seed: int = 0) -> List[bytes]:
+    rng = random.Random(seed)
+    return [build_workbook([generate_report(rng, seed) for _ in range(sheets)]) for _ in range(count)]
+
+def build_zip(workbooks: List[bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for index, workbook in enumerate(workbooks):
+            archive.writestr(f"workbook{index + 1}.xlsx", workbook)
+    return buffer.getvalue()
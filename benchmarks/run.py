@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app import config
+from app.database import Base
+from app.main import app, get_db, get_async_db
+from app.models.board import Board
+from app.models.player import Player
+from app.models.post import Post
+from app.services import board_purge, exports, jobs, snapshots
+from app.services.cache import board_cache
+from app.services.excel_parsing import parsing_excel_file
+from app.services.ingestion import save_report
+from benchmarks import generators
+
+# Latency/throughput benchmark of every route in app.main and of parsing_excel_file against a
+# synthetic database in a temporary directory. Results are written as JSON keyed by commit;
+# compare two runs with `python -m benchmarks.compare`.
+#
+#   python -m benchmarks.run --posts 100000 --games 50 --iterations 200
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    # Nearest-rank percentile of samples already sorted in ascending order.
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, math.ceil(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+def summarize(samples: List[float], elapsed: float, errors: int = 0) -> dict:
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed if elapsed > 0 else 0.0,
+    }
+
+# (method, route path) -> (request factory, iteration factor). A factory takes the benchmark
+# context and the iteration number and returns the URL and httpx request keyword arguments.
+# Destructive routes consume resources prepared in setup; heavy routes run fewer iterations.
+ROUTES = {
+    ("GET", "/"): (lambda ctx, i: ("/", {}), 1),
+    ("GET", "/metrics"): (lambda ctx, i: ("/metrics", {}), 1),
+    ("POST", "/boards/"): (lambda ctx, i: ("/boards/", {"json": {"name": f"new-board-{i}", "description": ""}}), 1),
+    ("GET", "/boards/{boardId}"): (lambda ctx, i: (f"/boards/{ctx.pick(ctx.board_ids)}", {}), 1),
+    ("GET", "/boards/"): (lambda ctx, i: ("/boards/", {}), 1),
+    ("PATCH", "/boards/{boardId}"): (lambda ctx, i: (f"/boards/{ctx.board_ids[0]}", {"json": {
+        "name": ctx.board_name, "description": f"edited {i}"}}), 1),
+    ("DELETE", "/boards/{boardId}"): (lambda ctx, i: (f"/boards/{ctx.disposable_board_ids.pop()}", {}), 1),
+    ("POST", "/boards/{boardId}/posts/"): (lambda ctx, i: (f"/boards/{ctx.pick(ctx.board_ids)}/posts/", {
+        "json": {"title": f"new post {i}", "content": "벤치마크 게시글 내용", "author": "bench"}}), 1),
+    ("GET", "/boards/{boardId}/posts/{postId}"): (lambda ctx, i: ("/boards/{}/posts/{}".format(*ctx.pick(ctx.posts)), {}), 1),
+    ("GET", "/boards/{boardId}/posts/"): (lambda ctx, i: (f"/boards/{ctx.pick(ctx.board_ids)}/posts/", {"params": {"limit": 20}}), 1),
+    ("PATCH", "/boards/{boardId}/posts/{postId}"): (lambda ctx, i: ctx.patch_post(i), 1),
+    ("DELETE", "/boards/{boardId}/posts/{postId}"): (lambda ctx, i: ("/boards/{}/posts/{}".format(*ctx.disposable_posts.pop()), {}), 1),
+    ("POST", "/boards/{boardId}/posts:batch"): (lambda ctx, i: (f"/boards/{ctx.pick(ctx.board_ids)}/posts:batch", {"json": {
+        "create": [{"title": f"batch post {i}-{n}", "content": "벤치마크", "author": "bench"} for n in range(100)]}}), 0.2),
+    ("GET", "/boards/{boardId}/posts:export"): (lambda ctx, i: (f"/boards/{ctx.pick(ctx.board_ids)}/posts:export", {}), 0.05),
+    ("GET", "/exports/player-stats"): (lambda ctx, i: ("/exports/player-stats", {}), 0.05),
+    ("GET", "/exports/team-results"): (lambda ctx, i: ("/exports/team-results", {}), 0.05),
+    ("GET", "/snapshots/{table}"): (lambda ctx, i: ("/snapshots/player_stats", {}), 0.05),
+    ("GET", "/snapshots/{table}/{reportId}"): (lambda ctx, i: (f"/snapshots/player_stats/{ctx.pick(ctx.report_ids)}", {}), 1),
+    ("POST", "/uploadfile/"): (lambda ctx, i: ("/uploadfile/", {"files": {"file": (f"upload{i}.xlsx", ctx.uploads.pop())}}), 0.1),
+    ("POST", "/uploads/batch"): (lambda ctx, i: ("/uploads/batch", {"files": {"file": (f"batch{i}.zip", ctx.batches.pop())}}), 0.05),
+    ("GET", "/uploads/queue"): (lambda ctx, i: ("/uploads/queue", {}), 1),
+    ("GET", "/uploads/{jobId}"): (lambda ctx, i: (f"/uploads/{ctx.pick(ctx.job_ids)}", {}), 1),
+    ("GET", "/reports/"): (lambda ctx, i: ("/reports/", {"params": {"limit": 20}}), 1),
+    ("GET", "/reports/{reportId}"): (lambda ctx, i: (f"/reports/{ctx.pick(ctx.report_ids)}", {}), 1),
+    ("DELETE", "/reports/{reportId}"): (lambda ctx, i: (f"/reports/{ctx.disposable_report_ids.pop()}", {}), 1),
+    ("GET", "/leaderboards/players"): (lambda ctx, i: ("/leaderboards/players", {"params": {"stat": "points"}}), 1),
+    ("GET", "/leaderboards/teams"): (lambda ctx, i: ("/leaderboards/teams", {"params": {"stat": "rebounds"}}), 1),
+    ("GET", "/analytics/players"): (lambda ctx, i: ("/analytics/players", {"params": {"sort": "efficiency"}}), 1),
+    ("GET", "/analytics/teams"): (lambda ctx, i: ("/analytics/teams", {}), 1),
+    ("GET", "/players/"): (lambda ctx, i: ("/players/", {"params": {"team": "프레스토"}}), 1),
+    ("GET", "/players/{playerId}"): (lambda ctx, i: (f"/players/{ctx.pick(ctx.player_ids)}", {}), 1),
+    ("GET", "/players/{playerId}/games"): (lambda ctx, i: (f"/players/{ctx.pick(ctx.player_ids)}/games", {}), 1),
+    ("GET", "/search/posts"): (lambda ctx, i: ("/search/posts", {"params": {"q": ctx.pick(generators.TEAM_NAMES)}}), 1),
+    ("GET", "/search/reports"): (lambda ctx, i: ("/search/reports", {"params": {"q": ctx.pick(generators.TEAM_NAMES)}}), 1),
+}
+
+def app_routes() -> List[tuple]:
+    return sorted((method, route.path) for route in app.routes if isinstance(route, APIRoute) for method in route.methods)
+
+def route_iterations(iterations: int, factor: float) -> int:
+    return max(3, int(iterations * factor))
+
+def setup_database(workdir: str):
+    # Points the app, the job workers, the board purge and the export/snapshot writers at a fresh
+    # database in workdir. Returns the previous settings for restore_database.
+    previous = {"jobs": jobs.session_factory, "exports": exports.session_factory,
+                "board_purge": board_purge.session_factory,
+                "UPLOAD_DIR": config.UPLOAD_DIR, "SNAPSHOT_DIR": config.SNAPSHOT_DIR}
+    path = os.path.join(workdir, "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    jobs.session_factory = session_factory
+    exports.session_factory = async_session_factory
+    board_purge.session_factory = async_session_factory # the DELETE /boards/{boardId} purge
+    config.UPLOAD_DIR = os.path.join(workdir, "uploads")
+    config.SNAPSHOT_DIR = os.path.join(workdir, "snapshots")
+    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
+    board_cache.clear()
+    return engine, async_engine, session_factory, previous
+
+def restore_database(previous: dict):
+    app.dependency_overrides.clear()
+    jobs.session_factory = previous["jobs"]
+    exports.session_factory = previous["exports"]
+    board_purge.session_factory = previous["board_purge"]
+    config.UPLOAD_DIR = previous["UPLOAD_DIR"]
+    config.SNAPSHOT_DIR = previous["SNAPSHOT_DIR"]
+    board_cache.clear()
+
+def benchmark_parsing(session_factory, workdir: str, games: int, seed: int) -> tuple:
+    # Times parsing_excel_file on distinct synthetic workbooks; the reports feed the read routes.
+    samples, report_ids = [], []
+    for index, content in enumerate(generators.generate_workbooks(games, seed=seed)):
+        path = os.path.join(workdir, f"game{index}.xlsx")
+        with open(path, "wb") as f:
+            f.write(content)
+        with session_factory() as db:
+            start = time.perf_counter()
+            report_ids.append(parsing_excel_file(path, db, source=f"game{index}.xlsx"))
+            samples.append(time.perf_counter() - start)
+    return summarize(samples, sum(samples)), report_ids
+
+def build_context(session_factory, board_ids: List[int], report_ids: List[int], iterations: int, seed: int):
+    rng = random.Random(seed)
+    pool = route_iterations(iterations, 1) + 1 # warmup request + measured iterations
+    with session_factory() as db:
+        posts = [tuple(row) for row in db.execute(select(Post.board_id, Post.id).order_by(Post.id).limit(10000))]
+        player_ids = list(db.scalars(select(Player.id).limit(1000)))
+        board_name = db.scalar(select(Board.name).where(Board.id == board_ids[0]))
+        disposable_report_ids = [save_report(db, generators.generate_report(rng, seed)) for _ in range(pool)]
+    ctx = SimpleNamespace(
+        rng=rng, board_ids=board_ids, board_name=board_name, posts=posts, report_ids=report_ids, player_ids=player_ids,
+        disposable_report_ids=disposable_report_ids, disposable_board_ids=[], disposable_posts=[], job_ids=[],
+        uploads=generators.generate_workbooks(route_iterations(iterations, 0.1) + 2, seed=seed + 1), # + the seed job
+        batches=[generators.build_zip(generators.generate_workbooks(2, seed=seed + 2 + n))
+                 for n in range(route_iterations(iterations, 0.05) + 1)],
+    )
+    ctx.pick = lambda values: values[rng.randrange(len(values))]
+    ctx.patch_post = lambda i: ("/boards/{}/posts/{}".format(*posts[i % len(posts)]), {"json": {
+        "id": posts[i % len(posts)][1], "board_id": posts[i % len(posts)][0], "title": f"edited {i}",
+        "content": "수정된 내용", "author": "bench", "timestamp": "2024-01-01T00:00:00"}})
+    return ctx
+
+async def prepare_disposables(client: httpx.AsyncClient, ctx, iterations: int):
+    # Boards and posts that the DELETE routes remove, created through the API itself.
+    pool = route_iterations(iterations, 1) + 1
+    for n in range(pool):
+        ctx.disposable_board_ids.append((await client.post("/boards/", json={"name": f"disposable-{n}"})).json()["id"])
+    response = await client.post(f"/boards/{ctx.board_ids[0]}/posts:batch", json={
+        "create": [{"title": f"disposable {n}", "content": "삭제될 게시글", "author": "bench"} for n in range(pool)]})
+    ctx.disposable_posts = [(ctx.board_ids[0], result["id"]) for result in response.json()["results"]]
+    ctx.job_ids = [(await client.post("/uploadfile/", files={"file": ("seed.xlsx", ctx.uploads.pop())})).json()["job_id"]]
+
+async def benchmark_route(client: httpx.AsyncClient, ctx, method: str, make_request, iterations: int,
+                          concurrency: int) -> dict:
+    async def send(i: int):
+        url, kwargs = make_request(ctx, i)
+        return await client.request(method, url, **kwargs)
+
+    await send(-1) # warmup
+    samples, errors = [], 0
+    counter = iter(range(iterations))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await send(i)
+            samples.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(samples, time.perf_counter() - start, errors)
+
+async def benchmark_routes(ctx, iterations: int, concurrency: int) -> dict:
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        await prepare_disposables(client, ctx, iterations)
+        for (method, path), (make_request, factor) in ROUTES.items():
+            results[f"{method} {path}"] = await benchmark_route(
+                client, ctx, method, make_request, route_iterations(iterations, factor), concurrency)
+    return results
+
+def git_commit() -> tuple:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+def run(boards: int, posts: int, games: int, iterations: int, concurrency: int, seed: int) -> dict:
+    uncovered = [f"{method} {path}" for method, path in app_routes() if (method, path) not in ROUTES]
+    with tempfile.TemporaryDirectory() as workdir:
+        engine, async_engine, session_factory, previous = setup_database(workdir)
+        try:
+            started = time.perf_counter()
+            with session_factory() as db:
+                board_ids = generators.generate_boards_and_posts(db, boards, posts, seed=seed)
+            generation_seconds = time.perf_counter() - started
+
+            parsing, report_ids = benchmark_parsing(session_factory, workdir, games, seed)
+            with session_factory() as db:
+                snapshots.rebuild_snapshots(db)
+            ctx = build_context(session_factory, board_ids, report_ids, iterations, seed)
+            routes = asyncio.run(benchmark_routes(ctx, iterations, concurrency))
+        finally:
+            jobs.shutdown(wait=True) # running ingestion jobs still write to the database and workdir
+            restore_database(previous)
+            asyncio.run(async_engine.dispose())
+            engine.dispose()
+
+    commit, dirty = git_commit()
+    return {
+        "commit": commit, "dirty": dirty, "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": {"boards": boards, "posts": posts, "games": games, "iterations": iterations,
+                   "concurrency": concurrency, "seed": seed},
+        "generation_seconds": generation_seconds,
+        "parsing_excel_file": parsing,
+        "routes": routes,
+        "uncovered_routes": uncovered,
+    }
+
+def save_result(result: dict, output_dir: str) -> str:
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = result["timestamp"].replace(":", "").replace("-", "")
+    name = f"{stamp}-{result['commit']}{'-dirty' if result['dirty'] else ''}-posts{result['params']['posts']}.json"
+    path = os.path.join(output_dir, name)
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return path
+
+def print_result(result: dict):
+    print(f"{'benchmark':48} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'err':>4}")
+    for name, stats in [("parsing_excel_file", result["parsing_excel_file"]), *result["routes"].items()]:
+        print(f"{name:48} {stats['count']:>5} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+              f"{stats['p99_ms']:>9.2f} {stats['throughput_rps']:>9.1f} {stats['errors']:>4}")
+    for name in result["uncovered_routes"]:
+        print(f"not benchmarked: {name}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark every API route and parsing_excel_file on synthetic data.")
+    parser.add_argument("--boards", type=int, default=100)
+    parser.add_argument("--posts", type=int, default=10000, help="total synthetic posts, e.g. 10000 to 10000000")
+    parser.add_argument("--games", type=int, default=30, help="synthetic workbooks parsed and ingested")
+    parser.add_argument("--iterations", type=int, default=100, help="measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    result = run(args.boards, args.posts, args.games, args.iterations, args.concurrency, args.seed)
+    print_result(result)
+    print(f"saved {save_result(result, args.output)}")
@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.run import RESULTS_DIR, git_commit, summarize
+
+# Cold-start benchmark of an API worker: each sample is a fresh interpreter that imports app.main
+# and runs the startup handlers against a database in a temporary working directory. The first
+# boot creates the schema; later boots only check its version.
+#
+#   python -m benchmarks.startup --runs 10
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "pyarrow")
+
+PROBE = f"""
+import json, sys, time
+started_at = time.perf_counter()
+import app.main
+imported_at = time.perf_counter()
+app.main.on_startup()
+ready_at = time.perf_counter()
+app.main.on_shutdown()
+print(json.dumps({{"import": imported_at - started_at, "startup": ready_at - imported_at,
+                  "heavy_modules": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+def probe(workdir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, UPLOAD_DIR=os.path.join(workdir, "uploads"))
+    started_at = datetime.now()
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result["process"] = (datetime.now() - started_at).total_seconds() # includes interpreter start
+    return result
+
+def run(runs: int) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        first_boot = probe(workdir)
+        samples = [probe(workdir) for _ in range(runs)]
+    commit, dirty = git_commit()
+    return {
+        "commit": commit, "dirty": dirty, "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0], "params": {"runs": runs},
+        "first_boot": first_boot,
+        "import": summarize([sample["import"] for sample in samples], sum(sample["import"] for sample in samples)),
+        "startup": summarize([sample["startup"] for sample in samples], sum(sample["startup"] for sample in samples)),
+        "process": summarize([sample["process"] for sample in samples], sum(sample["process"] for sample in samples)),
+        "heavy_modules": samples[-1]["heavy_modules"],
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure app.main import time and startup time in fresh interpreters.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "startup"))
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    print(f"first boot: import {result['first_boot']['import'] * 1000:.1f} ms, startup {result['first_boot']['startup'] * 1000:.1f} ms")
+    for name in ("import", "startup", "process"):
+        stats = result[name]
+        print(f"{name:8} p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms")
+    print(f"heavy modules loaded at startup: {', '.join(result['heavy_modules']) or 'none'}")
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{result['timestamp'].replace(':', '').replace('-', '')}-{result['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"saved {path}")
@@ -0,0 +1,101 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+import pytest
+
+from app import config
+from app.database import Base
+from app.main import app, get_db, get_async_db
+from app.services import analytics, board_purge, exports, jobs
+from app.services.cache import board_cache
+from app.services.excel_parsing import parsing_excel_file
+from test.sample_sheets import build_score_sheet
+
+TEST_DATABASE_URL  = "sqlite:///./test.db"
+engine = create_engine(TEST_DATABASE_URL , connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# TestClient runs every request on a fresh event loop, so async connections must not be pooled.
+ASYNC_TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+async_engine = create_async_engine(ASYNC_TEST_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Shared helpers for the board, post and ingestion tests.
+
+def create_board(client, name="notice", description=""):
+    return client.post("/boards/", json={"name": name, "description": description}).json()["id"]
+
+def create_post(client, board_id, title="title", content="content", author="author"):
+    return client.post(f"/boards/{board_id}/posts", json={"title": title, "content": content, "author": author}).json()
+
+def ingest(db, tmp_path, name, **kwargs):
+    # Writes a generated score sheet under tmp_path and ingests it with the file name as its source.
+    path = tmp_path / name
+    path.write_bytes(build_score_sheet(**kwargs))
+    return parsing_excel_file(str(path), db, source=name)
+
+@pytest.fixture(scope="function")
+def db():
+    Base.metadata.create_all(bind=engine)
+    board_cache.clear()
+    analytics.cache.clear()
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def client(db, monkeypatch):
+    def override_get_db():
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    monkeypatch.setattr(exports, "session_factory", TestingAsyncSessionLocal) # streamed bodies open their own session
+    monkeypatch.setattr(board_purge, "session_factory", TestingAsyncSessionLocal)
+    yield TestClient(app)
+
+@pytest.fixture(scope="function")
+def clear_database():
+    # Obtain a new session
+    with TestingSessionLocal() as db:
+        # Iterate over all tables and delete their contents
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(table.delete())
+        # Commit the transaction to ensure changes are applied
+        db.commit()
+    board_cache.clear()
+
+@pytest.fixture(scope="function")
+def inline_jobs(monkeypatch, tmp_path, tmp_path_factory):
+    # Runs jobs synchronously against the test database instead of the worker pool.
+    submitted = []
+    def submit_job(job_id):
+        submitted.append(job_id)
+        jobs.run_job(job_id)
+
+    monkeypatch.setattr(jobs, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(jobs, "submit_job", submit_job)
+    monkeypatch.setattr(config, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path_factory.mktemp("snapshots")))
+    return submitted
+
+@pytest.fixture(scope="function")
+def query_counter():
+    # Collects the SQL statements the async engine executes while the test runs.
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,61 @@
+import io
+import zipfile
+from openpyxl import Workbook
+
+REPORT_TEXT = "예선 첫 번째 경기는 '프레스토'와 '블리츠'가 대결을 펼쳤습니다."
+
+# (backnumber, player, offense_rebound, defense_rebound, total_rebound, assist,
+#  steal, block, score_1Q, score_2Q, score_3Q, score_4Q, score_OT, score_Total)
+TEAM_A_PLAYERS = [
+    (8, "김유성", 1, 7, 8, 1, None, None, 1, None, 2, 3, None, 6),
+    (23, "최동현", 1, 1, 2, None, None, None, 5, 2, 2, None, None, 9),
+    (77, "김창범", 2, 1, 3, 2, None, None, None, 3, 2, 7, None, 12),
+]
+TEAM_B_PLAYERS = [
+    (1, "이주권", 2, 1, 3, None, 1, None, 1, 4, 2, None, None, 7),
+    (36, "김승현", 4, 2, 6, None, 3, None, None, 2, 6, None, None, 8),
+]
+
+
+def write_score_sheet(ws, report=REPORT_TEXT, team_a=("프레스토", "WIN", TEAM_A_PLAYERS),
+                      team_b=("블리츠", "LOSE", TEAM_B_PLAYERS)):
+    # Mirrors the league score sheet: the narrative sits in column R of row 2,
+    # team headers on rows 4/22 and up to 12 player rows from rows 8/26.
+    ws.cell(row=2, column=18, value=report)
+    for header_row, (team, result, players) in ((4, team_a), (22, team_b)):
+        ws.cell(row=header_row, column=2, value="팀   명")
+        ws.cell(row=header_row, column=4, value=team)
+        ws.cell(row=header_row, column=13, value=result)
+        for offset, stat in enumerate(players):
+            for column, value in enumerate(stat, start=2):
+                ws.cell(row=header_row + 4 + offset, column=column, value=value)
+    return ws
+
+
+def build_score_sheet(**kwargs) -> bytes:
+    wb = Workbook()
+    write_score_sheet(wb.active, **kwargs)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def build_workbook(sheets: dict) -> bytes:
+    # sheets maps a sheet name to write_score_sheet keyword arguments, or None for a blank sheet.
+    wb = Workbook()
+    wb.remove(wb.active)
+    for name, kwargs in sheets.items():
+        ws = wb.create_sheet(name)
+        if kwargs is not None:
+            write_score_sheet(ws, **kwargs)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def build_zip(files: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
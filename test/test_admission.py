@@ -0,0 +1,62 @@
+from collections import deque
+
+from app import config
+from app.models.job import IngestionJob
+from app.services import admission, jobs
+from test.sample_sheets import build_score_sheet
+
+def test_upload_over_size_limit_is_rejected(client, db, inline_jobs, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "UPLOAD_MAX_BYTES", 1024)
+    response = client.post("/uploadfile/", files={"file": ("score_sheet.xlsx", build_score_sheet())})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Upload exceeds the maximum size of 1024 bytes"
+    assert inline_jobs == []
+    assert db.query(IngestionJob).count() == 0
+    assert list(tmp_path.iterdir()) == []
+
+def test_streamed_upload_is_cut_off_at_size_limit(client, db, inline_jobs, monkeypatch):
+    monkeypatch.setattr(config, "UPLOAD_MAX_BYTES", 1024)
+    body = b"--boundary\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.xlsx\"\r\n\r\n" + b"x" * 4096
+    response = client.post("/uploadfile/", content=iter([body]),
+                           headers={"Content-Type": "multipart/form-data; boundary=boundary"})
+    assert response.status_code == 413
+    assert db.query(IngestionJob).count() == 0
+    assert admission.receiving == 0
+
+def test_batch_upload_has_its_own_limit(client, inline_jobs, monkeypatch):
+    monkeypatch.setattr(config, "UPLOAD_MAX_BYTES", 1024)
+    response = client.post("/uploads/batch", files={"file": ("games.xlsx", build_score_sheet())})
+    assert response.status_code == 202
+
+def test_upload_rejected_when_queue_is_full(client, db, inline_jobs, monkeypatch):
+    monkeypatch.setattr(config, "INGESTION_WORKERS", 1)
+    monkeypatch.setattr(config, "INGESTION_QUEUE_SIZE", 1)
+    monkeypatch.setattr(jobs, "pending_job_ids", {101, 102})
+    monkeypatch.setattr(jobs, "running_job_ids", {101})
+    monkeypatch.setattr(jobs, "recent_job_seconds", deque()) # no durations yet: the configured fallback
+
+    response = client.post("/uploadfile/", files={"file": ("score_sheet.xlsx", build_score_sheet())})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(config.INGESTION_RETRY_AFTER)
+    assert db.query(IngestionJob).count() == 0
+
+    monkeypatch.setattr(jobs, "pending_job_ids", {101})
+    response = client.post("/uploadfile/", files={"file": ("score_sheet.xlsx", build_score_sheet())})
+    assert response.status_code == 202
+
+def test_retry_after_follows_recent_job_durations(monkeypatch):
+    monkeypatch.setattr(config, "INGESTION_WORKERS", 2)
+    monkeypatch.setattr(jobs, "recent_job_seconds", deque([3.0, 5.0]))
+    assert admission.retry_after({"running": 2, "queued": 3, "receiving": 0}) == 8 # 4s * 4 jobs / 2 workers
+
+def test_retrieve_upload_queue(client, monkeypatch):
+    monkeypatch.setattr(jobs, "pending_job_ids", {1, 2, 3})
+    monkeypatch.setattr(jobs, "running_job_ids", {1})
+    response = client.get("/uploads/queue")
+    assert response.status_code == 200
+    assert response.json() == {"running": 1, "queued": 2, "receiving": 0,
+                               "capacity": config.INGESTION_WORKERS + config.INGESTION_QUEUE_SIZE}
+
+def test_run_job_clears_queue_entry(client, inline_jobs):
+    client.post("/uploadfile/", files={"file": ("score_sheet.xlsx", build_score_sheet())})
+    assert jobs.queue_depth() == {"running": 0, "queued": 0}
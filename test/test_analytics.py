@@ -0,0 +1,113 @@
+import asyncio
+import time
+import pytest
+
+from app.models.match import PlayerStat
+from app.services import analytics, season_stats
+from app.services.players import rebuild_players
+from test.conftest import TestingAsyncSessionLocal, ingest
+from test.sample_sheets import TEAM_A_PLAYERS, TEAM_B_PLAYERS
+
+def ingest_two_games(db, tmp_path):
+    ingest(db, tmp_path, "game1.xlsx")
+    ingest(db, tmp_path, "game2.xlsx", team_a=("프레스토", "LOSE", TEAM_A_PLAYERS), team_b=("레인", "WIN", TEAM_B_PLAYERS))
+
+def test_player_analytics(client, db, tmp_path):
+    ingest_two_games(db, tmp_path)
+
+    response = client.get("/analytics/players", params={"team": "프레스토", "limit": 2})
+    assert response.status_code == 200
+    leader, second = response.json()
+    assert (leader["player"], leader["games"], leader["points_per_game"]) == ("김창범", 2, 12.0)
+    assert leader["efficiency"] == 17.0 # 12 points + 3 rebounds + 2 assists per game
+    assert leader["quarter_share"] == pytest.approx({"1Q": 0, "2Q": 3 / 12, "3Q": 2 / 12, "4Q": 7 / 12, "OT": 0})
+    assert (leader["clutch_points"], leader["clutch_points_per_game"]) == (14, 7.0)
+    assert leader["clutch_share"] == pytest.approx(7 / 12)
+    assert (second["player"], second["efficiency"]) == ("김유성", 15.0)
+
+    response = client.get("/analytics/players", params={"sort": "clutch_points", "limit": 1})
+    assert response.json()[0]["player"] == "김창범"
+
+def test_team_analytics_rolling_averages(client, db, tmp_path):
+    ingest_two_games(db, tmp_path)
+
+    response = client.get("/analytics/teams")
+    assert response.status_code == 200
+    teams = {team["team"]: team for team in response.json()}
+    assert set(teams) == {"레인", "블리츠", "프레스토"}
+    presto = teams["프레스토"]
+    assert presto["games"] == 2
+    assert presto["per_game"] == {"points": 27.0, "rebounds": 13.0, "assists": 3.0}
+    assert [entry["points_avg"] for entry in presto["rolling"]] == [27.0, 27.0]
+    assert presto["rolling"][0]["report_id"] < presto["rolling"][1]["report_id"]
+
+def test_rolling_mean_window():
+    assert list(season_stats.rolling_mean([1, 2, 3, 4], 2)) == [1.0, 1.5, 2.5, 3.5]
+
+def test_stats_are_cached_per_ingestion_version(client, db, tmp_path, monkeypatch):
+    computed = []
+    compute_stats = analytics.compute_stats
+    def counting_compute_stats(*args):
+        computed.append(args)
+        return compute_stats(*args)
+    monkeypatch.setattr(analytics, "compute_stats", counting_compute_stats)
+
+    ingest(db, tmp_path, "game1.xlsx")
+    first = client.get("/analytics/teams")
+    assert client.get("/analytics/players").status_code == 200
+    assert len(computed) == 1
+    assert client.get("/analytics/teams", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    ingest(db, tmp_path, "game2.xlsx", team_a=("프레스토", "LOSE", TEAM_A_PLAYERS), team_b=("레인", "WIN", TEAM_B_PLAYERS))
+    second = client.get("/analytics/teams")
+    assert len(computed) == 2
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+def test_concurrent_misses_compute_once(db, tmp_path, monkeypatch):
+    computed = []
+    compute_stats = analytics.compute_stats
+    def slow_compute_stats(*args):
+        computed.append(args)
+        time.sleep(0.1)
+        return compute_stats(*args)
+    monkeypatch.setattr(analytics, "compute_stats", slow_compute_stats)
+    ingest(db, tmp_path, "game1.xlsx")
+
+    async def request():
+        async with TestingAsyncSessionLocal() as session:
+            return await analytics.get_season_stats(session)
+    async def concurrent_requests():
+        return await asyncio.gather(*[request() for _ in range(3)])
+    results = asyncio.run(concurrent_requests())
+    assert len(computed) == 1
+    assert all(result == results[0] for result in results)
+    assert analytics.computing == {}
+
+def test_relinking_players_changes_the_version(client, db, tmp_path):
+    ingest(db, tmp_path, "game1.xlsx")
+    db.query(PlayerStat).update({PlayerStat.player_id: None}) # rows ingested before the players table
+    db.commit()
+    first = client.get("/analytics/players")
+    assert first.json() == []
+
+    rebuild_players(db)
+    second = client.get("/analytics/players")
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert len(second.json()) == len(TEAM_A_PLAYERS) + len(TEAM_B_PLAYERS)
+
+def test_version_is_one_row_bumped_by_writes(client, db, tmp_path, query_counter):
+    report_id = ingest(db, tmp_path, "game1.xlsx")
+    first = client.get("/analytics/teams").headers["ETag"]
+
+    query_counter.clear()
+    assert client.get("/analytics/teams").headers["ETag"] == first
+    assert len(query_counter) == 1 # the version lookup; the stats come from the cache
+
+    assert client.delete(f"/reports/{report_id}").status_code == 204
+    second = client.get("/analytics/teams")
+    assert second.headers["ETag"] != first
+    assert second.json() == []
+
+def test_analytics_without_games(client):
+    assert client.get("/analytics/players").json() == []
+    assert client.get("/analytics/teams").json() == []
@@ -0,0 +1,68 @@
+import pytest
+
+from app import config
+from app.models.job import IngestionJob
+from app.models.match import Report
+from app.services import batch
+from test.sample_sheets import build_workbook, build_zip, TEAM_A_PLAYERS, TEAM_B_PLAYERS
+
+@pytest.fixture(scope="function")
+def parse_workers(monkeypatch):
+    monkeypatch.setattr(config, "PARSE_WORKERS", 2)
+    yield
+    batch.shutdown()
+
+def game(team_a, team_b):
+    return {"team_a": (team_a, "WIN", TEAM_A_PLAYERS), "team_b": (team_b, "LOSE", TEAM_B_PLAYERS)}
+
+def upload_batch(client, filename, content):
+    return client.post("/uploads/batch", files={"file": (filename, content)})
+
+def test_batch_upload_workbook_sheets(client, db, inline_jobs, parse_workers):
+    content = build_workbook({"game1": game("프레스토", "블리츠"), "notes": None, "game2": game("블리츠", "레인")})
+    response = upload_batch(client, "weekend.xlsx", content)
+    assert response.status_code == 202
+
+    job = client.get(f"/uploads/{response.json()['job_id']}").json()
+    assert job["kind"] == IngestionJob.BATCH
+    assert job["state"] == IngestionJob.SUCCEEDED
+    assert [(r["source"], r["state"]) for r in job["sheet_results"]] == [
+        ("weekend.xlsx#game1", "succeeded"),
+        ("weekend.xlsx#notes", "failed"),
+        ("weekend.xlsx#game2", "succeeded"),
+    ]
+    assert job["sheet_results"][1]["error"] == "ValueError: Sheet does not match the score sheet layout"
+    assert len(job["report_ids"]) == 2
+    assert db.query(Report).count() == 2
+
+def test_batch_upload_zip(client, db, inline_jobs, parse_workers):
+    content = build_zip({
+        "division5/day1.xlsx": build_workbook({"game1": game("프레스토", "블리츠")}),
+        "division5/day2.xlsx": build_workbook({"game1": game("레인", "블리츠"), "game2": game("프레스토", "레인")}),
+        "division5/readme.txt": b"not a workbook",
+    })
+    job_id = upload_batch(client, "division5.zip", content).json()["job_id"]
+
+    job = client.get(f"/uploads/{job_id}").json()
+    assert [r["source"] for r in job["sheet_results"]] == [
+        "division5.zip/division5/day1.xlsx#game1",
+        "division5.zip/division5/day2.xlsx#game1",
+        "division5.zip/division5/day2.xlsx#game2",
+    ]
+    assert all(r["state"] == "succeeded" for r in job["sheet_results"])
+    assert sorted(r.source for r in db.query(Report)) == sorted(r["source"] for r in job["sheet_results"])
+
+def test_extract_workbooks_bounds_the_archive(tmp_path, monkeypatch):
+    path = tmp_path / "games.zip"
+    path.write_bytes(build_zip({f"day{i}.xlsx": b"x" * 100 for i in range(3)}))
+    monkeypatch.setattr(config, "BATCH_EXTRACT_MAX_BYTES", 250)
+    with pytest.raises(ValueError, match="expands to more than 250 bytes"):
+        batch.extract_workbooks(str(path), "games.zip", str(tmp_path))
+
+    monkeypatch.setattr(config, "BATCH_EXTRACT_MAX_BYTES", 300)
+    monkeypatch.setattr(config, "BATCH_MAX_MEMBERS", 2)
+    with pytest.raises(ValueError, match="more than 2 members"):
+        batch.extract_workbooks(str(path), "games.zip", str(tmp_path))
+
+    monkeypatch.setattr(config, "BATCH_MAX_MEMBERS", 3)
+    assert len(batch.extract_workbooks(str(path), "games.zip", str(tmp_path))) == 3
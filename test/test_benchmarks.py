@@ -0,0 +1,33 @@
+import random
+
+from app import config
+from app.services import board_purge, exports, jobs
+from app.services.excel_parsing import parse_workbook_sheet
+from benchmarks.generators import generate_report, build_workbook
+from benchmarks.run import ROUTES, app_routes, percentile, run, summarize
+
+def test_generated_workbook_matches_parser(tmp_path):
+    reports = [generate_report(random.Random(seed)) for seed in range(3)]
+    path = tmp_path / "games.xlsx"
+    path.write_bytes(build_workbook(reports))
+    assert [parse_workbook_sheet(str(path), f"game{index + 1}") for index in range(3)] == reports
+
+def test_every_route_is_benchmarked():
+    assert [route for route in app_routes() if route not in ROUTES] == []
+
+def test_summarize():
+    samples = [i / 1000 for i in range(1, 101)]
+    assert percentile(samples, 50) == 0.05
+    assert percentile(samples, 99) == 0.099
+    stats = summarize(samples, elapsed=2.0)
+    assert (stats["count"], stats["p95_ms"], stats["throughput_rps"]) == (100, 95.0, 50.0)
+
+def test_run_smoke(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) # nothing may fall back to the default ./sql_app.db
+    previous = (jobs.session_factory, exports.session_factory, board_purge.session_factory, config.UPLOAD_DIR)
+    result = run(boards=2, posts=10, games=1, iterations=1, concurrency=1, seed=0)
+    assert result["uncovered_routes"] == []
+    assert all(stats["errors"] == 0 for stats in result["routes"].values()), \
+        {name: stats for name, stats in result["routes"].items() if stats["errors"]}
+    assert list(tmp_path.iterdir()) == []
+    assert (jobs.session_factory, exports.session_factory, board_purge.session_factory, config.UPLOAD_DIR) == previous
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy import text
+
+from app.models.board import Board
+from app.models.post import Post
+from app.services import board_purge
+from test.conftest import create_board
+
+def create_board_with_posts(client, name, count):
+    board_id = create_board(client, name)
+    client.post(f"/boards/{board_id}/posts:batch", json={
+        "create": [{"title": f"{name} post {i}", "content": "content", "author": "author"} for i in range(count)]})
+    return board_id
+
+def test_delete_board_purges_posts_and_search_entries(client, db):
+    board_id = create_board_with_posts(client, "notice", 25)
+    other_id = create_board_with_posts(client, "other", 3)
+
+    response = client.delete(f"/boards/{board_id}")
+    assert response.status_code == 204
+    assert client.get(f"/boards/{board_id}").status_code == 404
+    assert [board["id"] for board in client.get("/boards/").json()] == [other_id]
+
+    assert db.get(Board, board_id) is None
+    assert db.query(Post).filter(Post.board_id == board_id).count() == 0
+    assert db.query(Post).filter(Post.board_id == other_id).count() == 3
+    assert db.execute(text("SELECT count(*) FROM posts_fts WHERE posts_fts MATCH '\"notice\"'")).scalar() == 0
+    assert len(client.get("/search/posts", params={"q": "post"}).json()) == 3
+
+def test_deleted_board_name_can_be_reused(client):
+    board_id = create_board_with_posts(client, "notice", 1)
+    client.delete(f"/boards/{board_id}")
+    response = client.post("/boards/", json={"name": "notice", "description": ""})
+    assert response.status_code == 201
+    assert [board["name"] for board in client.get("/boards/").json()] == ["notice"]
+
+def test_purge_board_deletes_in_chunks(client, db, monkeypatch):
+    board_id = create_board_with_posts(client, "notice", 10)
+    db.query(Board).filter(Board.id == board_id).update({Board.deleted_at: datetime.utcnow(), Board.name: None})
+    db.commit()
+
+    chunks = []
+    delete_post_chunk = board_purge.delete_post_chunk
+    async def recording_delete_post_chunk(db, board_id, chunk_size):
+        chunks.append(await delete_post_chunk(db, board_id, chunk_size))
+        return chunks[-1]
+    monkeypatch.setattr(board_purge, "delete_post_chunk", recording_delete_post_chunk)
+
+    assert asyncio.run(board_purge.purge_board(board_id, chunk_size=4)) == 10
+    assert chunks == [4, 4, 2] # the short chunk also removed the board row
+    db.expire_all()
+    assert db.get(Board, board_id) is None
+
+def test_purge_deleted_boards_resumes_unfinished_purges(client, db):
+    marked_id = create_board_with_posts(client, "marked", 2)
+    kept_id = create_board_with_posts(client, "kept", 2)
+    db.query(Board).filter(Board.id == marked_id).update({Board.deleted_at: datetime.utcnow()})
+    db.commit()
+
+    assert asyncio.run(board_purge.purge_deleted_boards()) == [marked_id]
+    db.expire_all()
+    assert db.get(Board, marked_id) is None
+    assert db.query(Post).count() == 2
+    assert asyncio.run(board_purge.purge_board(kept_id)) == 0 # not marked deleted
+
+def test_post_writes_to_a_board_marked_deleted_are_rejected(client, db):
+    board_id = create_board_with_posts(client, "marked", 1)
+    other_id = create_board_with_posts(client, "other", 1)
+    other_post = client.get(f"/boards/{other_id}/posts/", params={"limit": 1}).json()[0]
+    client.get(f"/boards/{board_id}") # cached before it is marked, as on another worker
+    db.query(Board).filter(Board.id == board_id).update({Board.deleted_at: datetime.utcnow()})
+    db.commit()
+
+    post = {"title": "late", "content": "content", "author": "author"}
+    assert client.post(f"/boards/{board_id}/posts/", json=post).status_code == 404
+    assert client.post(f"/boards/{board_id}/posts:batch", json={"create": [post]}).status_code == 404
+    response = client.patch(f"/boards/{other_id}/posts/{other_post['id']}", json=dict(other_post, board_id=board_id))
+    assert response.status_code == 404
+    assert db.query(Post).filter(Post.board_id == board_id).count() == 1
+    assert db.query(Post).filter(Post.board_id == other_id).count() == 1
@@ -0,0 +1,45 @@
+from app.models.board import Board
+from app.services.board_stats import rebuild_board_stats
+from test.conftest import create_board, create_post
+
+def board_stats(client, board_id):
+    board = client.get(f"/boards/{board_id}").json()
+    return board["post_count"], board["last_post_at"]
+
+def test_board_stats_follow_post_writes(client):
+    board_id = create_board(client)
+    assert board_stats(client, board_id) == (0, None)
+
+    first = create_post(client, board_id, "first")
+    second = create_post(client, board_id, "second")
+    assert board_stats(client, board_id) == (2, second["timestamp"])
+    assert [(b["post_count"], b["last_post_at"]) for b in client.get("/boards/").json()] == [(2, second["timestamp"])]
+
+    client.delete(f"/boards/{board_id}/posts/{second['id']}")
+    assert board_stats(client, board_id) == (1, first["timestamp"])
+    client.delete(f"/boards/{board_id}/posts/{first['id']}")
+    assert board_stats(client, board_id) == (0, None)
+
+def test_board_stats_follow_moves_and_batches(client):
+    board_id, other_id = create_board(client), create_board(client, "other")
+    post = create_post(client, board_id, "moving")
+    client.patch(f"/boards/{board_id}/posts/{post['id']}", json=dict(post, board_id=other_id))
+    assert board_stats(client, board_id) == (0, None)
+    assert board_stats(client, other_id) == (1, post["timestamp"])
+
+    results = client.post(f"/boards/{board_id}/posts:batch", json={
+        "create": [{"title": f"Post {i}", "content": "c", "author": "a"} for i in range(5)],
+    }).json()["results"]
+    client.post(f"/boards/{board_id}/posts:batch", json={"delete": [results[0]["id"], results[1]["id"], 999]})
+    assert board_stats(client, board_id)[0] == 3
+
+def test_rebuild_board_stats(client, db):
+    board_id = create_board(client)
+    posts = [create_post(client, board_id, f"Post {i}") for i in range(3)]
+    db.query(Board).update({Board.post_count: 0, Board.last_post_at: None})
+    db.commit()
+
+    rebuild_board_stats(db)
+    db_board = db.get(Board, board_id)
+    assert db_board.post_count == 3
+    assert db_board.last_post_at.isoformat() == posts[-1]["timestamp"]
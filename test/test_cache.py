@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from sqlalchemy import event
+
+from app.services import cache
+from app.services.cache import LRUCacheBackend, board_cache
+from test.conftest import TestingAsyncSessionLocal, async_engine
+
+@pytest.fixture(scope="function")
+def board_queries():
+    statements = []
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM boards" in statement:
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", on_execute)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", on_execute)
+
+def test_lru_backend_evicts_least_recently_used():
+    backend = LRUCacheBackend(maxsize=2, ttl=60)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+    assert backend.get("a") == 1
+    assert backend.get("b") is cache._MISSING
+    assert backend.get("c") == 3
+
+def test_lru_backend_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    backend = LRUCacheBackend(maxsize=2, ttl=10)
+    backend.set("a", 1)
+    now[0] += 11
+    assert backend.get("a") is cache._MISSING
+
+def test_retrieve_board_is_cached(client, board_queries):
+    board_id = client.post("/boards/", json={"name": "notice", "description": ""}).json()["id"]
+    board_queries.clear()
+
+    for _ in range(3):
+        assert client.get(f"/boards/{board_id}").status_code == 200
+        assert client.get(f"/boards/{board_id}/posts/", params={"limit": 10}).status_code == 404 # no posts yet
+    assert client.get("/boards/").status_code == 200
+    assert client.get("/boards/").status_code == 200
+    # Besides the updated_at read that versions each response, one lookup by id and one full list.
+    assert len([statement for statement in board_queries if not statement.startswith("SELECT boards.updated_at")]) == 2
+
+def test_board_cache_invalidated_on_write(client):
+    board_id = client.post("/boards/", json={"name": "notice", "description": ""}).json()["id"]
+    assert client.get("/boards/").json()[0]["name"] == "notice"
+
+    client.patch(f"/boards/{board_id}", json={"name": "free", "description": "free board"})
+    assert client.get(f"/boards/{board_id}").json()["name"] == "free"
+    assert [board["name"] for board in client.get("/boards/").json()] == ["free"]
+    assert client.post("/boards/", json={"name": "notice", "description": ""}).status_code == 201
+
+    client.delete(f"/boards/{board_id}")
+    assert client.get(f"/boards/{board_id}").status_code == 404
+    assert [board["name"] for board in client.get("/boards/").json()] == ["notice"]
+
+def test_board_list_copies_are_not_the_cached_rows(client):
+    client.post("/boards/", json={"name": "notice", "description": ""})
+    async def get_all():
+        async with TestingAsyncSessionLocal() as session:
+            return await board_cache.get_all(session)
+
+    boards = asyncio.run(get_all())
+    boards[0]["name"] = "changed"
+    boards.clear()
+    assert [board["name"] for board in asyncio.run(get_all())] == ["notice"]
+
+def test_post_writes_keep_the_board_list_cached(client, board_queries):
+    board_id = client.post("/boards/", json={"name": "notice", "description": ""}).json()["id"]
+    other_id = client.post("/boards/", json={"name": "free", "description": ""}).json()["id"]
+    client.get("/boards/")
+    post = client.post(f"/boards/{board_id}/posts", json={"title": "t", "content": "c", "author": "a"}).json()
+    board_queries.clear()
+
+    boards = {board["id"]: board for board in client.get("/boards/").json()}
+    assert (boards[board_id]["post_count"], boards[board_id]["last_post_at"]) == (1, post["timestamp"])
+    assert boards[other_id]["post_count"] == 0
+    assert len(board_queries) == 1 and "boards.id IN" in board_queries[0] # stats of the written board only
+    assert client.get("/boards/").json() == list(boards.values())
+    assert len(board_queries) == 1
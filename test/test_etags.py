@@ -0,0 +1,87 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import update
+
+from app.models.board import Board
+from app.services.etags import etag_matches
+from test.conftest import create_board, create_post
+
+def revalidate(client, url, etag, **params):
+    return client.get(url, params=params, headers={"If-None-Match": etag})
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches(None, '"a"')
+    assert not etag_matches('"a"', '"b"')
+
+@pytest.mark.parametrize("path", ["/boards/{board_id}", "/boards/"])
+def test_board_conditional_get(client, path):
+    board_id = create_board(client)
+    url = path.format(board_id=board_id)
+    response = client.get(url)
+    etag = response.headers["ETag"]
+
+    response = revalidate(client, url, etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    client.patch(f"/boards/{board_id}", json={"name": "renamed", "description": "changed"})
+    assert revalidate(client, url, etag).status_code == 200
+
+def test_board_list_etag_changes_on_delete(client):
+    create_board(client)
+    board_id = create_board(client, "other")
+    etag = client.get("/boards/").headers["ETag"]
+    client.delete(f"/boards/{board_id}")
+    assert revalidate(client, "/boards/", etag).status_code == 200
+
+def test_board_etags_follow_writes_through_other_workers(client, db):
+    board_id = create_board(client)
+    create_post(client, board_id)
+    board_etag = client.get(f"/boards/{board_id}").headers["ETag"]
+    posts_etag = client.get(f"/boards/{board_id}/posts/", params={"limit": 10}).headers["ETag"]
+
+    # Another worker renames the board; this worker's cache still holds the old copy.
+    db.execute(update(Board).where(Board.id == board_id).values(name="renamed", updated_at=datetime.utcnow()))
+    db.commit()
+    response = revalidate(client, f"/boards/{board_id}", board_etag)
+    assert response.status_code == 200
+    assert response.json()["name"] == "renamed"
+    assert response.headers["ETag"] != board_etag
+    assert revalidate(client, f"/boards/{board_id}/posts/", posts_etag, limit=10).status_code == 200
+
+def test_post_conditional_get(client):
+    board_id = create_board(client)
+    post = create_post(client, board_id)
+    url = f"/boards/{board_id}/posts/{post['id']}"
+    etag = client.get(url).headers["ETag"]
+    assert revalidate(client, url, etag).status_code == 304
+
+    client.patch(url, json=dict(post, title="edited"))
+    response = revalidate(client, url, etag)
+    assert response.status_code == 200
+    assert response.json()["title"] == "edited"
+
+def test_post_list_conditional_get(client):
+    board_id = create_board(client)
+    ids = [create_post(client, board_id, f"Post {i}")["id"] for i in range(3)]
+    url = f"/boards/{board_id}/posts/"
+    etag = client.get(url, params={"limit": 2}).headers["ETag"]
+    assert revalidate(client, url, etag, limit=2).status_code == 304
+    assert revalidate(client, url, etag, limit=3).status_code == 200 # different page
+
+    client.post(f"/boards/{board_id}/posts:batch", json={"update": [{"id": ids[2], "title": "edited"}]})
+    assert revalidate(client, url, etag, limit=2).status_code == 200
+    etag = client.get(url, params={"limit": 2}).headers["ETag"]
+    client.delete(f"/boards/{board_id}/posts/{ids[0]}")
+    assert revalidate(client, url, etag, limit=2).status_code == 200
+
+def test_batch_update_changes_post_etag(client):
+    board_id = create_board(client)
+    post = create_post(client, board_id)
+    url = f"/boards/{board_id}/posts/{post['id']}"
+    etag = client.get(url).headers["ETag"]
+    client.post(f"/boards/{board_id}/posts:batch", json={"update": [{"id": post["id"], "content": "edited"}]})
+    assert revalidate(client, url, etag).status_code == 200
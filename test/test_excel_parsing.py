@@ -0,0 +1,207 @@
+import io
+import hashlib
+import os
+import asyncio
+import pytest
+from fastapi import UploadFile
+from openpyxl import load_workbook
+from sqlalchemy import event
+
+from app.models.match import Report, TeamResult, PlayerStat
+from app.services.excel_parsing import parsing_excel_file, parse_sheet, read_sheet
+from app.services.uploads import spool_upload_file
+from app.services.ingestion import save_report
+from test.conftest import engine
+from test.sample_sheets import build_score_sheet, REPORT_TEXT, TEAM_B_PLAYERS
+
+@pytest.fixture
+def score_sheet(tmp_path):
+    path = tmp_path / "score_sheet.xlsx"
+    path.write_bytes(build_score_sheet())
+    return str(path)
+
+def test_parsing_excel_file(db, score_sheet):
+    report_id = parsing_excel_file(score_sheet, db)
+
+    report = db.get(Report, report_id)
+    assert report.report == REPORT_TEXT
+    assert [(t.team, t.result) for t in report.team_results] == [("프레스토", "WIN"), ("블리츠", "LOSE")]
+
+    team_a, team_b = report.team_results
+    assert [p.player for p in team_a.player_stats] == ["김유성", "최동현", "김창범"]
+    assert [p.player for p in team_b.player_stats] == ["이주권", "김승현"]
+    assert team_a.player_stats[2].score_Total == 12
+    assert team_a.player_stats[0].steal is None
+
+def test_parsing_excel_file_single_commit(db, score_sheet):
+    commits = []
+    def on_commit(conn):
+        commits.append(conn)
+
+    event.listen(engine, "commit", on_commit)
+    try:
+        parsing_excel_file(score_sheet, db)
+    finally:
+        event.remove(engine, "commit", on_commit)
+    assert len(commits) == 1
+
+def test_save_report_rolls_back_on_failure(db):
+    report = {
+        "report": "broken",
+        "team_results": [
+            {"team": "A", "result": "WIN", "player_stats": []},
+            {"team": "B", "player_stats": []}, # missing result
+        ],
+    }
+    with pytest.raises(KeyError):
+        save_report(db, report)
+    assert db.query(Report).count() == 0
+    assert db.query(TeamResult).count() == 0
+    assert db.query(PlayerStat).count() == 0
+
+def test_parse_sheet_skips_empty_player_rows(score_sheet):
+    wb = load_workbook(score_sheet, read_only=True)
+    report = parse_sheet(read_sheet(wb.worksheets[0]))
+    wb.close()
+
+    team_a, team_b = report["team_results"]
+    assert len(team_a["player_stats"]) == 3
+    assert len(team_b["player_stats"]) == 2
+    assert team_b["player_stats"][1] == {
+        "backnumber": 36, "player": "김승현",
+        "offense_rebound": 4, "defense_rebound": 2, "total_rebound": 6,
+        "assist": None, "steal": 3, "block": None,
+        "score_1Q": None, "score_2Q": 2, "score_3Q": 6, "score_4Q": None, "score_OT": None, "score_Total": 8,
+    }
+    assert all(type(stat["backnumber"]) is int for stat in team_a["player_stats"])
+
+def test_spool_upload_file():
+    content = build_score_sheet()
+    upload = UploadFile(file=io.BytesIO(content), filename="score_sheet.xlsx")
+    path, content_hash = asyncio.run(spool_upload_file(upload))
+    try:
+        assert path.endswith(".xlsx")
+        assert content_hash == hashlib.sha256(content).hexdigest()
+        with open(path, "rb") as spooled:
+            assert spooled.read() == content
+    finally:
+        os.remove(path)
+
+def test_save_report_identical_report_is_noop(db, score_sheet):
+    report_id = parsing_excel_file(score_sheet, db, source="score_sheet.xlsx")
+    assert parsing_excel_file(score_sheet, db, source="other.xlsx") == report_id
+    assert db.query(Report).count() == 1
+    assert db.query(PlayerStat).count() == 5
+
+def test_save_report_corrected_sheet_upserts_changed_rows(db, score_sheet, tmp_path):
+    report_id = parsing_excel_file(score_sheet, db, source="score_sheet.xlsx")
+    before = {stat.player: stat.id for stat in db.query(PlayerStat)}
+
+    corrected_players = [
+        (91, "최승호", 2, 4, 6, None, 1, 1, 2, None, None, 2, None, 4), # new row
+        (1, "이주권", 2, 1, 3, None, 1, None, 1, 4, 2, 2, None, 9), # 4Q points were missing
+    ] # 김승현 dropped
+    corrected = tmp_path / "corrected.xlsx"
+    corrected.write_bytes(build_score_sheet(team_b=("블리츠", "LOSE", corrected_players)))
+
+    statements = []
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if "player_stats" in statement:
+            statements.append(statement.split()[0])
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        assert parsing_excel_file(str(corrected), db, source="corrected.xlsx", report_id=report_id) == report_id
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+    db.expire_all()
+    after = {stat.player: stat for stat in db.query(PlayerStat)}
+    assert db.query(Report).count() == 1
+    assert sorted(after) == ["김유성", "김창범", "이주권", "최동현", "최승호"]
+    assert after["이주권"].id == before["이주권"]
+    assert after["이주권"].score_Total == 9
+    assert after["김유성"].id == before["김유성"] # teamA block untouched
+    assert statements.count("UPDATE") == 1 # one changed player row
+    assert statements.count("INSERT") == 1
+    assert statements.count("DELETE") == 1
+
+def test_save_report_other_game_under_same_name_is_inserted(db, score_sheet, tmp_path):
+    report_id = parsing_excel_file(score_sheet, db, source="score_sheet.xlsx")
+    other_game = tmp_path / "other_game.xlsx"
+    other_game.write_bytes(build_score_sheet(report="본선 첫 번째 경기", team_b=("레인", "LOSE", TEAM_B_PLAYERS)))
+
+    other_id = parsing_excel_file(str(other_game), db, source="score_sheet.xlsx")
+    assert other_id != report_id
+    assert db.query(Report).count() == 2
+    assert db.get(Report, report_id).report == REPORT_TEXT
+
+def test_save_report_rematch_without_narrative_is_a_new_game(db, tmp_path):
+    first, rematch = tmp_path / "first.xlsx", tmp_path / "rematch.xlsx"
+    first.write_bytes(build_score_sheet(report=None))
+    rematch_players = [(8, "김유성", 0, 2, 2, None, None, None, 2, 2, None, None, None, 4)]
+    rematch.write_bytes(build_score_sheet(report=None, team_a=("프레스토", "LOSE", rematch_players)))
+
+    first_id = parsing_excel_file(str(first), db, source="first.xlsx")
+    rematch_id = parsing_excel_file(str(rematch), db, source="rematch.xlsx")
+    assert rematch_id != first_id
+    assert db.query(Report).count() == 2
+    assert db.query(PlayerStat).count() == 5 + 3
+
+def test_save_report_narrative_typo_correction_updates_the_game(db, score_sheet, tmp_path):
+    report_id = parsing_excel_file(score_sheet, db, source="score_sheet.xlsx")
+    before = sorted(stat.id for stat in db.query(PlayerStat))
+    corrected = tmp_path / "corrected.xlsx"
+    corrected.write_bytes(build_score_sheet(report=REPORT_TEXT.replace("대결을", "대결")))
+
+    assert parsing_excel_file(str(corrected), db, source="corrected.xlsx", report_id=report_id) == report_id
+    db.expire_all()
+    assert db.query(Report).count() == 1
+    assert db.get(Report, report_id).report == REPORT_TEXT.replace("대결을", "대결")
+    assert sorted(stat.id for stat in db.query(PlayerStat)) == before # no box score rows rewritten
+
+def test_save_report_unknown_target_is_rejected(db, score_sheet):
+    with pytest.raises(ValueError, match="Report 99 does not exist"):
+        parsing_excel_file(score_sheet, db, source="score_sheet.xlsx", report_id=99)
+    assert db.query(Report).count() == 0
+
+def test_save_report_replace_overwrites_same_source(db, score_sheet, tmp_path):
+    report_id = parsing_excel_file(score_sheet, db, source="score_sheet.xlsx")
+    rewritten = tmp_path / "rewritten.xlsx"
+    rewritten.write_bytes(build_score_sheet(report="수정된 경기 기록"))
+
+    assert parsing_excel_file(str(rewritten), db, source="score_sheet.xlsx", replace=True) == report_id
+    db.expire_all()
+    assert db.query(Report).count() == 1
+    assert db.get(Report, report_id).report == "수정된 경기 기록"
+
+def test_save_report_keeps_rows_with_missing_or_shared_backnumbers(db):
+    def player(backnumber, name, total):
+        return {"backnumber": backnumber, "player": name, "score_Total": total}
+    def report(player_stats):
+        return {"report": REPORT_TEXT, "team_results": [{"team": "프레스토", "result": "WIN", "player_stats": player_stats}]}
+
+    player_stats = [player(None, "김유성", 6), player(None, "최동현", 9), player(7, "김창범", 12),
+                    player(7, "김 창 범", 1)] # the same player entered twice
+    report_id = save_report(db, report(player_stats))
+    before = [stat.id for stat in db.query(PlayerStat).order_by(PlayerStat.id)]
+
+    player_stats[1] = player(None, "최동현", 11) # corrected total of a player without a backnumber
+    assert save_report(db, report(player_stats), report_id=report_id) == report_id
+
+    db.expire_all()
+    stats = db.query(PlayerStat).order_by(PlayerStat.id).all()
+    assert [stat.id for stat in stats] == before
+    assert [(stat.player, stat.score_Total) for stat in stats] == [
+        ("김유성", 6), ("최동현", 11), ("김창범", 12), ("김 창 범", 1)]
+
+def test_upload_targets_the_report_it_corrects(client, db, inline_jobs):
+    response = client.post("/uploadfile/", files={"file": ("game.xlsx", build_score_sheet())})
+    report_id = client.get(f"/uploads/{response.json()['job_id']}").json()["report_ids"][0]
+
+    corrected = build_score_sheet(report="수정된 경기 기록")
+    response = client.post("/uploadfile/", params={"reportId": report_id}, files={"file": ("fixed.xlsx", corrected)})
+    assert client.get(f"/uploads/{response.json()['job_id']}").json()["report_ids"] == [report_id]
+    assert db.query(Report).count() == 1
+
+    response = client.post("/uploadfile/", params={"reportId": report_id + 1}, files={"file": ("x.xlsx", corrected)})
+    assert response.status_code == 404
@@ -0,0 +1,51 @@
+import csv
+import io
+import json
+
+from app import config
+from test.conftest import create_board, ingest
+
+def create_board_with_posts(client, count):
+    board_id = create_board(client)
+    client.post(f"/boards/{board_id}/posts:batch", json={
+        "create": [{"title": f"Post {i}", "content": f"내용, \"{i}\"", "author": "author"} for i in range(count)]})
+    return board_id
+
+def test_export_posts_ndjson(client, monkeypatch):
+    monkeypatch.setattr(config, "EXPORT_CHUNK_SIZE", 2) # several partitions
+    board_id = create_board_with_posts(client, 5)
+
+    response = client.get(f"/boards/{board_id}/posts:export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == [f"Post {i}" for i in range(5)]
+    assert rows[0]["content"] == '내용, "0"'
+    assert rows[0]["board_id"] == board_id
+
+def test_export_posts_csv(client):
+    board_id = create_board_with_posts(client, 3)
+
+    response = client.get(f"/boards/{board_id}/posts:export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert 'filename="board-' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["content"] for row in rows] == ['내용, "0"', '내용, "1"', '내용, "2"']
+
+def test_export_posts_errors(client):
+    assert client.get("/boards/1/posts:export").status_code == 404
+    board_id = create_board_with_posts(client, 1)
+    assert client.get(f"/boards/{board_id}/posts:export", params={"format": "xml"}).status_code == 422
+
+def test_export_match_history(client, db, tmp_path):
+    report_id = ingest(db, tmp_path, "game1.xlsx")
+
+    rows = [json.loads(line) for line in client.get("/exports/player-stats").text.splitlines()]
+    assert len(rows) == 5
+    assert (rows[2]["report_id"], rows[2]["team"], rows[2]["player"], rows[2]["score_Total"]) == (report_id, "프레스토", "김창범", 12)
+    assert rows[0]["player_id"] is not None
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/exports/team-results", params={"format": "csv"}).text)))
+    assert [(row["team"], row["result"], row["source"]) for row in rows] == [
+        ("프레스토", "WIN", "game1.xlsx"), ("블리츠", "LOSE", "game1.xlsx")]
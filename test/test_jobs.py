@@ -0,0 +1,137 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app import config
+from app.models.job import IngestionJob
+from app.models.match import Report
+from app.services import jobs
+from test.sample_sheets import build_score_sheet
+
+def upload_score_sheet(client, content=None):
+    files = {"file": ("score_sheet.xlsx", content or build_score_sheet())}
+    return client.post("/uploadfile/", files=files)
+
+def test_upload_file_creates_job(client, inline_jobs, tmp_path):
+    response = upload_score_sheet(client)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    response = client.get(f"/uploads/{job_id}")
+    assert response.status_code == 200
+    job = response.json()
+    assert job["state"] == IngestionJob.SUCCEEDED
+    assert job["attempts"] == 1
+    assert job["filename"] == "score_sheet.xlsx"
+    assert len(job["report_ids"]) == 1
+    assert job["started_at"] is not None and job["finished_at"] is not None
+    assert list(tmp_path.iterdir()) == [] # spooled upload is removed
+
+def test_upload_job_retries_then_fails(client, inline_jobs, monkeypatch):
+    def flaky_parser(path, db, source=None, replace=False, report_id=None):
+        raise OSError("disk hiccup")
+    monkeypatch.setattr(jobs, "parsing_excel_file", flaky_parser)
+
+    job_id = upload_score_sheet(client).json()["job_id"]
+
+    job = client.get(f"/uploads/{job_id}").json()
+    assert job["state"] == IngestionJob.FAILED
+    assert job["attempts"] == config.INGESTION_MAX_ATTEMPTS
+    assert job["error"] == "OSError: disk hiccup"
+    assert job["report_ids"] is None
+    assert inline_jobs == [job_id] * config.INGESTION_MAX_ATTEMPTS
+
+def test_upload_job_deterministic_failure_is_not_retried(client, inline_jobs, monkeypatch):
+    def broken_parser(path, db, source=None, replace=False, report_id=None):
+        raise ValueError("broken sheet")
+    monkeypatch.setattr(jobs, "parsing_excel_file", broken_parser)
+
+    job_id = upload_score_sheet(client).json()["job_id"]
+
+    job = client.get(f"/uploads/{job_id}").json()
+    assert job["state"] == IngestionJob.FAILED
+    assert job["attempts"] == 1
+    assert job["error"] == "ValueError: broken sheet"
+    assert inline_jobs == [job_id]
+
+def test_retrieve_upload_job_not_found(client):
+    response = client.get("/uploads/1")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Upload job with this ID does not exist"
+
+def test_recover_unfinished_jobs(db, inline_jobs, tmp_path):
+    path = tmp_path / "score_sheet.xlsx"
+    path.write_bytes(build_score_sheet())
+    running = IngestionJob(filename="running.xlsx", path=str(path), state=IngestionJob.RUNNING, attempts=1)
+    done = IngestionJob(filename="done.xlsx", path=str(path), state=IngestionJob.SUCCEEDED, attempts=1)
+    db.add_all([running, done])
+    db.commit()
+
+    assert jobs.recover_unfinished_jobs() == [running.id]
+    db.refresh(running)
+    assert running.state == IngestionJob.SUCCEEDED
+    assert running.attempts == 2
+    assert running.owner is None and running.lease_expires_at is None
+    assert db.query(Report).count() == 1
+
+def test_recover_leaves_jobs_with_live_leases(db, inline_jobs, tmp_path):
+    path = tmp_path / "score_sheet.xlsx"
+    path.write_bytes(build_score_sheet())
+    now = datetime.utcnow()
+    live = IngestionJob(filename="live.xlsx", path=str(path), state=IngestionJob.RUNNING, attempts=1,
+                        owner="other-worker", lease_expires_at=now + timedelta(minutes=1))
+    expired = IngestionJob(filename="expired.xlsx", path=str(path), state=IngestionJob.RUNNING, attempts=1,
+                           owner="dead-worker", lease_expires_at=now - timedelta(minutes=1))
+    db.add_all([live, expired])
+    db.commit()
+
+    assert jobs.recover_unfinished_jobs() == [expired.id]
+    db.refresh(live)
+    db.refresh(expired)
+    assert live.state == IngestionJob.RUNNING and live.owner == "other-worker"
+    assert expired.state == IngestionJob.SUCCEEDED
+
+def test_recover_gives_up_on_jobs_out_of_attempts(db, inline_jobs, tmp_path, monkeypatch):
+    # A sheet that crashed the worker on every attempt must not run again on the next restart.
+    def crashing_parser(path, db, source=None, replace=False, report_id=None):
+        raise AssertionError("parser should not run")
+    monkeypatch.setattr(jobs, "parsing_excel_file", crashing_parser)
+    path = tmp_path / "score_sheet.xlsx"
+    path.write_bytes(build_score_sheet())
+    job = IngestionJob(filename="crash.xlsx", path=str(path), state=IngestionJob.RUNNING,
+                       attempts=config.INGESTION_MAX_ATTEMPTS)
+    db.add(job)
+    db.commit()
+
+    assert jobs.recover_unfinished_jobs() == [job.id]
+    db.refresh(job)
+    assert job.state == IngestionJob.FAILED
+    assert job.attempts == config.INGESTION_MAX_ATTEMPTS
+    assert job.error == f"Gave up after {config.INGESTION_MAX_ATTEMPTS} attempts"
+    assert not path.exists()
+
+def test_upload_same_file_twice_is_noop(client, inline_jobs):
+    content = build_score_sheet() # built once: the workbook embeds its creation time
+    first = upload_score_sheet(client, content).json()
+    second = upload_score_sheet(client, content).json()
+    assert second["job_id"] == first["job_id"]
+    assert second["message"] == "File already received."
+    assert inline_jobs == [first["job_id"]]
+
+def test_running_job_renews_its_lease(client, inline_jobs, monkeypatch):
+    monkeypatch.setattr(config, "INGESTION_LEASE_SECONDS", 0.3)
+    leases = []
+    def slow_parser(path, db, source=None, replace=False, report_id=None):
+        for _ in range(2):
+            time.sleep(0.25)
+            with jobs.session_factory() as session:
+                leases.append(session.scalar(select(IngestionJob.lease_expires_at)))
+        return 1
+    monkeypatch.setattr(jobs, "parsing_excel_file", slow_parser)
+
+    job_id = upload_score_sheet(client).json()["job_id"]
+
+    assert client.get(f"/uploads/{job_id}").json()["state"] == IngestionJob.SUCCEEDED
+    assert leases[0] < leases[1]
@@ -0,0 +1,84 @@
+import pytest
+
+from app.models.leaderboard import PlayerTotal, TeamTotal
+from app.services.excel_parsing import parsing_excel_file
+from app.services.leaderboard import apply_team_block, rebuild_leaderboards
+from test.conftest import TestingSessionLocal, ingest
+from test.sample_sheets import build_score_sheet, TEAM_A_PLAYERS, TEAM_B_PLAYERS
+
+def leaderboard_rows(db):
+    players = sorted((t.team, t.player, t.games, t.points, t.rebounds) for t in db.query(PlayerTotal))
+    teams = sorted((t.team, t.games, t.wins, t.losses, t.points, t.score_4Q) for t in db.query(TeamTotal))
+    return players, teams
+
+def test_player_leaderboard(client, db, tmp_path):
+    ingest(db, tmp_path, "game1.xlsx")
+    ingest(db, tmp_path, "game2.xlsx", team_a=("프레스토", "LOSE", TEAM_A_PLAYERS), team_b=("레인", "WIN", TEAM_B_PLAYERS))
+
+    response = client.get("/leaderboards/players", params={"stat": "points", "limit": 2})
+    assert response.status_code == 200
+    leaders = response.json()
+    assert all(entry.pop("player_id") is not None for entry in leaders)
+    assert leaders == [
+        {"team": "프레스토", "player": "김창범", "backnumber": 77, "games": 2, "value": 24, "average": 12.0},
+        {"team": "프레스토", "player": "최동현", "backnumber": 23, "games": 2, "value": 18, "average": 9.0},
+    ]
+
+def test_team_leaderboard(client, db, tmp_path):
+    ingest(db, tmp_path, "game1.xlsx")
+    ingest(db, tmp_path, "game2.xlsx", team_a=("프레스토", "LOSE", TEAM_A_PLAYERS), team_b=("레인", "WIN", TEAM_B_PLAYERS))
+
+    response = client.get("/leaderboards/teams", params={"stat": "score_4Q"})
+    assert response.status_code == 200
+    assert [(t["team"], t["games"], t["wins"], t["losses"], t["value"]) for t in response.json()] == [
+        ("프레스토", 2, 1, 1, 20), ("블리츠", 1, 0, 1, 0), ("레인", 1, 1, 0, 0),
+    ]
+
+def test_leaderboard_invalid_stat(client):
+    response = client.get("/leaderboards/players", params={"stat": "turnovers"})
+    assert response.status_code == 422
+
+def test_leaderboard_follows_corrections_and_removal(client, db, tmp_path):
+    report_id = ingest(db, tmp_path, "game1.xlsx")
+    corrected = [(8, "김유성", 1, 7, 8, 1, None, None, 1, None, 2, 3, None, 16)] + TEAM_A_PLAYERS[1:]
+    path = tmp_path / "corrected.xlsx"
+    path.write_bytes(build_score_sheet(team_a=("프레스토", "WIN", corrected)))
+    assert parsing_excel_file(str(path), db, source="corrected.xlsx", report_id=report_id) == report_id
+
+    players, teams = leaderboard_rows(db)
+    assert ("프레스토", "김유성", 1, 16, 8) in players
+    assert ("프레스토", 1, 1, 0, 37, 10) in teams
+
+    incremental = leaderboard_rows(db)
+    rebuild_leaderboards(db)
+    assert leaderboard_rows(db) == incremental
+
+    response = client.delete(f"/reports/{report_id}")
+    assert response.status_code == 204
+    assert leaderboard_rows(db) == ([], [])
+    assert client.delete(f"/reports/{report_id}").status_code == 404
+
+def test_apply_team_block_increments_in_the_database(db, tmp_path):
+    ingest(db, tmp_path, "game1.xlsx")
+    db.query(PlayerTotal).all() # the session holds totals read before the other job commits
+    player_id = db.query(PlayerTotal).filter(PlayerTotal.player == "김유성").one().player_id
+    block = [{"player_id": player_id, "player": "김유성", "backnumber": 8, "score_Total": 10}]
+
+    with TestingSessionLocal() as other:
+        apply_team_block(other, "프레스토", "WIN", block, sign=1)
+        other.commit()
+    apply_team_block(db, "프레스토", "WIN", block, sign=1)
+    db.commit()
+
+    db.expire_all()
+    total = db.query(PlayerTotal).filter(PlayerTotal.player == "김유성").one()
+    assert (total.games, total.points) == (3, 26)
+    assert db.query(TeamTotal).filter(TeamTotal.team == "프레스토").one().games == 3
+
+def test_player_leaderboard_merges_name_variants(client, db, tmp_path):
+    ingest(db, tmp_path, "game1.xlsx")
+    spaced = [(8, "김 유성", *TEAM_A_PLAYERS[0][2:]), *TEAM_A_PLAYERS[1:]]
+    ingest(db, tmp_path, "game2.xlsx", team_a=("프레스토", "LOSE", spaced), team_b=("레인", "WIN", TEAM_B_PLAYERS))
+
+    rows = db.query(PlayerTotal).filter(PlayerTotal.team == "프레스토", PlayerTotal.backnumber == 8).all()
+    assert [(row.player, row.games, row.points) for row in rows] == [("김유성", 2, 12)]
@@ -1,46 +1,12 @@
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 import time, uuid
-import pytest
 from datetime import datetime
+from typing import List
+from fastapi import Response
+from pydantic import TypeAdapter
 
-from app.database import Base
-from app.main import app, get_db
-
-TEST_DATABASE_URL  = "sqlite:///./test.db"
-engine = create_engine(TEST_DATABASE_URL , connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-@pytest.fixture(scope="function")
-def db():
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    yield db
-    db.close()
-    Base.metadata.drop_all(bind=engine)
-
-@pytest.fixture(scope="function")
-def client(db):
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            db.close()
-
-    app.dependency_overrides[get_db] = override_get_db
-    yield TestClient(app)
-
-@pytest.fixture(scope="function")
-def clear_database():
-    # Obtain a new session
-    with TestingSessionLocal() as db:
-        # Iterate over all tables and delete their contents
-        for table in reversed(Base.metadata.sorted_tables):
-            db.execute(table.delete())
-        # Commit the transaction to ensure changes are applied
-        db.commit()
+from app import schemas
+from app.main import json_rows
+from app.models.post import Post
 
 def create_board_response(client):
     id = uuid.uuid1()
@@ -330,3 +296,83 @@ def test_delete_post_post_id_not_found(client, clear_database):
     post_id = 1
     response = client.delete(f"/boards/{board_id}/posts/{post_id}/")
     assert response.status_code == 404
+
+def create_posts(client, board_id, count):
+    for i in range(count):
+        create_post_by_data(client, board_id, f"Post {i + 1}", f"Content of post {i + 1}", f"author {i + 1}")
+
+def test_retrieve_posts_cursor_pagination(client, clear_database):
+    board_id = create_board_response(client).json()["id"]
+    create_posts(client, board_id, 25)
+
+    response = client.get(f"/boards/{board_id}/posts/", params={"limit": 10})
+    assert response.status_code == 200
+    assert [post["title"] for post in response.json()] == [f"Post {i}" for i in range(1, 11)]
+    assert "X-Prev-Cursor" not in response.headers
+
+    titles = []
+    params = {"limit": 10}
+    while True:
+        response = client.get(f"/boards/{board_id}/posts/", params=params)
+        titles += [post["title"] for post in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params = {"limit": 10, "after": response.headers["X-Next-Cursor"]}
+    assert titles == [f"Post {i}" for i in range(1, 26)]
+
+    response = client.get(f"/boards/{board_id}/posts/", params={"limit": 10, "before": response.headers["X-Prev-Cursor"]})
+    assert [post["title"] for post in response.json()] == [f"Post {i}" for i in range(11, 21)]
+    assert "X-Next-Cursor" in response.headers and "X-Prev-Cursor" in response.headers
+
+def test_retrieve_posts_cursor_by_timestamp(client, clear_database):
+    board_id = create_board_response(client).json()["id"]
+    create_posts(client, board_id, 5)
+
+    first = client.get(f"/boards/{board_id}/posts/", params={"limit": 3, "order_by": "timestamp"})
+    second = client.get(f"/boards/{board_id}/posts/", params={
+        "limit": 3, "order_by": "timestamp", "after": first.headers["X-Next-Cursor"]})
+    assert [post["title"] for post in first.json() + second.json()] == [f"Post {i}" for i in range(1, 6)]
+    assert "X-Next-Cursor" not in second.headers
+
+def test_json_rows_keeps_repeated_headers():
+    response = Response() # as FastAPI injects it
+    del response.headers["content-length"]
+    response.headers.append("set-cookie", "a=1")
+    response.headers.append("set-cookie", "b=2")
+    json_response = json_rows(response, [{"id": 1}])
+    assert json_response.headers.getlist("set-cookie") == ["a=1", "b=2"]
+    assert json_response.headers["content-length"] == str(len(json_response.body))
+
+def test_retrieve_posts_limit_is_bounded(client, clear_database):
+    board_id = create_board_response(client).json()["id"]
+    create_posts(client, board_id, 1)
+    for limit in (0, 101):
+        assert client.get(f"/boards/{board_id}/posts/", params={"limit": limit}).status_code == 422
+    assert client.get(f"/boards/{board_id}/posts/", params={"limit": 1, "offset": -1}).status_code == 422
+    assert client.get(f"/boards/{board_id}/posts/", params={"limit": 100}).status_code == 200
+
+def test_retrieve_posts_invalid_cursor(client, clear_database):
+    board_id = create_board_response(client).json()["id"]
+    create_posts(client, board_id, 3)
+    id_cursor = client.get(f"/boards/{board_id}/posts/", params={"limit": 1}).headers["X-Next-Cursor"]
+
+    response = client.get(f"/boards/{board_id}/posts/", params={"limit": 1, "after": "not-a-cursor"})
+    assert response.status_code == 400
+    response = client.get(f"/boards/{board_id}/posts/", params={"limit": 1, "order_by": "timestamp", "after": id_cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+def test_retrieve_posts_matches_response_model(client, db, clear_database, query_counter):
+    board_id = create_board_response(client).json()["id"]
+    create_posts(client, board_id, 3)
+    query_counter.clear()
+    response = client.get(f"/boards/{board_id}/posts/", params={"limit": 10})
+    assert response.headers["content-type"] == "application/json"
+    # The row fast path serializes exactly like response_model validation of the ORM objects would.
+    db_posts = db.query(Post).filter(Post.board_id == board_id).order_by(Post.id).all()
+    adapter = TypeAdapter(List[schemas.PostResponse])
+    expected = adapter.dump_python(adapter.validate_python(db_posts, from_attributes=True), mode="json")
+    assert response.json() == expected
+    # the response columns in schema order, not the Post entity
+    assert query_counter[-1].startswith("SELECT posts.id, posts.title, posts.content, posts.author, posts.timestamp, "
+                                        "posts.board_id, posts.updated_at \nFROM posts")
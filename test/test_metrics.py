@@ -0,0 +1,71 @@
+import logging
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import config
+from app.services.excel_parsing import parsing_excel_file
+from app.services.metrics import RequestStats, current_request_stats
+from test.conftest import engine
+from test.sample_sheets import build_score_sheet
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_request_latency_and_query_metrics(client):
+    board_id = client.post("/boards/", json={"name": "notice", "description": ""}).json()["id"]
+    before = sample("http_request_duration_seconds_count", method="GET", route="/boards/{boardId}/posts/{postId}", status="404")
+    queries_before = sample("db_queries_per_request_sum", method="GET", route="/boards/{boardId}/posts/{postId}")
+
+    response = client.get(f"/boards/{board_id}/posts/1")
+    assert response.status_code == 404
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert sample("http_request_duration_seconds_count", method="GET", route="/boards/{boardId}/posts/{postId}", status="404") == before + 1
+    assert sample("db_queries_per_request_sum", method="GET", route="/boards/{boardId}/posts/{postId}") == queries_before + 2 # board (cache miss) and post
+
+    body = client.get("/metrics").text
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/boards/{boardId}/posts/{postId}",status="404"}' in body
+    assert "db_time_per_request_seconds" in body
+
+def test_failed_statement_is_observed(db):
+    before = sample("db_failed_statement_duration_seconds_count", error="OperationalError")
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            assert conn.info["query_started_at"] == {} # the start time did not leak
+    finally:
+        current_request_stats.reset(token)
+    assert sample("db_failed_statement_duration_seconds_count", error="OperationalError") == before + 1
+    assert stats.queries == 1
+
+def test_n_plus_one_is_flagged(monkeypatch):
+    monkeypatch.setattr(config, "N_PLUS_ONE_THRESHOLD", 3)
+    stats = RequestStats()
+    for team_result_id in range(3):
+        stats.record("SELECT * FROM player_stats WHERE team_result_id = ?", 0.001)
+    stats.record("SELECT * FROM reports", 0.001)
+    assert stats.queries == 4
+    assert stats.repeated_statements() == [("SELECT * FROM player_stats WHERE team_result_id = ?", 3)]
+
+def test_n_plus_one_counter(client, monkeypatch, caplog):
+    monkeypatch.setattr(config, "N_PLUS_ONE_THRESHOLD", 2)
+    board_id = client.post("/boards/", json={"name": "notice", "description": ""}).json()["id"]
+    before = sample("db_n_plus_one_total", method="POST", route="/boards/{boardId}/posts:batch")
+    with caplog.at_level(logging.WARNING, logger="app.services.metrics"):
+        # update and delete both check existence with the same SELECT
+        client.post(f"/boards/{board_id}/posts:batch", json={"update": [{"id": 1, "title": "t"}], "delete": [1]})
+    assert sample("db_n_plus_one_total", method="POST", route="/boards/{boardId}/posts:batch") == before + 1
+    assert "possible N+1 in POST /boards/{boardId}/posts:batch" in caplog.text
+
+def test_ingestion_stage_timings(db, tmp_path, caplog):
+    path = tmp_path / "game1.xlsx"
+    path.write_bytes(build_score_sheet())
+    before = {stage: sample("ingestion_stage_duration_seconds_count", stage=stage) for stage in ("load", "parse", "save")}
+    with caplog.at_level(logging.INFO, logger="app.services.metrics"):
+        parsing_excel_file(str(path), db, source="game1.xlsx")
+    assert all(sample("ingestion_stage_duration_seconds_count", stage=stage) == count + 1 for stage, count in before.items())
+    assert "ingestion stage=save source=game1.xlsx seconds=" in caplog.text
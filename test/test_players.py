@@ -0,0 +1,78 @@
+from app.models.match import PlayerStat
+from app.models.player import Player
+from app.services import players
+from app.services.players import normalize_name, rebuild_players, resolve_player_ids
+from test.conftest import TestingSessionLocal, ingest
+from test.sample_sheets import TEAM_A_PLAYERS, TEAM_B_PLAYERS
+
+def find_player(client, name, team="프레스토"):
+    return client.get("/players/", params={"name": name, "team": team}).json()[0]
+
+def test_normalize_name():
+    assert normalize_name("김 창범 ") == normalize_name("김창범")
+    assert normalize_name("ＫＩＭ Chang") == "kimchang"
+    assert normalize_name(None) == ""
+
+def test_ingestion_resolves_players(client, db, tmp_path):
+    ingest(db, tmp_path, "game1.xlsx")
+    spaced = [(8, "김 유성", *TEAM_A_PLAYERS[0][2:]), *TEAM_A_PLAYERS[1:]]
+    ingest(db, tmp_path, "game2.xlsx", team_a=("프레스토", "LOSE", spaced), team_b=("레인", "WIN", TEAM_B_PLAYERS))
+
+    assert db.query(Player).count() == 7 # 3 + 2 + 2, the spaced name resolves to the same player
+    assert db.query(PlayerStat).filter(PlayerStat.player_id.is_(None)).count() == 0
+    assert find_player(client, "김 유성")["name"] == "김유성"
+
+def test_player_career_and_game_log(client, db, tmp_path):
+    first = ingest(db, tmp_path, "game1.xlsx")
+    second = ingest(db, tmp_path, "game2.xlsx", team_a=("프레스토", "LOSE", TEAM_A_PLAYERS), team_b=("레인", "WIN", TEAM_B_PLAYERS))
+    player = find_player(client, "김창범")
+
+    response = client.get(f"/players/{player['id']}")
+    assert response.status_code == 200
+    career = response.json()
+    assert (career["name"], career["backnumber"], career["games"], career["wins"], career["losses"]) == ("김창범", 77, 2, 1, 1)
+    assert career["totals"]["points"] == 24
+    assert career["averages"]["rebounds"] == 3.0
+
+    games = client.get(f"/players/{player['id']}/games").json()
+    assert [(g["report_id"], g["result"], g["opponent"], g["score_Total"]) for g in games] == [
+        (second, "LOSE", "레인", 12), (first, "WIN", "블리츠", 12),
+    ]
+    assert len(client.get(f"/players/{player['id']}/games", params={"limit": 1, "offset": 1}).json()) == 1
+
+def test_player_not_found(client):
+    assert client.get("/players/1").status_code == 404
+    assert client.get("/players/1/games").json() == {"detail": "Player with this ID does not exist"}
+
+def test_rebuild_players(db, tmp_path):
+    ingest(db, tmp_path, "game1.xlsx")
+    db.query(PlayerStat).update({PlayerStat.player_id: None})
+    db.query(Player).delete()
+    db.commit()
+
+    rebuild_players(db)
+    assert db.query(Player).count() == 5
+    assert db.query(PlayerStat).filter(PlayerStat.player_id.is_(None)).count() == 0
+
+def test_resolve_player_ids_matches_missing_backnumber_and_team(db):
+    stats = [{"player": "김유성", "backnumber": None}]
+    first = resolve_player_ids(db, None, stats)
+    db.commit()
+    assert resolve_player_ids(db, None, stats) == first
+    assert db.query(Player).count() == 1
+
+def test_resolve_player_ids_keeps_a_concurrently_inserted_player(db, monkeypatch):
+    # The other job's insert lands between this job's lookup and its insert.
+    with TestingSessionLocal() as other:
+        other_id = resolve_player_ids(other, "프레스토", [{"player": "김유성", "backnumber": 8}])[0]["player_id"]
+        other.commit()
+    select_player_ids = players.select_player_ids
+    lookups = []
+    def stale_first_lookup(db, keys):
+        lookups.append(keys)
+        return {} if len(lookups) == 1 else select_player_ids(db, keys)
+    monkeypatch.setattr(players, "select_player_ids", stale_first_lookup)
+
+    resolved = resolve_player_ids(db, "프레스토", [{"player": "김 유성", "backnumber": 8}])
+    assert resolved[0]["player_id"] == other_id
+    assert db.query(Player).count() == 1
@@ -0,0 +1,52 @@
+from app import config
+from test.conftest import create_board
+
+def test_batch_create_posts(client, query_counter):
+    board_id = create_board(client)
+    query_counter.clear()
+    posts = [{"title": f"Post {i}", "content": f"Content {i}", "author": "old-forum"} for i in range(500)]
+
+    response = client.post(f"/boards/{board_id}/posts:batch", json={"create": posts})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["op"], r["index"], r["status"]) for r in results[:2]] == [("create", 0, 201), ("create", 1, 201)]
+    assert len({r["id"] for r in results}) == 500
+    assert len([s for s in query_counter if s.startswith("INSERT INTO posts")]) == 1 # one executemany batch
+
+    post = client.get(f"/boards/{board_id}/posts/{results[499]['id']}").json()
+    assert (post["title"], post["board_id"]) == ("Post 499", board_id)
+
+def test_batch_update_and_delete_posts(client):
+    board_id = create_board(client)
+    posts = [{"title": f"Post {i}", "content": f"Content {i}", "author": "author"} for i in range(3)]
+    ids = [r["id"] for r in client.post(f"/boards/{board_id}/posts:batch", json={"create": posts}).json()["results"]]
+
+    response = client.post(f"/boards/{board_id}/posts:batch", json={
+        "update": [{"id": ids[0], "title": "Edited"}, {"id": 999, "title": "Missing"}],
+        "delete": [ids[1], 998],
+    })
+    assert response.status_code == 200
+    assert [(r["op"], r["index"], r["status"], r["id"]) for r in response.json()["results"]] == [
+        ("update", 0, 200, ids[0]), ("update", 1, 404, 999), ("delete", 0, 204, ids[1]), ("delete", 1, 404, 998),
+    ]
+    edited = client.get(f"/boards/{board_id}/posts/{ids[0]}").json()
+    assert (edited["title"], edited["content"]) == ("Edited", "Content 0")
+    assert client.get(f"/boards/{board_id}/posts/{ids[1]}").status_code == 404
+
+def test_batch_posts_scoped_to_board(client):
+    board_id = create_board(client)
+    other_id = client.post("/boards/", json={"name": "other", "description": ""}).json()["id"]
+    post_id = client.post(f"/boards/{other_id}/posts:batch", json={
+        "create": [{"title": "t", "content": "c", "author": "a"}]}).json()["results"][0]["id"]
+
+    response = client.post(f"/boards/{board_id}/posts:batch", json={"delete": [post_id]})
+    assert response.json()["results"][0]["status"] == 404
+    assert client.get(f"/boards/{other_id}/posts/{post_id}").status_code == 200
+
+def test_batch_posts_errors(client, monkeypatch):
+    assert client.post("/boards/1/posts:batch", json={"delete": [1]}).status_code == 404
+    board_id = create_board(client)
+    assert client.post(f"/boards/{board_id}/posts:batch", json={"create": [{"title": "no content"}]}).status_code == 422
+
+    monkeypatch.setattr(config, "POST_BATCH_MAX_ITEMS", 2)
+    assert client.post(f"/boards/{board_id}/posts:batch", json={"delete": [1, 2, 3]}).status_code == 413
@@ -0,0 +1,46 @@
+from test.conftest import ingest
+from test.sample_sheets import REPORT_TEXT, TEAM_A_PLAYERS, TEAM_B_PLAYERS
+
+def test_retrieve_report(client, db, tmp_path):
+    report_id = ingest(db, tmp_path, "game1.xlsx")
+
+    response = client.get(f"/reports/{report_id}")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == report_id
+    assert body["source"] == "game1.xlsx"
+    assert body["report"] is None # deferred unless requested
+    assert [(t["team"], t["result"]) for t in body["team_results"]] == [("프레스토", "WIN"), ("블리츠", "LOSE")]
+    assert [p["backnumber"] for p in body["team_results"][0]["player_stats"]] == [8, 23, 77]
+    assert body["team_results"][0]["player_stats"][2]["player"] == "김창범"
+
+    response = client.get(f"/reports/{report_id}", params={"include_report": True})
+    assert response.json()["report"] == REPORT_TEXT
+
+def test_retrieve_report_not_found(client):
+    response = client.get("/reports/1")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Report with this ID does not exist"}
+
+def test_retrieve_reports_paginated(client, db, tmp_path):
+    report_ids = [ingest(db, tmp_path, f"game{i}.xlsx", report=f"{REPORT_TEXT} {i}") for i in range(3)]
+
+    response = client.get("/reports/", params={"limit": 2})
+    assert response.status_code == 200
+    assert [r["id"] for r in response.json()] == report_ids[:2]
+    assert [r["id"] for r in client.get("/reports/", params={"limit": 2, "offset": 2}).json()] == report_ids[2:]
+    assert all(len(r["team_results"]) == 2 for r in response.json())
+
+def test_box_score_query_count(client, db, tmp_path, query_counter):
+    # One query per level (reports, team results, player stats), independent of how many games are returned.
+    ingest(db, tmp_path, "game1.xlsx")
+    ingest(db, tmp_path, "game2.xlsx", team_a=("프레스토", "LOSE", TEAM_A_PLAYERS), team_b=("레인", "WIN", TEAM_B_PLAYERS))
+    ingest(db, tmp_path, "game3.xlsx", team_a=("레인", "WIN", TEAM_B_PLAYERS), team_b=("블리츠", "LOSE", TEAM_A_PLAYERS))
+
+    client.get("/reports/")
+    assert len(query_counter) == 3
+    assert all("reports.report" not in statement for statement in query_counter)
+
+    query_counter.clear()
+    client.get("/reports/1")
+    assert len(query_counter) == 3
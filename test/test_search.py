@@ -0,0 +1,58 @@
+from app.services import search
+from test.conftest import create_board, create_post, ingest
+
+def test_search_posts_korean(client):
+    board_id = create_board(client)
+    create_post(client, board_id, "디비전5 결승 후기", "프레스토가 블리츠를 꺾고 우승했습니다. 김창범 선수의 3점이 빛났습니다.")
+    create_post(client, board_id, "연습 경기 일정", "이번 주 토요일 연습 경기가 있습니다.")
+    create_post(client, board_id, "MVP 투표", "김창범 선수와 김유성 선수 중 MVP는?", author="김창범")
+
+    response = client.get("/search/posts", params={"q": "김창범"})
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["title"] for result in results] == ["MVP 투표", "디비전5 결승 후기"] # ranked by bm25
+    assert "[김창범]" in results[1]["snippet"]
+
+    assert [r["title"] for r in client.get("/search/posts", params={"q": "김창범 우승"}).json()] == ["디비전5 결승 후기"]
+    assert [r["title"] for r in client.get("/search/posts", params={"q": "연습"}).json()] == ["연습 경기 일정"] # 2-char term
+    assert client.get("/search/posts", params={"q": "김창범", "limit": 1, "offset": 1}).json()[0]["title"] == "디비전5 결승 후기"
+    assert client.get("/search/posts", params={"q": "김창범", "boardId": board_id + 1}).json() == []
+
+def test_search_posts_follows_updates_and_deletes(client):
+    board_id = create_board(client)
+    post = create_post(client, board_id, "블리츠 모집", "블리츠에서 가드를 모집합니다.")
+
+    client.patch(f"/boards/{board_id}/posts/{post['id']}", json=dict(post, title="프레스토 모집", content="프레스토에서 센터를 모집합니다."))
+    assert client.get("/search/posts", params={"q": "블리츠"}).json() == []
+    assert len(client.get("/search/posts", params={"q": "프레스토"}).json()) == 1
+
+    client.delete(f"/boards/{board_id}/posts/{post['id']}")
+    assert client.get("/search/posts", params={"q": "프레스토"}).json() == []
+
+def test_search_reports(client, db, tmp_path):
+    report_id = ingest(db, tmp_path, "game1.xlsx")
+
+    results = client.get("/search/reports", params={"q": "프레스토"}).json()
+    assert [(result["id"], result["source"]) for result in results] == [(report_id, "game1.xlsx")]
+    assert client.get("/search/reports", params={"q": "레인보우"}).json() == []
+    assert client.get("/search/reports", params={"q": ""}).status_code == 422
+
+def test_short_terms_are_matched_through_the_trigram_vocabulary(client, query_counter, monkeypatch):
+    board_id = create_board(client)
+    create_post(client, board_id, "연습 경기 일정", "이번 주 토요일에 모입니다.")
+    create_post(client, board_id, "MVP 투표", "김창범 선수와 김유성 선수 중 MVP는?")
+    create_post(client, board_id, "공지", "100% 참석")
+
+    query_counter.clear()
+    results = client.get("/search/posts", params={"q": "연습"}).json()
+    assert [result["title"] for result in results] == ["연습 경기 일정"]
+    assert "LIKE" not in query_counter[-1] # matched on the index, not a scan of the posts
+
+    assert [r["title"] for r in client.get("/search/posts", params={"q": "mv 투표"}).json()] == ["MVP 투표"]
+    assert [r["title"] for r in client.get("/search/posts", params={"q": "0%"}).json()] == ["공지"]
+    assert client.get("/search/posts", params={"q": "농구"}).json() == []
+
+    monkeypatch.setattr(search, "MAX_SHORT_TERM_TRIGRAMS", 1) # "선수" is in several trigrams
+    query_counter.clear()
+    assert [r["title"] for r in client.get("/search/posts", params={"q": "선수"}).json()] == ["MVP 투표"]
+    assert "LIKE" in query_counter[-1]
@@ -0,0 +1,78 @@
+import io
+import os
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app import config
+from app.services import snapshots
+from test.sample_sheets import build_score_sheet, TEAM_A_PLAYERS, TEAM_B_PLAYERS
+
+def upload(client, name, **kwargs):
+    response = client.post("/uploadfile/", files={"file": (name, build_score_sheet(**kwargs))})
+    return client.get(f"/uploads/{response.json()['job_id']}").json()["report_ids"][0]
+
+def read_snapshot(table):
+    # Every partition of the table in one Arrow table.
+    paths = snapshots.partition_paths(table)
+    if not paths:
+        return snapshots.table_schema(table).empty_table()
+    return pa.concat_tables(pq.read_table(path, memory_map=True) for path in paths)
+
+def test_ingestion_writes_snapshot_partitions(client, inline_jobs):
+    first = upload(client, "game1.xlsx")
+    second = upload(client, "game2.xlsx", team_a=("프레스토", "LOSE", TEAM_A_PLAYERS), team_b=("레인", "WIN", TEAM_B_PLAYERS))
+
+    assert [path.rsplit("/", 1)[1] for path in snapshots.partition_paths("player_stats")] == [
+        f"report-{first:08d}.parquet", f"report-{second:08d}.parquet"]
+    table = read_snapshot("player_stats")
+    assert table.num_rows == 10
+    assert table.schema == snapshots.table_schema("player_stats")
+    assert table.column("score_Total").to_pylist()[:3] == [6, 9, 12]
+    assert read_snapshot("team_results").column("team").to_pylist() == ["프레스토", "블리츠", "프레스토", "레인"]
+
+    client.delete(f"/reports/{first}")
+    assert read_snapshot("player_stats").column("report_id").unique().to_pylist() == [second]
+
+def test_snapshot_endpoints(client, inline_jobs):
+    report_id = upload(client, "game1.xlsx")
+
+    response = client.get("/snapshots/player_stats")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == snapshots.ARROW_STREAM_MEDIA_TYPE
+    table = pa.ipc.open_stream(pa.BufferReader(response.content)).read_all()
+    assert table.column("player").to_pylist() == ["김유성", "최동현", "김창범", "이주권", "김승현"]
+
+    response = client.get(f"/snapshots/team_results/{report_id}")
+    assert response.status_code == 200
+    assert pq.read_table(io.BytesIO(response.content)).num_rows == 2
+    assert client.get("/snapshots/team_results/999").status_code == 404
+    assert client.get("/snapshots/posts").status_code == 422
+
+def test_empty_snapshot_stream(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path))
+    table = pa.ipc.open_stream(pa.BufferReader(client.get("/snapshots/team_results").content)).read_all()
+    assert table.num_rows == 0
+
+def test_rebuild_snapshots(client, db, inline_jobs):
+    report_id = upload(client, "game1.xlsx")
+    stale = snapshots.partition_path("player_stats", report_id + 1)
+    with open(stale, "wb") as f:
+        f.write(b"stale")
+    snapshots.remove_report_snapshots(report_id)
+
+    snapshots.rebuild_snapshots(db)
+    assert snapshots.partition_paths("player_stats") == [snapshots.partition_path("player_stats", report_id)]
+    assert read_snapshot("team_results").num_rows == 2
+
+def test_failed_partition_write_leaves_no_temp_file(client, db, inline_jobs, monkeypatch):
+    report_id = upload(client, "game1.xlsx")
+    def failing_write_table(table, where):
+        where.write(b"partial")
+        raise OSError("disk full")
+    monkeypatch.setattr(pq, "write_table", failing_write_table)
+
+    with pytest.raises(OSError, match="disk full"):
+        snapshots.write_partition(db, "player_stats", report_id)
+    assert not [name for name in os.listdir(snapshots.table_dir("player_stats")) if name.endswith(".tmp")]
+    assert read_snapshot("player_stats").num_rows == 5 # the previous partition is kept
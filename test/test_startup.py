@@ -0,0 +1,115 @@
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, create_engine, inspect, text
+
+from app.database import Base
+from app.services import search
+from app.services.schema import SchemaOutOfDate, ensure_schema, schema_fingerprint
+
+def test_ensure_schema_creates_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    assert ensure_schema(engine) is True
+    assert {"boards", "posts", "reports", "posts_fts", "schema_version"} <= set(inspect(engine).get_table_names())
+    assert ensure_schema(engine) is False # fingerprint matches, nothing to create
+
+def test_ensure_schema_follows_model_changes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    metadata = MetaData()
+    Table("things", metadata, Column("id", Integer, primary_key=True))
+    assert ensure_schema(engine, metadata) is True
+
+    Table("other_things", metadata, Column("id", Integer, primary_key=True))
+    assert ensure_schema(engine, metadata) is True
+    assert "other_things" in inspect(engine).get_table_names()
+    assert schema_fingerprint(metadata) != schema_fingerprint(Base.metadata)
+
+def test_ensure_schema_adds_new_columns_to_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.begin() as conn: # boards and posts as created before the post stats and soft delete columns
+        conn.execute(text("CREATE TABLE boards (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, description VARCHAR)"))
+        conn.execute(text("CREATE TABLE posts (id INTEGER PRIMARY KEY, title VARCHAR, content VARCHAR, author VARCHAR, "
+                          "timestamp DATETIME, board_id INTEGER REFERENCES boards(id))"))
+        conn.execute(text("INSERT INTO boards VALUES (1, 'notice', '')"))
+        conn.execute(text("INSERT INTO posts VALUES (1, 'hello', 'content', 'author', '2024-01-01 00:00:00', 1)"))
+
+    assert ensure_schema(engine) is True
+    columns = {column["name"] for column in inspect(engine).get_columns("boards")}
+    assert {"post_count", "last_post_at", "updated_at", "deleted_at"} <= columns
+    assert "ix_posts_board_id_id" in {index["name"] for index in inspect(engine).get_indexes("posts")}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT post_count, last_post_at FROM boards")).one() == (1, "2024-01-01 00:00:00")
+        assert conn.scalar(text("SELECT count(*) FROM posts_fts WHERE posts_fts MATCH '\"hello\"'")) == 1
+    assert ensure_schema(engine) is False
+
+def test_ensure_schema_refuses_columns_it_cannot_add(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    metadata = MetaData()
+    Table("things", metadata, Column("id", Integer, primary_key=True))
+    ensure_schema(engine, metadata)
+
+    metadata = MetaData()
+    Table("things", metadata, Column("id", Integer, primary_key=True), Column("name", String, nullable=False))
+    with pytest.raises(SchemaOutOfDate, match="things.name"):
+        ensure_schema(engine, metadata)
+    assert ensure_schema(engine, MetaData()) is True # the failed attempt stored no fingerprint
+
+def test_ensure_schema_refuses_changed_columns_and_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    metadata = MetaData()
+    Table("things", metadata, Column("id", Integer, primary_key=True), Column("name", String),
+          Column("rank", Integer), Index("ix_things_name", "name"))
+    ensure_schema(engine, metadata)
+
+    metadata = MetaData()
+    Table("things", metadata, Column("id", Integer, primary_key=True), Column("name", String, nullable=False),
+          Column("rank", String), Index("ix_things_name", "name", "rank"))
+    with pytest.raises(SchemaOutOfDate) as error:
+        ensure_schema(engine, metadata)
+    assert "things.name nullable" in str(error.value)
+    assert "things.rank is INTEGER, declared VARCHAR" in str(error.value)
+    assert "index ix_things_name" in str(error.value)
+    with pytest.raises(SchemaOutOfDate): # the failed attempt stored no fingerprint
+        ensure_schema(engine, metadata)
+
+def test_ensure_schema_keeps_columns_the_models_dropped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    metadata = MetaData()
+    Table("things", metadata, Column("id", Integer, primary_key=True), Column("legacy", String))
+    ensure_schema(engine, metadata)
+
+    metadata = MetaData()
+    Table("things", metadata, Column("id", Integer, primary_key=True))
+    assert ensure_schema(engine, metadata) is True
+    assert "legacy" in {column["name"] for column in inspect(engine).get_columns("things")}
+
+def test_ensure_schema_rebuilds_search_only_for_new_indexes(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(bind=engine) # the current schema, as created before the fingerprint was stored
+    rebuilt = []
+    rebuild_search_index = search.rebuild_search_index
+    def recording_rebuild(conn, tables):
+        rebuilt.append(tables)
+        rebuild_search_index(conn, tables)
+    monkeypatch.setattr(search, "rebuild_search_index", recording_rebuild)
+
+    assert ensure_schema(engine) is True # nothing differs from the declarations
+    assert rebuilt == []
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER reports_fts_au"))
+        conn.execute(text("DELETE FROM schema_version"))
+    assert ensure_schema(engine) is True
+    assert rebuilt == [["reports"]]
+
+def test_concurrent_cold_starts_create_the_schema_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"timeout": 30})
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda _: ensure_schema(engine), range(4)))
+    assert results.count(True) == 1
+
+def test_api_import_does_not_load_ingestion_stack():
+    code = "import sys, app.main; print(sorted(m for m in ('numpy', 'pandas', 'openpyxl', 'pyarrow') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"